@@ -0,0 +1,303 @@
+import numpy as np
+
+# Direction des demi-droites du test d'intérieur (quelconque, pour éviter les cas dégénérés)
+RAY_DIRECTION = np.array([0.5773502691896258, 0.5773891234567891, 0.5772114358790123])
+
+
+def closest_point_on_triangles(p, a, b, c):
+    """
+    Calcule le point le plus proche de p sur chaque triangle (a, b, c). Le calcul est vectorisé sur des paires
+    (point, triangle) : chaque ligne de p est associée à la ligne correspondante de a, b et c.
+    Méthode des régions de Voronoï (C. Ericson, Real-Time Collision Detection).
+
+    :param p: Coordonnées des points.
+    :type p: 2D-array   (N*3 components)
+    :param a: Premier sommet des triangles.
+    :type a: 2D-array   (N*3 components)
+    :param b: Deuxième sommet des triangles.
+    :type b: 2D-array   (N*3 components)
+    :param c: Troisième sommet des triangles.
+    :type c: 2D-array   (N*3 components)
+    :return: Points les plus proches sur les triangles.
+    :rtype: 2D-array   (N*3 components)
+    """
+    dot = lambda u, v: np.einsum('ij,ij->i', u, v)
+    ab, ac, ap = b - a, c - a, p - a
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    bp = p - b
+    d3, d4 = dot(ab, bp), dot(ac, bp)
+    cp = p - c
+    d5, d6 = dot(ab, cp), dot(ac, cp)
+    va, vb, vc = d3 * d6 - d5 * d4, d5 * d2 - d1 * d6, d1 * d4 - d3 * d2
+
+    # Par défaut : projection à l'intérieur du triangle (coordonnées barycentriques)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = 1 / (va + vb + vc)
+        v, w = vb * denom, vc * denom
+        result = a + ab * v[:, None] + ac * w[:, None]
+
+        # Régions des arêtes (de la moins prioritaire à la plus prioritaire)
+        t = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        mask = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+        result = np.where(mask[:, None], b + (c - b) * t[:, None], result)
+        t = d2 / (d2 - d6)
+        mask = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        result = np.where(mask[:, None], a + ac * t[:, None], result)
+        t = d1 / (d1 - d3)
+        mask = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        result = np.where(mask[:, None], a + ab * t[:, None], result)
+
+    # Régions des sommets
+    result = np.where(((d6 >= 0) & (d5 <= d6))[:, None], c, result)
+    result = np.where(((d3 >= 0) & (d4 <= d3))[:, None], b, result)
+    result = np.where(((d1 <= 0) & (d2 <= 0))[:, None], a, result)
+
+    # Triangles dégénérés (aire nulle) : repli sur le sommet le plus proche
+    bad = np.isnan(result[:, 0])
+    if np.any(bad):
+        corners = np.stack([a[bad], b[bad], c[bad]], axis=1)
+        nearest = np.argmin(np.sum((corners - p[bad][:, None]) ** 2, axis=2), axis=1)
+        result[bad] = corners[np.arange(len(nearest)), nearest]
+    return result
+
+
+def ray_triangles(o, d, a, b, c):
+    """
+    Calcule l'intersection de chaque rayon o + t * d avec le triangle (a, b, c) associé. Le calcul est vectorisé sur
+    des paires (rayon, triangle), comme closest_point_on_triangles. Méthode de Möller-Trumbore.
+
+    :param o: Origine des rayons.
+    :type o: 2D-array   (N*3 components)
+    :param d: Direction des rayons.
+    :type d: 2D-array   (N*3 components)
+    :param a: Premier sommet des triangles.
+    :type a: 2D-array   (N*3 components)
+    :param b: Deuxième sommet des triangles.
+    :type b: 2D-array   (N*3 components)
+    :param c: Troisième sommet des triangles.
+    :type c: 2D-array   (N*3 components)
+    :return: Paramètre t de l'intersection (NaN si le rayon ne coupe pas le triangle).
+    :rtype: 1D-array
+    """
+    dot = lambda u, v: np.einsum('ij,ij->i', u, v)
+    e1, e2 = b - a, c - a
+    h = np.cross(d, e2)
+    det = dot(e1, h)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv = 1 / det
+        s = o - a
+        u = dot(s, h) * inv
+        q = np.cross(s, e1)
+        v = dot(d, q) * inv
+        t = dot(e2, q) * inv
+        # Rayon parallèle au plan du triangle (det nul) : aucune intersection
+        hit = (det != 0) & (u >= 0) & (v >= 0) & (u + v <= 1)
+    return np.where(hit, t, np.nan)
+
+
+class BVH:
+
+    def __init__(self, vertices, indices, leaf_size=8):
+        """
+        Initialise une hiérarchie de volumes englobants (boîtes alignées sur les axes) sur un maillage indexé.
+        L'arbre est stocké sous forme de tableaux plats, afin de pouvoir être parcouru par lots de points.
+
+        :param vertices: Sommets du maillage.
+        :type vertices: 2D-array   (V*3 components)
+        :param indices: Indices des sommets de chaque triangle.
+        :type indices: 2D-array   (F*3 components)
+        :param leaf_size: Nombre maximal de triangles par feuille (par défaut 8).
+        :type leaf_size: int
+        """
+        triangles = np.asarray(vertices, dtype=float)[np.asarray(indices)]
+        centroids = triangles.mean(axis=1)
+        low, high = triangles.min(axis=1), triangles.max(axis=1)
+
+        order = np.arange(len(triangles))
+        node_min, node_max, children, ranges = [], [], [], []
+        # Construction itérative : (indice du noeud, début, fin) dans order
+        stack = [(0, 0, len(order))]
+        node_min.append(None), node_max.append(None), children.append(None), ranges.append(None)
+        while stack:
+            node, start, end = stack.pop()
+            sub = order[start:end]
+            node_min[node], node_max[node] = low[sub].min(axis=0), high[sub].max(axis=0)
+            ranges[node] = (start, end)
+            if end - start <= leaf_size:
+                children[node] = (-1, -1)
+                continue
+            # Séparation à la médiane, selon l'axe le plus étendu des centres
+            spread = centroids[sub].max(axis=0) - centroids[sub].min(axis=0)
+            axe = np.argmax(spread)
+            order[start:end] = sub[np.argsort(centroids[sub, axe], kind='stable')]
+            mid = (start + end) // 2
+            left, right = len(node_min), len(node_min) + 1
+            for _ in range(2):
+                node_min.append(None), node_max.append(None), children.append(None), ranges.append(None)
+            children[node] = (left, right)
+            stack.append((left, start, mid))
+            stack.append((right, mid, end))
+
+        self.triangles = triangles[order]
+        self.order = order
+        self.node_min, self.node_max = np.array(node_min), np.array(node_max)
+        self.children = np.array(children, dtype=np.int64)
+        self.ranges = np.array(ranges, dtype=np.int64)
+
+    def query(self, points):
+        """
+        Calcule, pour chaque point, la distance au triangle le plus proche du maillage.
+        Le parcours de l'arbre est réalisé niveau par niveau sur l'ensemble des paires (point, noeud) : une paire est
+        éliminée dès que la distance minimale à la boîte dépasse la meilleure borne supérieure connue pour ce point.
+
+        :param points: Coordonnées des points.
+        :type points: 2D-array   (N*3 components)
+        :return: - distance : Distance au maillage de chaque point,
+                 - triangle : Indice (dans le maillage d'origine) du triangle le plus proche,
+                 - closest : Point le plus proche sur le maillage.
+        :rtype: tuple   (1D-array, 1D-array, 2D-array)
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        n = len(points)
+        best = np.full(n, np.inf)               # Carré de la distance exacte la plus faible trouvée
+        bound = np.full(n, np.inf)              # Borne supérieure (carré) de la distance au maillage
+        best_tri = np.full(n, -1, dtype=np.int64)
+        closest = np.full((n, 3), np.nan)
+
+        pid, node = np.arange(n), np.zeros(n, dtype=np.int64)
+        while len(pid):
+            p, lo, hi = points[pid], self.node_min[node], self.node_max[node]
+            # Distance minimale (au carré) à la boîte, et distance au coin le plus éloigné (borne supérieure)
+            d_min = np.sum((p - np.clip(p, lo, hi)) ** 2, axis=1)
+            d_max = np.sum(np.maximum(np.abs(p - lo), np.abs(p - hi)) ** 2, axis=1)
+            np.minimum.at(bound, pid, d_max)
+            keep = d_min <= np.minimum(bound, best)[pid]
+            pid, node = pid[keep], node[keep]
+
+            # Feuilles : distances exactes aux triangles
+            leaf = self.children[node, 0] < 0
+            if np.any(leaf):
+                start, end = self.ranges[node[leaf], 0], self.ranges[node[leaf], 1]
+                counts = end - start
+                pair_p = np.repeat(pid[leaf], counts)
+                pair_t = np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(np.sum(counts))
+                tri = self.triangles[pair_t]
+                q = closest_point_on_triangles(points[pair_p], tri[:, 0], tri[:, 1], tri[:, 2])
+                d = np.sum((points[pair_p] - q) ** 2, axis=1)
+                # Meilleure paire par point : tri par distance, puis première occurrence de chaque point
+                sort = np.lexsort((d, pair_p))
+                first = sort[np.r_[True, pair_p[sort][1:] != pair_p[sort][:-1]]]
+                better = d[first] < best[pair_p[first]]
+                first = first[better]
+                best[pair_p[first]] = d[first]
+                best_tri[pair_p[first]] = self.order[pair_t[first]]
+                closest[pair_p[first]] = q[first]
+
+            # Noeuds internes : passage aux enfants
+            pid, node = pid[~leaf], node[~leaf]
+            pid, node = np.repeat(pid, 2), self.children[node].reshape(-1)
+        return np.sqrt(best), best_tri, closest
+
+    def clearance(self, trajectory):
+        """
+        Calcule la distance minimale entre une trajectoire (suite de points) et le maillage.
+
+        :param trajectory: Points successifs de la trajectoire.
+        :type trajectory: 2D-array   (N*3 components)
+        :return: Distance minimale, et indice du point de la trajectoire correspondant.
+        :rtype: tuple   (float, int)
+        """
+        distance = self.query(trajectory)[0]
+        i = int(np.argmin(distance))
+        return distance[i], i
+
+    def intersect(self, origins, directions, t_max=np.inf):
+        """
+        Recherche toutes les intersections de rayons (ou de segments) avec le maillage. Comme query, l'arbre est
+        parcouru niveau par niveau sur l'ensemble des paires (rayon, noeud) : une paire est éliminée dès que le rayon
+        ne traverse pas la boîte du noeud entre t = 0 et t = t_max.
+
+        :param origins: Origine des rayons.
+        :type origins: 2D-array   (N*3 components)
+        :param directions: Direction des rayons (non normalisées : pour un segment [p, q], direction q - p et t_max=1).
+        :type directions: 2D-array   (N*3 components)
+        :param t_max: Paramètre maximal des intersections recherchées (par défaut l'infini : demi-droites).
+        :type t_max: float
+        :return: - ray : Indice du rayon de chaque intersection,
+                 - t : Paramètre de chaque intersection (point origine + t * direction),
+                 - triangle : Indice (dans le maillage d'origine) du triangle coupé.
+        :rtype: tuple   (1D-array, 1D-array, 1D-array)
+        """
+        origins = np.atleast_2d(np.asarray(origins, dtype=float))
+        directions = np.atleast_2d(np.asarray(directions, dtype=float))
+        with np.errstate(divide='ignore'):
+            inverse = 1 / directions
+        hits_ray, hits_t, hits_tri = [], [], []
+
+        rid, node = np.arange(len(origins)), np.zeros(len(origins), dtype=np.int64)
+        while len(rid):
+            o, inv = origins[rid], inverse[rid]
+            # Traversée de la boîte (méthode des dalles) ; les NaN (direction nulle sur une face) sont ignorés
+            with np.errstate(invalid='ignore'):
+                t1, t2 = (self.node_min[node] - o) * inv, (self.node_max[node] - o) * inv
+            t_near = np.fmax.reduce(np.fmin(t1, t2), axis=1)
+            t_far = np.fmin.reduce(np.fmax(t1, t2), axis=1)
+            keep = (t_near <= np.minimum(t_far, t_max)) & (t_far >= 0)
+            rid, node = rid[keep], node[keep]
+
+            # Feuilles : intersections exactes avec les triangles
+            leaf = self.children[node, 0] < 0
+            if np.any(leaf):
+                start, end = self.ranges[node[leaf], 0], self.ranges[node[leaf], 1]
+                counts = end - start
+                pair_r = np.repeat(rid[leaf], counts)
+                pair_t = np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(np.sum(counts))
+                tri = self.triangles[pair_t]
+                t = ray_triangles(origins[pair_r], directions[pair_r], tri[:, 0], tri[:, 1], tri[:, 2])
+                hit = (t >= 0) & (t <= t_max)
+                hits_ray.append(pair_r[hit]), hits_t.append(t[hit]), hits_tri.append(self.order[pair_t[hit]])
+
+            # Noeuds internes : passage aux enfants
+            rid, node = rid[~leaf], node[~leaf]
+            rid, node = np.repeat(rid, 2), self.children[node].reshape(-1)
+        if not hits_ray:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0, dtype=np.int64)
+        return np.concatenate(hits_ray), np.concatenate(hits_t), np.concatenate(hits_tri)
+
+    def contains(self, points):
+        """
+        Indique, pour chaque point, s'il se trouve à l'intérieur du maillage (supposé fermé) : parité du nombre
+        d'intersections d'une demi-droite issue du point avec le maillage. La direction de la demi-droite est choisie
+        quelconque, pour éviter de passer exactement par les arêtes et les sommets.
+
+        :param points: Coordonnées des points.
+        :type points: 2D-array   (N*3 components)
+        :return: Point intérieur ou non.
+        :rtype: 1D-array   (boolean)
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        direction = np.broadcast_to(RAY_DIRECTION, points.shape)
+        ray = self.intersect(points, direction)[0]
+        return np.bincount(ray, minlength=len(points)) % 2 == 1
+
+    def collides(self, points, margin=0., trajectory=False):
+        """
+        Indique, pour chaque point, s'il est en contact avec le maillage : point à moins de margin du maillage, ou à
+        l'intérieur du maillage (supposé fermé). Pour une trajectoire, le point est aussi en contact si le segment
+        depuis le point précédent traverse le maillage (contact entre deux points successifs).
+
+        :param points: Coordonnées des points.
+        :type points: 2D-array   (N*3 components)
+        :param margin: Distance de sécurité (par défaut 0).
+        :type margin: float
+        :param trajectory: Si True, les points sont les positions successives d'une trajectoire (par défaut False).
+        :type trajectory: boolean
+        :return: Contact ou non de chaque point.
+        :rtype: 1D-array   (boolean)
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        contact = (self.query(points)[0] <= margin) | self.contains(points)
+        if trajectory and len(points) > 1:
+            segment = self.intersect(points[:-1], points[1:] - points[:-1], t_max=1.)[0]
+            contact[1 + np.unique(segment)] = True
+        return contact
@@ -1,41 +1,217 @@
+import os
 import numpy as np
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import matplotlib.pyplot as plt
-from stl import mesh
+from assets.bvh import BVH
+
+# Version du format de cache (à incrémenter si le contenu du fichier .npz change)
+CACHE_VERSION = 1
+# Résolutions de la grille de regroupement des sommets, pour chaque niveau de détail (None = maillage complet)
+LOD_RESOLUTIONS = (None, 64, 32, 16)
 
 
 class STLReader:
 
-    def __init__(self, path=None):
+    def __init__(self, path=None, use_cache=True):
         self.path, self.data, self.isLoaded = None, None, False
-        self.vertices, self.faces = np.array([]), np.array([])
+        self.use_cache = use_cache
+        # Maillage indexé : sommets uniques (V, 3) et indices des sommets de chaque triangle (F, 3)
+        self.vertices, self.indices = np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int32)
+        self.lods, self.bvhs = {}, {}
+        self.properties = None
         if not path is None:
             self.open(path)
 
     def __call__(self, *args, **kwargs):
-        print(f" > Informations :\n    fichier : {self.path}\n    points : {len(self.vertices)}")
+        print(f" > Informations :\n    fichier : {self.path}\n    points : {len(self.vertices)}"
+              f"\n    triangles : {len(self.indices)}")
+
+    @property
+    def faces(self):
+        """
+        Coordonnées des sommets de chaque triangle, reconstruites à partir du maillage indexé.
+
+        :return: Triangles du maillage.
+        :rtype: 3D-array   (F*3*3 components)
+        """
+        return self.vertices[self.indices]
+
+    def get_cache_path(self, path=None):
+        """
+        Retourne le chemin du cache binaire associé au fichier STL (à côté du fichier source).
+
+        :param path: Chemin du fichier STL (par défaut celui déjà ouvert).
+        :type path: string
+        :return: Chemin du fichier de cache.
+        :rtype: string
+        """
+        return os.path.splitext(self.path if path is None else path)[0] + '.mesh.npz'
 
     def open(self, path):
+        """
+        Ouvre un fichier STL. Si un cache binaire à jour existe à côté du fichier, il est lu directement ; sinon le
+        fichier STL est lu, ses sommets dupliqués sont fusionnés, et le cache est écrit pour les ouvertures suivantes.
+
+        :param path: Chemin du fichier STL.
+        :type path: string
+        """
         try:
-            self.data = mesh.Mesh.from_file(path)
-            self.path = path
-            self.vertices = self.data.vectors.reshape(-1, 3)
-            self.faces = self.data.vectors
-            self.isLoaded = True
+            stat = os.stat(path)
         except FileNotFoundError:
             print(f"\n > Impossible d'ouvrir le fichier STL : {path}")
+            return
+        self.path = path
+        # Signature du fichier source, pour invalider le cache s'il est modifié
+        signature = np.array([CACHE_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+        cache = self.get_cache_path()
+        if self.use_cache and os.path.exists(cache):
+            with np.load(cache) as data:
+                if np.array_equal(data['signature'], signature):
+                    self.vertices, self.indices = data['vertices'], data['indices']
+                    self.isLoaded = True
+                    return
+        # Lecture du fichier STL (numpy-stl n'est nécessaire qu'en l'absence de cache)
+        from stl import mesh
+        self.data = mesh.Mesh.from_file(path)
+        self.vertices, self.indices = self.deduplicate(self.data.vectors)
+        self.isLoaded = True
+        if self.use_cache:
+            try:
+                np.savez(cache, signature=signature, vertices=self.vertices, indices=self.indices)
+            except OSError:
+                print(f"   /!\\ Impossible d'écrire le cache du fichier STL : {cache}")
+
+    @staticmethod
+    def deduplicate(triangles):
+        """
+        Fusionne les sommets identiques d'une liste de triangles, pour obtenir un maillage indexé.
+
+        :param triangles: Coordonnées des sommets de chaque triangle.
+        :type triangles: 3D-array   (F*3*3 components)
+        :return: Sommets uniques et indices des sommets de chaque triangle.
+        :rtype: tuple   (2D-array (V*3), 2D-array (F*3))
+        """
+        vertices, inverse = np.unique(np.asarray(triangles).reshape(-1, 3), axis=0, return_inverse=True)
+        return vertices, inverse.reshape(-1, 3).astype(np.int32)
 
     def get_GC(self):
         return np.mean(self.vertices, axis=0)
 
-    def show(self):
+    def decimate(self, resolution):
+        """
+        Simplifie le maillage par regroupement des sommets sur une grille régulière : tous les sommets d'une même
+        cellule sont remplacés par leur barycentre, puis les triangles dégénérés ou en double sont supprimés.
+
+        :param resolution: Nombre de cellules de la grille selon la plus grande dimension du maillage.
+        :type resolution: int
+        :return: Sommets et indices du maillage simplifié.
+        :rtype: tuple   (2D-array (V*3), 2D-array (F*3))
+        """
+        low, high = self.vertices.min(axis=0), self.vertices.max(axis=0)
+        cell = max(np.max(high - low), 1e-12) / resolution
+        # Cellule de chaque sommet, puis numérotation des cellules occupées
+        keys = np.floor((self.vertices - low) / cell).astype(np.int64)
+        _, cluster = np.unique(keys, axis=0, return_inverse=True)
+        cluster = cluster.reshape(-1)
+        counts = np.bincount(cluster)
+        vertices = np.zeros((len(counts), 3))
+        np.add.at(vertices, cluster, self.vertices)
+        vertices /= counts[:, None]
+        # Nouveaux triangles, sans les triangles dégénérés (2 sommets dans la même cellule)
+        indices = cluster[self.indices]
+        valid = (indices[:, 0] != indices[:, 1]) & (indices[:, 1] != indices[:, 2]) & (indices[:, 0] != indices[:, 2])
+        indices = indices[valid]
+        # Suppression des triangles en double (mêmes sommets, quel que soit l'ordre)
+        _, first = np.unique(np.sort(indices, axis=1), axis=0, return_index=True)
+        indices = indices[np.sort(first)]
+        return vertices, indices.astype(np.int32)
+
+    def get_lod(self, lod=0):
+        """
+        Retourne le maillage au niveau de détail demandé (0 = complet). Les maillages simplifiés sont calculés une
+        seule fois puis conservés.
+
+        :param lod: Indice du niveau de détail dans LOD_RESOLUTIONS.
+        :type lod: int
+        :return: Sommets et indices du maillage.
+        :rtype: tuple   (2D-array (V*3), 2D-array (F*3))
+        """
+        resolution = LOD_RESOLUTIONS[min(lod, len(LOD_RESOLUTIONS) - 1)]
+        if resolution is None:
+            return self.vertices, self.indices
+        if lod not in self.lods:
+            self.lods[lod] = self.decimate(resolution)
+        return self.lods[lod]
+
+    def get_bvh(self, lod=0):
+        """
+        Retourne la hiérarchie de volumes englobants du maillage au niveau de détail demandé (construite une seule
+        fois), pour les calculs de distance et de contact.
+
+        :param lod: Indice du niveau de détail dans LOD_RESOLUTIONS (par défaut 0, maillage complet).
+        :type lod: int
+        :return: Hiérarchie de volumes englobants.
+        :rtype: Class BVH
+        """
+        if lod not in self.bvhs:
+            self.bvhs[lod] = BVH(*self.get_lod(lod))
+        return self.bvhs[lod]
+
+    def get_mass_properties(self, mass=None, density=1., scale=1.):
+        """
+        Calcule le volume, le centre de masse et le tenseur d'inertie (au centre de masse) du maillage, supposé fermé
+        et de densité uniforme. Le calcul est vectorisé sur l'ensemble des triangles : chaque triangle forme un
+        tétraèdre signé avec l'origine, dont on somme les contributions.
+
+        :param mass: Masse totale de l'objet (si précisée, remplace la densité).
+        :type mass: float
+        :param density: Densité de l'objet (par défaut 1).
+        :type density: float
+        :param scale: Facteur d'échelle appliqué aux coordonnées du maillage (par défaut 1).
+        :type scale: float
+        :return: - volume : Volume du maillage,
+                 - center : Centre de masse,
+                 - mass : Masse totale,
+                 - inertia : Tenseur d'inertie au centre de masse.
+        :rtype: dict
+        """
+        if self.properties is None:
+            a, b, c = (self.vertices[self.indices[:, k]].astype(float) for k in range(3))
+            # Volume signé des tétraèdres (origine, a, b, c)
+            vol = np.einsum('ij,ij->i', a, np.cross(b, c)) / 6
+            volume = np.sum(vol)
+            # Premier moment et covariance canonique des tétraèdres
+            s = a + b + c
+            first = np.sum(vol[:, None] * s, axis=0) / 4
+            cov = (np.einsum('n,ni,nj->ij', vol, a, a) + np.einsum('n,ni,nj->ij', vol, b, b)
+                   + np.einsum('n,ni,nj->ij', vol, c, c) + np.einsum('n,ni,nj->ij', vol, s, s)) / 20
+            self.properties = {'volume': volume, 'first': first, 'cov': cov}
+        volume, first, cov = self.properties['volume'], self.properties['first'], self.properties['cov']
+        if abs(volume) < 1e-12:
+            print(f"   /!\\ Volume nul pour le maillage {self.path}, les propriétés de masse sont invalides")
+            return None
+        if volume < 0:
+            # Maillage orienté vers l'intérieur : on inverse le signe de toutes les contributions
+            volume, first, cov = -volume, -first, -cov
+        center = first / volume
+        # Changement d'échelle (volume en l^3, covariance en l^5) et densité
+        volume, center, cov = volume * scale ** 3, center * scale, cov * scale ** 5
+        if not mass is None:
+            density = mass / volume
+        # Covariance ramenée au centre de masse, puis tenseur d'inertie
+        cov = density * (cov - volume * np.outer(center, center))
+        inertia = np.trace(cov) * np.eye(3) - cov
+        return {'volume': volume, 'center': center, 'mass': density * volume, 'inertia': inertia}
+
+    def show(self, lod=0):
         # Create a new plot
         figure = plt.figure()
         axes = figure.add_subplot(111, projection='3d')
 
         # Plot the mesh
-        axes.add_collection3d(Poly3DCollection(self.faces))
+        vertices, indices = self.get_lod(lod)
+        axes.add_collection3d(Poly3DCollection(vertices[indices]))
         # axes.scatter(self.vertices[:, 0], self.vertices[:, 1], self.vertices[:, 2])
         print(self.vertices)
 
@@ -45,10 +221,8 @@ class STLReader:
         axes.set_zlabel('Z')
 
         # # Auto scale to the mesh size
-        scale = self.data.points.flatten()
+        scale = vertices.flatten()
         axes.auto_scale_xyz(scale, scale, scale)
 
         # Show the plot
         plt.show()
-
-
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from classes.tools import intervals
+"""
+Visibilité des satellites depuis les stations sol d'une planète : élévation sur des trajectoires complètes, et
+fenêtres d'accès (lever / coucher) pour toutes les paires station * satellite.
+"""
+
+
+def sin_elevation(positions, stations, up):
+    """
+    Calcule le sinus de l'élévation de chaque satellite au-dessus de l'horizon local de chaque station, à chaque
+    instant. Le calcul est réalisé par produits matriciels groupés, sans former les vecteurs station -> satellite.
+
+    :param positions: Positions des satellites, relatives au centre de la planète.
+    :type positions: 3D-array   (T*N*3 components)
+    :param stations: Positions des stations, relatives au centre de la planète.
+    :type stations: 3D-array   (T*S*3 components)
+    :param up: Verticales locales des stations.
+    :type up: 3D-array   (T*S*3 components)
+    :return: Sinus des élévations.
+    :rtype: 3D-array   (T*N*S components)
+    """
+    # d = p - s : d.up = p.up - s.up, et |d|^2 = |p|^2 - 2 p.s + |s|^2
+    d_up = positions @ up.transpose(0, 2, 1)
+    d_up -= np.sum(stations * up, axis=-1)[:, None, :]
+    d2 = positions @ stations.transpose(0, 2, 1)
+    d2 *= -2
+    d2 += np.sum(positions ** 2, axis=-1)[..., None]
+    d2 += np.sum(stations ** 2, axis=-1)[:, None, :]
+    with np.errstate(invalid='ignore'):
+        np.sqrt(d2, out=d2)
+        d_up /= d2
+    return d_up
+
+
+def elevation(positions, stations, up):
+    """
+    Calcule l'élévation de chaque satellite au-dessus de l'horizon local de chaque station, à chaque instant.
+
+    :param positions: Positions des satellites, relatives au centre de la planète.
+    :type positions: 3D-array   (T*N*3 components)
+    :param stations: Positions des stations, relatives au centre de la planète.
+    :type stations: 3D-array   (T*S*3 components)
+    :param up: Verticales locales des stations.
+    :type up: 3D-array   (T*S*3 components)
+    :return: Élévations (en rad).
+    :rtype: 3D-array   (T*N*S components)
+    """
+    return np.arcsin(np.clip(sin_elevation(positions, stations, up), -1, 1))
+
+
+def access_windows(planet, times, positions, names=None, stations=None, chunk=64):
+    """
+    Calcule les fenêtres d'accès de toutes les paires station * satellite sur des trajectoires enregistrées.
+    Les trajectoires sont traitées par blocs d'instants ; les instants de lever et de coucher sont encadrés par les
+    changements de signe de (sin(élévation) - sin(élévation minimale)), puis interpolés linéairement (voir
+    tools.intervals).
+
+    :param planet: Planète portant les stations.
+    :type planet: Class Planet
+    :param times: Instants des trajectoires (en sec).
+    :type times: 1D-array   (T components)
+    :param positions: Positions des satellites dans le repère inertiel (NaN si absent).
+    :type positions: 3D-array   (T*N*3 components)
+    :param names: Noms des satellites (par défaut leurs indices).
+    :type names: list[string]
+    :param stations: Noms des stations (par défaut toutes celles de la planète).
+    :type stations: list[string]
+    :param chunk: Nombre d'instants traités par bloc (par défaut 64).
+    :type chunk: int
+    :return: Une ligne par fenêtre : station, satellite, rise, set, duration.
+    :rtype: DataFrame   (from pandas)
+    """
+    times = np.asarray(times, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    stations = list(planet.stations.keys()) if stations is None else list(stations)
+    names = list(range(positions.shape[1])) if names is None else list(names)
+    n_sat, n_sta = positions.shape[1], len(stations)
+    if len(times) == 0 or n_sat == 0 or n_sta == 0:
+        return pd.DataFrame(columns=['station', 'satellite', 'rise', 'set', 'duration'])
+    # Positions relatives au centre de la planète à chaque instant (planète éventuellement en mouvement)
+    positions = positions - np.broadcast_to(planet.get_state(times)[0], (len(times), 3))[:, None, :]
+
+    missing = np.isnan(positions).any()
+
+    def margins():
+        # Marge (sin(élévation) - sin(élévation minimale)) par bloc d'instants, une colonne par paire
+        for start in range(0, len(times), chunk):
+            t = times[start:start + chunk]
+            sta, up, min_elevation = planet.get_stations(t, names=stations)
+            margin = sin_elevation(positions[start:start + chunk], sta, up)
+            margin -= np.sin(min_elevation)
+            if missing:
+                margin[np.isnan(margin)] = -np.inf
+            yield t, margin.reshape(len(t), -1)
+
+    pair, rise, set_ = intervals(margins())
+    sat, station = np.divmod(pair, n_sta)
+    return pd.DataFrame({'station': np.array(stations, dtype=object)[station],
+                         'satellite': np.array(names, dtype=object)[sat],
+                         'rise': rise, 'set': set_, 'duration': set_ - rise})
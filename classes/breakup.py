@@ -0,0 +1,115 @@
+import numpy as np
+"""
+Fragmentations (explosions et collisions) inspirées du modèle standard de fragmentation de la NASA : distribution
+des tailles caractéristiques, des rapports surface / masse et des incréments de vitesse des fragments, tirés par lots.
+"""
+
+# Seuil de masse spécifique d'une collision catastrophique (en J/kg : 40 J/g)
+CATASTROPHIC_ENERGY = 40000.
+
+
+def fragment_count(lc, kind='explosion', mass=0., scale=1.):
+    """
+    Calcule le nombre de fragments de taille caractéristique supérieure à lc.
+
+    :param lc: Taille caractéristique minimale (en m).
+    :type lc: float or 1D-array
+    :param kind: Type de fragmentation : 'explosion' (par défaut) ou 'collision'.
+    :type kind: string
+    :param mass: Masse de référence d'une collision (en kg, voir breakup_fragments).
+    :type mass: float
+    :param scale: Facteur d'échelle d'une explosion (1 par défaut).
+    :type scale: float
+    :return: Nombre de fragments.
+    :rtype: float or 1D-array
+    """
+    if kind == 'collision':
+        return 0.1 * mass ** 0.75 * np.asarray(lc, dtype=float) ** -1.71
+    return 6 * scale * np.asarray(lc, dtype=float) ** -1.6
+
+
+def area_to_mass(lc, rng):
+    """
+    Tire le rapport surface / masse des fragments de chaque taille : loi normale (en log10) pour les petits
+    fragments, mélange de deux lois normales au-delà de 11 cm (débris de satellites).
+
+    :param lc: Tailles caractéristiques (en m).
+    :type lc: 1D-array
+    :param rng: Générateur aléatoire.
+    :type rng: numpy.random.Generator
+    :return: Rapports surface / masse (en m^2/kg).
+    :rtype: 1D-array
+    """
+    lam = np.log10(lc)
+    # Petits fragments
+    mu = np.where(lam <= -1.75, -0.3, np.where(lam < -1.25, -0.3 - 1.4 * (lam + 1.75), -1.0))
+    sigma = np.where(lam <= -3.5, 0.2, 0.2 + 0.1333 * (lam + 3.5))
+    small = rng.normal(mu, sigma)
+    # Grands fragments (mélange de deux lois)
+    alpha = np.clip(0.3 + 0.4 * (lam + 1.2), 0, 1)
+    alpha = np.where(lam <= -1.95, 0., np.where(lam >= 0.55, 1., alpha))
+    mu_1 = np.where(lam <= -1.1, -0.6, np.where(lam < 0, -0.6 - 0.318 * (lam + 1.1), -0.95))
+    sigma_1 = np.where(lam <= -1.3, 0.1, np.where(lam < -0.3, 0.1 + 0.2 * (lam + 1.3), 0.3))
+    mu_2 = np.where(lam <= -0.7, -1.2, np.where(lam < -0.1, -1.2 - 1.333 * (lam + 0.7), -2.0))
+    sigma_2 = np.where(lam <= -0.5, 0.5, np.where(lam < -0.3, 0.5 - (lam + 0.5), 0.3))
+    first = rng.random(len(lc)) < alpha
+    large = np.where(first, rng.normal(mu_1, sigma_1), rng.normal(mu_2, sigma_2))
+    return 10 ** np.where(lc < 0.11, small, large)
+
+
+def breakup_fragments(mass, x, v, kind='explosion', lc_min=0.1, lc_max=1., scale=1., projectile_mass=0.,
+                      relative_speed=0., max_count=None, rng=None):
+    """
+    Génère, par lots, les fragments d'une explosion ou d'une collision : tailles caractéristiques tirées selon la
+    loi de puissance du nombre de fragments, rapports surface / masse, surfaces et masses, puis incréments de vitesse
+    de directions isotropes (loi log-normale dépendant du rapport surface / masse).
+
+    :param mass: Masse de l'objet fragmenté (en kg).
+    :type mass: float
+    :param x: Position de l'objet fragmenté.
+    :type x: 1D-array   (3 components)
+    :param v: Vitesse de l'objet fragmenté.
+    :type v: 1D-array   (3 components)
+    :param kind: Type de fragmentation : 'explosion' (par défaut) ou 'collision'.
+    :type kind: string
+    :param lc_min: Taille caractéristique minimale des fragments (en m, par défaut 10 cm).
+    :type lc_min: float
+    :param lc_max: Taille caractéristique maximale des fragments (en m, par défaut 1 m).
+    :type lc_max: float
+    :param scale: Facteur d'échelle d'une explosion (1 par défaut).
+    :type scale: float
+    :param projectile_mass: Masse du projectile d'une collision (en kg).
+    :type projectile_mass: float
+    :param relative_speed: Vitesse relative d'une collision (en m/s).
+    :type relative_speed: float
+    :param max_count: Nombre maximal de fragments (par défaut None : pas de limite).
+    :type max_count: int
+    :param rng: Générateur aléatoire (par défaut un nouveau générateur).
+    :type rng: numpy.random.Generator
+    :return: Fragments : masses, tailles (cubes de côté lc), positions, vitesses, tailles caractéristiques et
+             rapports surface / masse.
+    :rtype: dict
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    reference = 0.
+    if kind == 'collision':
+        # Collision catastrophique : masse totale ; sinon masse du projectile * vitesse relative (en km/s) au carré
+        catastrophic = 0.5 * projectile_mass * relative_speed ** 2 / mass >= CATASTROPHIC_ENERGY
+        reference = mass + projectile_mass if catastrophic else projectile_mass * (relative_speed / 1000) ** 2
+    count = int(fragment_count(lc_min, kind, reference, scale) - fragment_count(lc_max, kind, reference, scale))
+    count = count if max_count is None else min(count, max_count)
+    # Tailles : inversion de la fonction de répartition de la loi de puissance, tronquée à [lc_min, lc_max]
+    beta = 1.71 if kind == 'collision' else 1.6
+    u = rng.random(count)
+    lc = lc_min * (1 - u * (1 - (lc_min / lc_max) ** beta)) ** (-1 / beta)
+    am = area_to_mass(lc, rng)
+    area = np.where(lc < 0.00167, 0.540424 * lc ** 2, 0.556945 * lc ** 2.0047077)
+    # Incréments de vitesse (en m/s) : log10(dv) de loi normale, direction isotrope
+    chi = np.log10(am)
+    mu = 0.9 * chi + 2.9 if kind == 'collision' else 0.2 * chi + 1.85
+    dv = 10 ** rng.normal(mu, 0.4)
+    direction = rng.normal(size=(count, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    return {'mass': area / am, 'size': np.repeat(lc[:, None], 3, axis=1),
+            'x': np.tile(np.asarray(x, dtype=float), (count, 1)),
+            'v': np.asarray(v, dtype=float) + dv[:, None] * direction, 'lc': lc, 'am': am}
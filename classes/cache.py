@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+import numpy as np
+"""
+Cache des résultats de simulation, adressé par contenu : la clé est l'empreinte des données du scénario (ex: fichier
+YAML lu par LecteurYAML), du script qui construit le scénario, de la version du code et des réglages de l'intégrateur.
+Les résultats enregistrés sont conservés sur disque, et les moins récemment utilisés sont supprimés au-delà d'une
+taille maximale.
+"""
+
+# Attributs restaurés en fin de simulation, pour chaque satellite et chaque flotte
+SATELLITE_STATE = ['x', 'v', 'a', 'x_ang', 'v_ang', 'ux', 'uy', 'uz', 'alive', 'islanded', 'istakingoff']
+FLEET_STATE = ['x', 'v', 'a', 'x_ang', 'v_ang', 'axes', 'alive', 'islanded', 'istakingoff', 'power']
+
+
+def code_version(directory=None):
+    """
+    Calcule l'empreinte du code de la simulation (contenu des modules du dossier classes) : toute modification du
+    code invalide les résultats enregistrés.
+
+    :param directory: Dossier des modules (par défaut celui de ce module).
+    :type directory: string
+    :return: Empreinte hexadécimale.
+    :rtype: string
+    """
+    directory = os.path.dirname(os.path.abspath(__file__)) if directory is None else directory
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py'):
+            digest.update(name.encode())
+            with open(os.path.join(directory, name), 'rb') as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+
+def script_version(path=None):
+    """
+    Calcule l'empreinte du script qui construit le scénario (planètes, satellites, propulseurs, contrôles, ...) :
+    toute modification du script invalide les résultats enregistrés.
+
+    :param path: Chemin du script (par défaut celui du script principal, '__main__').
+    :type path: string
+    :return: Empreinte hexadécimale, None si le script est inconnu (ex: session interactive).
+    :rtype: string
+    """
+    path = getattr(sys.modules.get('__main__'), '__file__', None) if path is None else path
+    if path is None or not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def canonical_hash(*items):
+    """
+    Calcule l'empreinte canonique de données lues (dictionnaires, listes, nombres, chaînes) : les clés sont triées,
+    et un entier et le flottant de même valeur ont la même empreinte.
+
+    :param items: Données à résumer.
+    :return: Empreinte hexadécimale.
+    :rtype: string
+    """
+    def canonical(value):
+        if isinstance(value, dict):
+            return {str(k): canonical(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return [canonical(v) for v in value]
+        if isinstance(value, (bool, np.bool_)) or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float, np.number)):
+            return repr(float(value))
+        return repr(value)
+    text = json.dumps([canonical(item) for item in items], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, directory='.cache', max_size=500 * 10**6):
+        """
+        Initialise le cache des résultats de simulation.
+
+        :param directory: Dossier des résultats enregistrés (créé si besoin, par défaut '.cache').
+        :type directory: string
+        :param max_size: Taille maximale du cache sur le disque (en octets, par défaut 500 Mo).
+        :type max_size: int
+        """
+        self.directory, self.max_size = directory, max_size
+        self.version = code_version()
+
+    def key(self, data, settings=None, script=None):
+        """
+        Calcule la clé d'un scénario. Les valeurs du scénario qui ne sont ni dans data, ni dans le script (ex:
+        scénario construit par une fonction d'un autre module) doivent être ajoutées à settings.
+
+        :param data: Données du scénario (ex: dictionnaire lu par LecteurYAML.read_yaml).
+        :type data: dict
+        :param settings: Réglages de la simulation (pas de temps, intégrateur, durées, ...).
+        :type settings: dict
+        :param script: Chemin du script qui construit le scénario (par défaut le script principal).
+        :type script: string
+        :return: Clé du scénario.
+        :rtype: string
+        """
+        return canonical_hash(data, {} if settings is None else settings, script_version(script), self.version)
+
+    def path(self, key):
+        """
+        Retourne le chemin du fichier de résultats d'une clé.
+
+        :param key: Clé du scénario.
+        :type key: string
+        :rtype: string
+        """
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def store(self, key, simulator):
+        """
+        Enregistre les résultats d'une simulation terminée (trajectoires, orientations, états finaux), puis supprime
+        les résultats les moins récemment utilisés si la taille maximale est dépassée.
+
+        :param key: Clé du scénario.
+        :type key: string
+        :param simulator: Simulateur dont la simulation est terminée.
+        :type simulator: Class Simulator
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # La sauvegarde est enregistrée telle quelle (historique compact conservé, voir Saver.set_storage), après
+        # conversion des lignes en attente
+        if simulator.saves.compact is None:
+            simulator.saves.df
+        result = {'saves': simulator.saves, 'saves_u': simulator.saves_u, 'time': simulator.time,
+                  'iteration': simulator.iteration,
+                  'satellites': {sat.name: {k: getattr(sat, k) for k in SATELLITE_STATE}
+                                 for sat in simulator.satellites},
+                  'fleets': {fleet.name: {k: getattr(fleet, k) for k in FLEET_STATE} for fleet in simulator.fleets}}
+        # Écriture atomique : un fichier partiel n'est jamais lu
+        tmp = self.path(key) + '.tmp'
+        with open(tmp, 'wb') as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path(key))
+        self.evict()
+
+    def restore(self, key, simulator):
+        """
+        Recharge les résultats d'un scénario déjà simulé dans un simulateur construit à l'identique (mêmes objets),
+        sans relancer la simulation.
+
+        :param key: Clé du scénario.
+        :type key: string
+        :param simulator: Simulateur construit à partir du scénario.
+        :type simulator: Class Simulator
+        :return: True si les résultats ont été rechargés, False s'ils ne sont pas dans le cache.
+        :rtype: boolean
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                result = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        # Date d'utilisation, pour la suppression des résultats les moins récemment utilisés
+        os.utime(path)
+        simulator.saves, simulator.saves_u = result['saves'], result['saves_u']
+        simulator.time, simulator.iteration = result['time'], result['iteration']
+        for entities, states in [(simulator.satellites, result['satellites']), (simulator.fleets, result['fleets'])]:
+            for ent in entities:
+                for k, value in states.get(ent.name, {}).items():
+                    setattr(ent, k, value)
+        for fleet in simulator.fleets:
+            fleet.n_alive = int(np.sum(fleet.alive))
+        print(f"\n > Results loaded from cache ({key[:12]})")
+        return True
+
+    def evict(self):
+        """
+        Supprime les résultats les moins récemment utilisés, jusqu'à ce que la taille du cache soit inférieure à la
+        taille maximale.
+        """
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.pkl')]
+        files = sorted(files, key=os.path.getmtime)
+        size = sum(os.path.getsize(path) for path in files)
+        while files and size > self.max_size:
+            path = files.pop(0)
+            size -= os.path.getsize(path)
+            os.remove(path)
+
+    def clear(self):
+        """
+        Supprime tous les résultats enregistrés.
+        """
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.directory, name))
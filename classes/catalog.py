@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from classes.elements import keplerian_to_cartesian
+"""
+Chargement en masse de scénarios : catalogues d'états initiaux (tableaux ou fichier CSV lu par blocs) et
+constellations de Walker, convertis directement en tableaux d'états (voir Class Fleet).
+"""
+
+# Colonnes d'un catalogue (mêmes noms que les colonnes de la Class Saver)
+CATALOG_COLUMNS = ['name', 'mass', 'size1', 'size2', 'size3', 'x1', 'x2', 'x3', 'v1', 'v2', 'v3']
+
+
+def read_catalog(path, chunksize=100000, mass=1000., size=(1, 1, 1)):
+    """
+    Lit un catalogue d'états initiaux au format CSV, par blocs de lignes (le fichier n'est jamais converti ligne par
+    ligne). Colonnes obligatoires : x1, x2, x3 ; colonnes facultatives : name, mass, size1, size2, size3, v1, v2, v3.
+
+    :param path: Chemin du fichier CSV.
+    :type path: string
+    :param chunksize: Nombre de lignes lues par bloc (par défaut 100000).
+    :type chunksize: int
+    :param mass: Masse des objets si la colonne 'mass' est absente (par défaut 1000).
+    :type mass: float
+    :param size: Taille des objets si les colonnes 'size1', 'size2' et 'size3' sont absentes (par défaut (1, 1, 1)).
+    :type size: 1D-array   (3 components)
+    :return: Catalogue : noms (None si absents), masses, tailles, positions et vitesses.
+    :rtype: dict
+    """
+    blocks = {key: [] for key in ['name', 'mass', 'size', 'x', 'v']}
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        n = len(chunk)
+        blocks['name'].append(chunk['name'].astype(str).to_numpy() if 'name' in chunk else None)
+        blocks['mass'].append(chunk['mass'].to_numpy(float) if 'mass' in chunk else np.full(n, float(mass)))
+        blocks['size'].append(chunk[['size1', 'size2', 'size3']].to_numpy(float) if 'size1' in chunk else
+                              np.broadcast_to(np.asarray(size, dtype=float), (n, 3)))
+        blocks['x'].append(chunk[['x1', 'x2', 'x3']].to_numpy(float))
+        blocks['v'].append(chunk[['v1', 'v2', 'v3']].to_numpy(float) if 'v1' in chunk else np.zeros((n, 3)))
+    if not blocks['x']:
+        return {'names': None, 'mass': np.zeros(0), 'size': np.zeros((0, 3)), 'x': np.zeros((0, 3)),
+                'v': np.zeros((0, 3))}
+    names = None if blocks['name'][0] is None else list(np.concatenate(blocks['name']))
+    return {'names': names, 'mass': np.concatenate(blocks['mass']), 'size': np.concatenate(blocks['size']),
+            'x': np.concatenate(blocks['x']), 'v': np.concatenate(blocks['v'])}
+
+
+def walker_states(total, planes, phasing, radius, inclination, mu, raan_0=0., spread=360.):
+    """
+    Calcule les états initiaux d'une constellation de Walker i: total/planes/phasing (orbites circulaires) : les
+    plans sont régulièrement répartis en longitude du noeud ascendant, les satellites régulièrement répartis dans
+    chaque plan, et décalés de phasing * 360 / total degrés d'un plan au suivant.
+
+    :param total: Nombre total de satellites.
+    :type total: int
+    :param planes: Nombre de plans orbitaux (diviseur de total).
+    :type planes: int
+    :param phasing: Facteur de phasage (entre 0 et planes - 1).
+    :type phasing: int
+    :param radius: Rayon des orbites (en m).
+    :type radius: float
+    :param inclination: Inclinaison des orbites (en degrés).
+    :type inclination: float
+    :param mu: Paramètre gravitationnel de l'astre (G * M).
+    :type mu: float
+    :param raan_0: Longitude du noeud ascendant du premier plan (en degrés, par défaut 0).
+    :type raan_0: float
+    :param spread: Étendue des noeuds ascendants (en degrés, par défaut 360 : Walker delta, 180 : Walker star).
+    :type spread: float
+    :return: Positions et vitesses, relatives au centre de l'astre, et indices (plan, rang dans le plan).
+    :rtype: tuple   (2 * 2D-array (N*3 components), 2 * 1D-array (N components))
+    """
+    if total % planes != 0:
+        raise ValueError(f"the number of satellites ({total}) must be a multiple of the number of planes ({planes})")
+    per_plane = total // planes
+    plane, rank = np.divmod(np.arange(total), per_plane)
+    raan = np.radians(raan_0) + np.radians(spread) / planes * plane
+    nu = 2 * np.pi / per_plane * rank + 2 * np.pi * phasing / total * plane
+    elements = np.column_stack([np.full(total, float(radius)), np.zeros(total), np.full(total, np.radians(inclination)),
+                                raan, np.zeros(total), nu])
+    states = keplerian_to_cartesian(elements, mu)
+    return states[:, :3], states[:, 3:], plane, rank
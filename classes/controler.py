@@ -1,11 +1,286 @@
 import numpy as np
 from classes.tools import normalize, sign
+from classes.lambert import lambert
+from classes.soi import G, kepler_propagate
 from math import ceil
 """
 Classe Controler, intégré à un satellite, afin d'effectuer des instructions demandés dans l'utilisateur et donc de
 réaliser les bonnes commandes pour guider le satellite à la cible désiré.
 """
 
+# Directions des propulseurs d'une flotte (main, left, right, brake), dans la base du satellite
+THRUSTER_DIRECTIONS = np.array([[1, 0, 0], [0, -1, 0], [0, 1, 0], [1, 0, 0]])
+# Réglages par défaut de la manoeuvre "rejoindre l'orbite GEO" (voir Controler.geo) : accélérations radiales des
+# phases 1 et 2 (en fraction du poids), passage de la phase 1 à la phase 2 (fraction du rayon visé), et impulsion de
+# rotation (rapportée à la puissance du propulseur latéral nécessaire pour 1 rad/s en un pas de temps)
+GEO_SETTINGS = {'gamma_1': 0.025, 'gamma_2': 0.02, 'switch_step': 0.80, 'rot_pulse': 0.0015}
+# Réglages par défaut du transfert de Lambert (voir Controler.lambert) : nombre maximal de corrections de
+# trajectoire, écart de vitesse en dessous duquel la trajectoire n'est pas corrigée (en m/s), et nombre minimal
+# d'itérations avant l'arrivée pour prévoir une nouvelle vérification
+LAMBERT_SETTINGS = {'corrections': 6, 'precision': 2., 'coast': 20}
+# Nombre maximal d'itérations pour orienter le satellite avant une poussée (voir Controler.pointing)
+MAX_POINTING_STEPS = 10000
+
+
+class BurnPlan:
+
+    def __init__(self):
+        """
+        Initialise un plan de poussée : liste explicite des allumages de propulseurs (instant de début, durée,
+        indices des propulseurs, puissances) et des instants de vérification prévus. Entre deux bornes du plan, le
+        contrôleur n'a rien à évaluer.
+        """
+        self.burns = []     # Allumages : {'name', 'start', 'duration', 'stop', 'thrusters', 'power', 'active'}
+        self.checks = []    # Instants de vérification supplémentaires (ex: arrivée à l'apogée)
+
+    def add(self, name, start, duration, stop, thrusters, power):
+        """
+        Ajoute un allumage au plan.
+
+        :param name: Nom de l'allumage (pour savoir s'il est terminé).
+        :type name: string
+        :param start: Instant d'allumage (en sec).
+        :type start: float
+        :param duration: Durée de poussée effective (en sec).
+        :type duration: float
+        :param stop: Instant de mise à jour du contrôleur auquel les propulseurs sont éteints (en sec).
+        :type stop: float
+        :param thrusters: Indices des propulseurs concernés (dans Satellite.thrusters).
+        :type thrusters: list[int]
+        :param power: Puissance de chaque propulseur (de 0 à 1).
+        :type power: list[float]
+        """
+        self.burns.append({'name': name, 'start': start, 'duration': duration, 'stop': stop,
+                           'thrusters': list(thrusters), 'power': list(power), 'active': False})
+
+    def apply(self, sat, time, tolerance=0.):
+        """
+        Allume les propulseurs dont l'allumage a commencé, et éteint ceux dont l'allumage est terminé.
+
+        :param sat: Satellite auquel s'applique le plan.
+        :type sat: Class Satellite
+        :param time: Instant actuel de la simulation (en sec).
+        :type time: float
+        :param tolerance: Tolérance sur la comparaison des instants (en sec).
+        :type tolerance: float
+        """
+        for burn in list(self.burns):
+            if time + tolerance >= burn['stop']:
+                for i in burn['thrusters']:
+                    sat.thrusters[i].off()
+                self.burns.remove(burn)
+            elif not burn['active'] and time + tolerance >= burn['start']:
+                for i, power in zip(burn['thrusters'], burn['power']):
+                    sat.thrusters[i].on(power=power)
+                burn['active'] = True
+        # Les vérifications ne sont retirées qu'une fois l'instant effectivement atteint
+        self.checks = [check for check in self.checks if check > time]
+
+    def is_done(self, name):
+        """
+        Indique si l'allumage demandé est terminé (ou absent du plan).
+
+        :param name: Nom de l'allumage.
+        :type name: string
+        :return: True si aucun allumage de ce nom ne reste dans le plan.
+        :rtype: boolean
+        """
+        return all(burn['name'] != name for burn in self.burns)
+
+    def next_check(self):
+        """
+        Retourne le prochain instant auquel le plan nécessite une mise à jour du contrôleur.
+
+        :return: Instant de la prochaine borne du plan (en sec), inf si le plan est vide.
+        :rtype: float
+        """
+        times = [burn['stop'] if burn['active'] else burn['start'] for burn in self.burns] + self.checks
+        return min(times, default=np.inf)
+
+
+def thruster_specs(sat):
+    """
+    Retourne les caractéristiques des propulseurs d'un satellite utiles à la planification (copie indépendante du
+    satellite, transmissible à un processus de planification).
+
+    :param sat: Satellite concerné.
+    :type sat: Class Satellite
+    :return: (nom, poussée maximale, direction, couple maximal) de chaque propulseur.
+    :rtype: list[tuple]
+    """
+    return [(thr.name, thr.thrust_max, np.array(thr.direction), np.array(thr.torque_max)) for thr in sat.thrusters]
+
+
+def speed_command(speed, mass, dt, thrusters, direction=(1, 0, 0)):
+    """
+    Retourne la puissance (de 0% à 100%) à appliquer au propulseur précisé en sortie, durant n itérations de dt sec,
+    afin d'augmenter la vitesse de speed dans la direction souhaitée (voir Controler.power_for_speed).
+
+    :param speed: Écart de vitesse à ajouter (speed = v_fin - v_init).
+    :type speed: float
+    :param mass: Masse du satellite (en kg).
+    :type mass: float
+    :param dt: Pas de temps de la simulation (en sec).
+    :type dt: float
+    :param thrusters: Caractéristiques des propulseurs (voir thruster_specs).
+    :type thrusters: list[tuple]
+    :param direction: Vecteur directeur normalisé de la direction de la vitesse souhaitée.
+    :type direction: 1D-array (3 dimensions)
+    :return: {'power', 'n', 'thruster'}, ou None si aucun propulseur ne convient.
+    :rtype: dict
+    """
+    # Coefficient nécéssaire pour le choix du thruster (vérifier sa  direction)
+    power = speed * mass / dt
+    if power == 0:
+        return {'power': 0, 'n': 1, 'thruster': 'main'}
+    # Essaie de tous les propulseurs :
+    for name, thrust_max, thr_direction, _ in thrusters:
+        T = thrust_max * np.dot(thr_direction, direction)  # Force disponnible dans l'axe voulu
+        if T != 0:  # Évite la division par 0
+            pow = power / T
+            # Si le nombre d'itération n'excède pas les 20 (pour se rapprocher de l'instantané). Une puissance
+            # négative (propulseur orienté à l'opposé de l'écart demandé) n'est pas réalisable
+            if 0 < pow <= 20:
+                n = ceil(pow)
+                return {'power': pow / n, 'n': n, 'thruster': name}
+    # Si aucun propulseur ne convient, on ne peux pas réaliser la manoeuvre
+    return None
+
+
+def rotation_command(period, inertia, dt, thrusters, axe=2):
+    """
+    Retourne la puissance (de 0% à 100%) à appliquer au propulseur précisé en sortie, durant n itérations de dt sec,
+    afin de tourner avec la période souhaitée autour de l'axe désiré (voir Controler.power_for_rotation).
+
+    :param period: Durée de la révolution du satellite (en sec, négative pour une rotation en sens horaire).
+    :type period: float
+    :param inertia: Moments d'inertie du satellite.
+    :type inertia: 1D-array   (3 components)
+    :param dt: Pas de temps de la simulation (en sec).
+    :type dt: float
+    :param thrusters: Caractéristiques des propulseurs (voir thruster_specs).
+    :type thrusters: list[tuple]
+    :param axe: Indice de l'axe de rotation
+    :type axe: int   (0, 1 ou 2)
+    :return: {'power', 'n', 'thruster'}, ou None si aucun propulseur ne convient.
+    :rtype: dict
+    """
+    # Coefficient nécéssaire pour le choix du thruster (vérifier sa  direction)
+    power = 2*np.pi * inertia[axe] / (period * dt)
+    if power == 0:
+        return {'power': 0, 'n': 1, 'thruster': 'main'}  # Instructions inutiles, pour ne pas faire crash le sat
+    # Essaie de tous les propulseurs :
+    for name, _, _, torque_max in thrusters:
+        T = torque_max[axe]  # Couple disponnible dans l'axe voulu
+        if T != 0:  # Évite la division par 0
+            if sign(power) == sign(T):
+                power /= torque_max[axe]
+                n = ceil(power)
+                return {'power': power / n, 'n': n, 'thruster': name}
+    # Si aucun propulseur ne convient, on ne peux pas réaliser la manoeuvre
+    return None
+
+
+def spin_command(delta, inertia, dt, thrusters, axe=2):
+    """
+    Retourne la puissance (de 0% à 100%) à appliquer au propulseur précisé en sortie, durant une seule itération de
+    dt sec, afin de modifier la vitesse angulaire de delta autour de l'axe désiré.
+
+    :param delta: Écart de vitesse angulaire à ajouter (en rad/s).
+    :type delta: float
+    :param inertia: Moments d'inertie du satellite.
+    :type inertia: 1D-array   (3 components)
+    :param dt: Pas de temps de la simulation (en sec).
+    :type dt: float
+    :param thrusters: Caractéristiques des propulseurs (voir thruster_specs).
+    :type thrusters: list[tuple]
+    :param axe: Indice de l'axe de rotation
+    :type axe: int   (0, 1 ou 2)
+    :return: {'power', 'n', 'thruster'}, ou None si aucun propulseur ne peut le réaliser en une itération.
+    :rtype: dict
+    """
+    power = delta * inertia[axe] / dt
+    if power == 0:
+        return {'power': 0, 'n': 1, 'thruster': 'main'}  # Instructions inutiles, pour ne pas faire crash le sat
+    for name, _, _, torque_max in thrusters:
+        T = torque_max[axe]  # Couple disponnible dans l'axe voulu
+        if T != 0 and sign(power) == sign(T) and power / T <= 1:
+            return {'power': power / T, 'n': 1, 'thruster': name}
+    return None
+
+
+def homhann_transfert_time(r1, r2, G, mass):
+    """
+    Calcule le temps nécessaire pour réaliser un transfert de Hohmann (demi-elliptique).
+
+    :param r1: Rayon GÉO de départ (en m)
+    :type r1: float
+    :param r2: Rayon GÉO d'arrivée (en m)
+    :type r2:  float
+    :param G: Constante de gravitation universelle.
+    :type G: float
+    :param mass: Masse de l'astre (en kg).
+    :type mass: float
+    :return: Temps de transfert (demi-période elliptique) (en sec)
+    :rtype: float
+    """
+    return 1 / 2 * np.sqrt(4 * np.pi ** 2 / G / mass * ((r1 + r2) / 2) ** 3)
+
+
+def geo_plan(state):
+    """
+    Calcule les instructions pour rejoindre l'orbite géo-stationnaire (voir Controler.geo), à partir d'un instantané
+    de l'état du satellite (voir Controler.snapshot). Fonction de niveau module, exécutable par un processus de
+    planification.
+
+    :param state: Instantané du satellite, rayon souhaité ('radius'), et réglages facultatifs de la manoeuvre
+                  (voir GEO_SETTINGS).
+    :type state: dict
+    :return: État de l'instruction reach_geo.
+    :rtype: dict
+    """
+    settings = {key: state.get(key, value) for key, value in GEO_SETTINGS.items()}
+    # Coefficient pour le calcul de l'impulsion latérale (rotation), dépendamment des caractéristiques du satellite
+    coef = 1 / state['dt'] * (state['inertia'][2] / state['thrusters'][state['names'].index('left')][3][2])
+    # État de l'instruction (étape, rayon souhaité, coefficients gamma, passage phase 1 vers phase 2, erreurs_max)
+    return {'radius': state['radius'], 'step': 'approach', 'switch_step': settings['switch_step'],
+            'gamma_1': settings['gamma_1'], 'gamma_2': settings['gamma_2'],
+            'speed': np.sqrt(state['G'] * state['planet_mass'] / state['radius']),
+            'rot_pulse': settings['rot_pulse'] * coef,
+            'epsilon': {'radius': 0.02, 'speed': 0.02, 'angle': 0.02}}
+
+
+def homhann_plan(state):
+    """
+    Calcule les instructions d'un transfert d'Hohmann (voir Controler.homhann), à partir d'un instantané de l'état
+    du satellite (voir Controler.snapshot). Fonction de niveau module, exécutable par un processus de planification.
+
+    :param state: Instantané du satellite, rayon d'arrivée ('radius') et période orbitale actuelle ('period').
+    :type state: dict
+    :return: Instructions de poussée ({'power', 'n', 'thruster', 'time', 'radius', 'rot', 'rot_power'}), ou None si
+             le transfert n'est pas réalisable.
+    :rtype: dict
+    """
+    # Rayon de départ et d'arrivée
+    r1, r2 = state['r'], state['radius']
+    G, mass, dt, thrusters = state['G'], state['planet_mass'], state['dt'], state['thrusters']
+    # Vitesses au départ et à l'arrivée (pour rejoindre et quitter l'orbite elliptique)
+    v = np.sqrt(np.dot(2 * G * mass, np.array([1 / r1, 1 / r2]) - 1 / (r1 + r2)))
+    # Calcul des puissances nécéssaires au delta de vitesse (départ)
+    plan = speed_command(v[0] - state['speed'], state['mass'], dt, thrusters)
+    # Si la mise en accélération n'est pas possible (dans un lapse de temps maximal)
+    if plan is None:
+        return None
+    # Calcul du temps de transfert
+    plan['time'], plan['radius'] = homhann_transfert_time(r1=r1, r2=r2, G=G, mass=mass), r2
+    # Calcul de la puissance nécéssaire à la rotation :
+    plan['rot'] = rotation_command(-2 * plan['time'], state['inertia'], dt, thrusters)
+    if plan['rot'] is None:
+        return None
+    # Puissance "déjà comprise dans la alpha_point", donc à ne pas ajouter
+    plan['rot_power'] = rotation_command(state['period'], state['inertia'], dt, thrusters)['power']
+    return plan
+
 
 class Controler:
 
@@ -24,6 +299,12 @@ class Controler:
         self.reach_geo = None   # Commande pous rejoindre une géo précise
         self.reach_sync = None  # Commande pour synchroniser la rotation avec la période orbitale
         self.do_homhann = None  # Commande pour réaliser un transfert d'Hohmann
+        self.do_lambert = None  # Commande pour réaliser un transfert de Lambert (cible calculée par porkchop)
+
+        # Plan de poussée compilé à la commande, et prochain instant où le contrôleur doit être évalué
+        self.plan = BurnPlan()
+        self.next_check = 0
+        self.updating = False
 
         # Chargement des données du satellite
         self.load(sat=sat)
@@ -40,6 +321,120 @@ class Controler:
             self.planet = self.sat.planet_ref
             self.simulator = self.sat.simulator
 
+    def log(self, message):
+        """
+        Enregistre un message du contrôleur dans le journal d'événements de la simulation (voir Class EventLog).
+
+        :param message: Message à enregistrer.
+        :type message: string
+        """
+        self.simulator.events.log('ctr', message, time=self.simulator.time, source=self.sat.name)
+
+    def snapshot(self, **args):
+        """
+        Copie l'état du satellite utile à la planification d'une manoeuvre, indépendante du satellite (le calcul du
+        plan peut ainsi être réalisé en parallèle de la simulation).
+
+        :param args: Arguments de l'instruction, ajoutés à l'instantané.
+        :return: Instantané (masse, rayon, vitesse, inerties, propulseurs, pas de temps, astre, ...).
+        :rtype: dict
+        """
+        thrusters = thruster_specs(self.sat)
+        state = {'mass': self.sat.mass, 'r': self.sat.get_radius(), 'speed': self.sat.get_speed(),
+                 'inertia': np.array(self.sat.inertia), 'thrusters': thrusters,
+                 'names': [thr[0] for thr in thrusters], 'dt': self.simulator.dt, 'G': self.G,
+                 'planet_mass': self.planet.mass}
+        state.update(args)
+        return state
+
+    def request(self, function, state, apply):
+        """
+        Calcule le plan d'une instruction, puis l'applique. Sans pool de planification, le calcul est immédiat ; sinon
+        il est confié au pool de la simulation (voir Class PlanningPool), et le satellite continue de suivre son plan
+        en cours jusqu'à l'instant simulé d'application, fixé à la soumission.
+
+        :param function: Fonction de planification (de niveau module, ex: homhann_plan).
+        :type function: callable
+        :param state: Instantané du satellite (voir snapshot).
+        :type state: dict
+        :param apply: Méthode appliquant le plan calculé.
+        :type apply: callable
+        """
+        pool = self.simulator.planning
+        if pool is None:
+            apply(function(state))
+        else:
+            due = pool.submit(function, state, apply=lambda plan: self.resume(apply, plan), time=self.clock())
+            self.log(f"planning of {function.__name__} submitted (applied at {due} sec)")
+
+    def resume(self, apply, plan):
+        """
+        Applique un plan calculé par le pool de planification, lors d'une mise à jour du contrôleur (sauf si le
+        satellite a été détruit entre temps).
+
+        :param apply: Méthode appliquant le plan.
+        :type apply: callable
+        :param plan: Plan calculé.
+        """
+        if not self.sat.alive:
+            return
+        self.updating = True
+        apply(plan)
+        self.updating = False
+        self.schedule()
+
+    def clock(self):
+        """
+        Retourne l'instant de la mise à jour du contrôleur correspondant à l'itération en cours. Une commande lancée
+        depuis les contrôles du satellite (avant l'avancée du temps) n'est vue par le contrôleur qu'à la mise à jour
+        suivante, un pas de temps plus tard.
+
+        :return: Instant de référence du plan (en sec).
+        :rtype: float
+        """
+        return self.simulator.time if self.updating else self.simulator.time + self.simulator.dt
+
+    def burn(self, name, thruster, power, n):
+        """
+        Allume immédiatement un propulseur, et ajoute au plan son extinction après n itérations.
+
+        :param name: Nom de l'allumage.
+        :type name: string
+        :param thruster: Nom du propulseur.
+        :type thruster: string
+        :param power: Puissance du propulseur (de 0 à 1).
+        :type power: float
+        :param n: Nombre d'itérations de poussée.
+        :type n: int
+        """
+        index = self.sat.thruster_index[thruster]
+        self.sat.thrusters[index].on(power=power)
+        start = self.clock()
+        self.plan.add(name=name, start=start, duration=n * self.simulator.dt, stop=start + n * self.simulator.dt,
+                      thrusters=[index], power=[self.sat.thrusters[index].power])
+        self.plan.burns[-1]['active'] = True
+
+    def schedule(self):
+        """
+        Calcule le prochain instant où le contrôleur doit être évalué. Les phases à loi de commande continue
+        (décollage, approche de la GEO, attente d'alignement) sont évaluées à chaque itération ; les autres ne le
+        sont qu'aux bornes du plan de poussée.
+        """
+        if self.sat.islanded or self.sat.istakingoff or not self.reach_geo is None or \
+                (type(self.reach_sync) == dict and self.reach_sync.get('step') == 'wait'):
+            self.next_check = 0
+        else:
+            self.next_check = self.plan.next_check()
+
+    def is_due(self):
+        """
+        Indique si le contrôleur doit être évalué à l'instant actuel de la simulation.
+
+        :return: True si une borne du plan (ou une loi de commande continue) est atteinte.
+        :rtype: boolean
+        """
+        return self.simulator.time + self.simulator.dt / 2 >= self.next_check
+
     def geo_speed(self, radius):
         """
         Retourne la vitesse nécessaire pour maintenir l'orbite GEO au rayon demandé
@@ -71,7 +466,7 @@ class Controler:
         :return: Temps de transfert (demi-période elliptique) (en sec)
         :rtype: float
         """
-        return 1 / 2 * np.sqrt(4 * np.pi ** 2 / self.G / self.planet.mass * ((r1 + r2) / 2) ** 3)
+        return homhann_transfert_time(r1=r1, r2=r2, G=self.G, mass=self.planet.mass)
 
     def power_for_synchronize_rotation(self, axe=2):
         """
@@ -108,17 +503,25 @@ class Controler:
                 acc = gamma_2 * Poids_sat * ur   +   acc_utheta   , où acc_utheta > 0 augmentant au cours du temps
         La seconde phase permet d'accélérer tangentiellement, afin d'aquerir la vitesse nécéssaire pour l'orbite GEO
 
-        :param args: Rayon de l'orbite géo-stationnaire souhaitée (en m)
+        Les instructions sont calculées immédiatement par geo_plan (calcul peu coûteux, jamais différé : la montée
+        ne doit pas rester sans guidage).
+
+        :param args: Rayon de l'orbite géo-stationnaire souhaitée (en m), et réglages facultatifs de la manoeuvre
+                     ('gamma_1', 'gamma_2', 'switch_step', 'rot_pulse', voir GEO_SETTINGS)
         :type args: dict[float]
         """
-        # Coefficient pour le calcul de l'impulsion latérale (rotation), dépendamment des caractéristiques du satellite
-        coef = 1 / self.simulator.dt * (self.sat.inertia[2] / self.sat.get('left').torque_max[2])
-        # État de l'instruction (étape, rayon souhaité, coefficients gamma, passage phase 1 vers phase 2, erreurs_max)
-        self.reach_geo = {'radius': args['radius'], 'step': 'approach', 'switch_step': 0.80,
-                          'gamma_1': 0.025, 'gamma_2': 0.02, 'speed': self.geo_speed(args['radius']),
-                          'rot_pulse': 0.0015 * coef,
-                          'epsilon': {'radius': 0.02, 'speed': 0.02, 'angle': 0.02}}
-        print(f"   | ctr: phase 1 of geo reaching started")
+        self.apply_geo(geo_plan(self.snapshot(**args)))
+
+    def apply_geo(self, plan):
+        """
+        Lance les manoeuvres pour rejoindre l'orbite géo-stationnaire, selon les instructions calculées par geo_plan.
+
+        :param plan: État de l'instruction reach_geo.
+        :type plan: dict
+        """
+        self.reach_geo = plan
+        self.schedule()
+        self.log("phase 1 of geo reaching started")
 
     def takeoff(self, args={}):
         """
@@ -129,6 +532,7 @@ class Controler:
         """
         self.sat.istakingoff = True
         self.sat.get('main').on(power=0.90)
+        self.schedule()
 
     def synchronize(self, args={}):
         """
@@ -148,10 +552,12 @@ class Controler:
         """
         # Calcul de la puissance nécéssaire à la rotation :
         self.reach_sync = self.power_for_synchronize_rotation(axe=2)
-        self.reach_sync['step'], self.reach_sync['iteration'] = 'stop', 0
-        # Mise en puissance du propulseur concerné :
-        self.sat.get(self.reach_sync['thruster']).on(power=self.reach_sync['power'])
-        print(f"   | ctr: start to synchronize rotation")
+        self.reach_sync['step'] = 'stop'
+        # Mise en puissance du propulseur concerné, et extinction prévue après n itérations :
+        self.burn(name='sync', thruster=self.reach_sync['thruster'], power=self.reach_sync['power'],
+                  n=self.reach_sync['n'])
+        self.schedule()
+        self.log("start to synchronize rotation")
 
     def homhann(self, args={'radius': 0}):
         """
@@ -162,38 +568,238 @@ class Controler:
             Rot étant un dictionnaire contenant toutes les instructions de mise en rotation du satellite durant
             l'orbite elliptique.
 
+        Les instructions sont calculées par homhann_plan (éventuellement en parallèle, voir request).
+
         :param args: Rayon d'arrivé du transfert (en m). Le rayon de départ est le rayon actuel du satellite.
         :type args: dict[float]
         """
-        # Rayon de départ et d'arrivée
-        r1, r2 = self.sat.get_radius(), args['radius']
-        # Vitesses au départ et à l'arrivée (pour rejoindre et quitter l'orbite elliptique)
-        v = np.sqrt(np.dot(2 * self.G * self.planet.mass, np.array([1 / r1, 1 / r2]) - 1 / (r1 + r2)))
-        # Calcul des puissances nécéssaires au delta de vitesse (départ)
-        self.do_homhann = self.power_for_speed(speed=v[0] - self.sat.get_speed())
-        # Si la mise en accélération n'est pas possible (dans un lapse de temps maximal)
-        if self.do_homhann is None:
-            print(f"     ctr: impossible to reach an elliptical orbit")
+        self.request(homhann_plan, self.snapshot(radius=args['radius'], period=self.get_period()),
+                     apply=self.apply_homhann)
+
+    def apply_homhann(self, plan):
+        """
+        Lance un transfert d'Hohmann, selon les instructions calculées par homhann_plan.
+
+        :param plan: Instructions de poussée du transfert (None si le transfert n'est pas réalisable).
+        :type plan: dict
+        """
+        if plan is None:
+            self.log("impossible to reach an elliptical orbit")
+            return
+        self.do_homhann, data = plan, plan['rot']
+        # Enregistrement du temps auquel le satellite devra rejoindre la GEO
+        self.do_homhann['stop_at'] = self.do_homhann['time'] + self.simulator.time
+        # power_already_in = Power "déjà comprise dans la alpha_point", donc à ne pas ajouter
+        power_already_in = self.do_homhann.pop('rot_power')
+        # Mise en puissance du propulseur concerné pour la rotation :
+        self.burn(name='homhann-rot', thruster=data['thruster'], power=-(data['power'] - power_already_in),
+                  n=data['n'])
+        # Mise ne puissance du propulseur concerné pour la vitesse :
+        self.burn(name='homhann-speed', thruster=self.do_homhann['thruster'], power=self.do_homhann['power'],
+                  n=self.do_homhann['n'])
+        # Vérification prévue à l'arrivée sur l'orbite finale
+        self.plan.checks.append(self.do_homhann['stop_at'])
+        # Mise à jour des états actuels
+        self.do_homhann['step'] = 'reach_elliptic'
+        self.schedule()
+
+    def lambert(self, args={'v1': (0, 0, 0), 'tof': 0, 'v_final': None}):
+        """
+        Ordonne au contrôleur de réaliser un transfert de Lambert, à partir d'une cible de poussée calculée au
+        préalable (voir classes.lambert.get_burn_target). Chaque poussée est vectorielle : le satellite est d'abord
+        orienté (rotation autour de z) pour aligner ux sur l'écart de vitesse, puis le propulseur principal réalise
+        la composante de l'écart selon ux. L'écart de vitesse est celui du problème de Lambert résolu à nouveau
+        depuis l'état réel du satellite (même position et même date d'arrivée), au moment de la poussée.
+        La trajectoire est ensuite vérifiée après chaque poussée, puis à mi-chemin de l'arrivée, et corrigée si
+        l'écart de vitesse restant dépasse la précision demandée. Entre deux vérifications, le satellite reste
+        orienté pour la poussée d'arrivée, réalisée si la vitesse finale est précisée ; les erreurs de position et
+        de vitesse à l'arrivée sont enregistrées dans le journal d'événements.
+        Seule la composante de l'écart de vitesse dans le plan de rotation du satellite est réalisable : la
+        composante selon z se retrouve dans l'erreur d'arrivée.
+
+        :param args: - v1 : Vitesse au départ de l'orbite de transfert, relative à la planète (en m/s),
+                     - tof : Durée du transfert (en sec),
+                     - r2 : Position visée à l'arrivée, relative à la planète (en m, optionnelle : par défaut, position
+                       atteinte depuis v1),
+                     - v_final : Vitesse souhaitée à l'arrivée (en m/s, optionnelle),
+                     - 'corrections', 'precision', 'coast' : réglages facultatifs (voir LAMBERT_SETTINGS).
+        :type args: dict
+        """
+        v1 = np.array(args['v1'], dtype=float)
+        if np.any(np.isnan(v1)):
+            self.log("invalid Lambert target")
+            return
+        r, v = self.relative_state()
+        # Paramètre gravitationnel appliqué par l'intégration (et non celui de la planification)
+        mu = G * self.planet.mass
+        r2 = args.get('r2')
+        r2 = kepler_propagate(r, v1, args['tof'], mu)[0][0] if r2 is None else np.array(r2, dtype=float)
+        v_final = args.get('v_final')
+        settings = {key: args.get(key, value) for key, value in LAMBERT_SETTINGS.items()}
+        self.do_lambert = {'step': 'point', 'burn': 'lambert-departure', 'r2': r2, 'mu': mu,
+                           'arrival': self.clock() + args['tof'], 'prograde': bool(np.cross(r, v)[2] >= 0),
+                           'v_final': None if v_final is None else np.array(v_final, dtype=float),
+                           'next_check': None, **settings}
+        self.aim()
+        self.schedule()
+        if not self.do_lambert is None:
+            self.log("Lambert transfer started")
+
+    def relative_state(self):
+        """
+        Retourne la position et la vitesse du satellite relatives à sa planète de référence.
+
+        :rtype: tuple   (2 * 1D-array, 3 components)
+        """
+        return self.sat.x - self.planet.x, self.sat.v - self.planet.v
+
+    def pointing(self, direction):
+        """
+        Calcule la rotation autour de z qui aligne ux sur la projection de direction dans le plan de rotation : le
+        satellite tourne à vitesse constante durant k itérations, puis sa rotation est arrêtée. Chaque changement de
+        vitesse angulaire est réalisé en une seule itération (voir spin_command), de sorte que l'angle parcouru
+        est exactement k * dt * omega.
+
+        :param direction: Direction visée (repère global).
+        :type direction: 1D-array   (3 components)
+        :return: {'power', 'n', 'thruster'} de la mise en rotation, et nombre d'itérations k, ou None si aucune
+                 rotation n'est réalisable.
+        :rtype: dict
+        """
+        dt, thrusters = self.simulator.dt, thruster_specs(self.sat)
+        angle = np.arctan2(direction[1], direction[0]) - np.arctan2(self.sat.ux[1], self.sat.ux[0])
+        angle = (angle + np.pi) % (2 * np.pi) - np.pi
+        for k in range(1, MAX_POINTING_STEPS + 1):
+            omega = angle / (k * dt)
+            spin = spin_command(omega - self.sat.v_ang[2], self.sat.inertia, dt, thrusters)
+            if not spin is None and not spin_command(-omega, self.sat.inertia, dt, thrusters) is None:
+                spin['k'] = k
+                return spin
+        return None
+
+    def point(self, data, then):
+        """
+        Lance la rotation calculée par pointing, avant l'étape suivante du transfert de Lambert.
+
+        :param data: Rotation calculée par pointing (None si aucune rotation n'est réalisable).
+        :type data: dict
+        :param then: Étape une fois orienté : 'burn' (poussée immédiate) ou 'hold' (attente de l'arrivée).
+        :type then: string
+        """
+        if data is None:
+            self.log("impossible to point the satellite for the Lambert transfer")
+            self.do_lambert = None
+            return
+        self.burn(name='lambert-point', thruster=data['thruster'], power=data['power'], n=data['n'])
+        self.do_lambert.update({'step': 'point', 'then': then,
+                                'aligned_at': self.clock() + data['k'] * self.simulator.dt})
+        self.plan.checks.append(self.do_lambert['aligned_at'])
+
+    def aim(self):
+        """
+        Oriente le satellite pour la prochaine poussée du transfert de Lambert (départ ou correction). L'écart de
+        vitesse visé est celui prévu à la fin de la rotation : l'état du satellite est propagé sur la durée de la
+        rotation, qui est elle-même recalculée pour ce nouvel écart (quelques itérations).
+        """
+        k, data = 0, None
+        for _ in range(3):
+            dv, _ = self.lambert_solve(ahead=k * self.simulator.dt)
+            data = None if dv is None else self.pointing(dv)
+            if data is None or data['k'] == k:
+                break
+            k = data['k']
+        self.point(data, then='burn')
+
+    def lambert_solve(self, ahead=0.):
+        """
+        Résout le problème de Lambert depuis l'état réel du satellite (éventuellement propagé sur une orbite
+        képlérienne), vers la position et la date d'arrivée visées.
+
+        :param ahead: Durée de propagation de l'état du satellite avant la résolution (en sec, par défaut 0).
+        :type ahead: float
+        :return: Écart de vitesse au départ de la nouvelle orbite de transfert, et vitesse prévue à l'arrivée (None si
+                 le transfert n'existe plus).
+        :rtype: tuple   (2 * 1D-array, 3 components)
+        """
+        ctr = self.do_lambert
+        r, v = self.relative_state()
+        if ahead > 0:
+            r, v = [state[0] for state in kepler_propagate(r, v, ahead, ctr['mu'])]
+        tof = ctr['arrival'] - self.clock() - ahead
+        if tof <= 0:
+            return None, None
+        v1, v2 = lambert(r, ctr['r2'], tof, ctr['mu'], prograde=ctr['prograde'])
+        if np.any(np.isnan(v1)):
+            return None, None
+        return v1[0] - v, v2[0]
+
+    def lambert_burn(self, dv, name):
+        """
+        Réalise la composante selon ux d'un écart de vitesse du transfert de Lambert (satellite déjà orienté).
+
+        :param dv: Écart de vitesse (en m/s).
+        :type dv: 1D-array   (3 components)
+        :param name: Nom de l'allumage.
+        :type name: string
+        :return: True si la poussée est réalisable (et lancée).
+        :rtype: boolean
+        """
+        speed = np.dot(dv, self.sat.ux)
+        data = self.power_for_speed(speed=speed) if speed > 0 else None
+        if data is None:
+            return False
+        self.burn(name=name, thruster=data['thruster'], power=data['power'], n=data['n'])
+        self.do_lambert.update({'step': 'burn' if name != 'lambert-arrival' else 'arrival', 'burn': name})
+        return True
+
+    def lambert_check(self):
+        """
+        Vérifie la trajectoire du transfert de Lambert, en résolvant à nouveau le problème depuis l'état réel du
+        satellite : correction si l'écart de vitesse dépasse la précision demandée (dans la limite des corrections
+        autorisées), sinon orientation pour la poussée d'arrivée, et prochaine vérification à mi-chemin de l'arrivée
+        (si l'arrivée est encore éloignée d'au moins LAMBERT_SETTINGS['coast'] itérations).
+        """
+        ctr = self.do_lambert
+        dv, v2 = self.lambert_solve()
+        if dv is None:
+            self.log("impossible to reach the Lambert target")
+            self.do_lambert = None
+            return
+        if np.linalg.norm(dv) > ctr['precision'] and ctr['corrections'] > 0:
+            ctr['corrections'] -= 1
+            ctr['burn'] = 'lambert-correction'
+            self.log(f"Lambert trajectory correction of {np.linalg.norm(dv):.2f} m/s")
+            self.aim()
+            return
+        remaining = ctr['arrival'] - self.clock()
+        ctr['next_check'] = self.clock() + remaining / 2 if remaining > ctr['coast'] * self.simulator.dt else None
+        if not ctr['next_check'] is None:
+            self.plan.checks.append(ctr['next_check'])
+        if ctr['v_final'] is None:
+            ctr['step'] = 'hold'
+            self.plan.checks.append(ctr['arrival'])
+        else:
+            self.point(self.pointing(ctr['v_final'] - v2), then='hold')
+
+    def lambert_report(self):
+        """
+        Enregistre les erreurs de position et de vitesse du transfert de Lambert par rapport à la cible (propagée
+        sur son orbite képlérienne jusqu'à l'instant actuel, si sa vitesse est connue), et termine l'instruction.
+        """
+        ctr = self.do_lambert
+        r, v = self.relative_state()
+        elapsed = self.clock() - ctr['arrival']
+        if ctr['v_final'] is None or elapsed <= 0:
+            target = ctr['r2'], ctr['v_final']
         else:
-            # Calcul du temps de transfert
-            self.do_homhann['time'], self.do_homhann['radius'] = self.get_homhann_transfert_time(r1=r1, r2=r2), r2
-            # Calcul de la puissance nécéssaire à la rotation :
-            data = self.power_for_rotation(period=-2 * self.do_homhann['time'])
-            if data is None:
-                print(f"   ctr: impossible to reach an elliptical orbit")
-            else:
-                # Enregistrement du temps auquel le satellite devra rejoindre la GEO
-                self.do_homhann['stop_at'] = self.do_homhann['time'] + self.simulator.time
-                # power_already_in = Power "déjà comprise dans la alpha_point", donc à ne pas ajouter
-                power_already_in = self.power_for_rotation(period=self.get_period())['power']
-                # Mise en puissance du propulseur concerné pour la rotation :
-                self.sat.get(data['thruster']).on(power=-(data['power'] - power_already_in))
-                # Enregistrement des instructions pour la rotation :
-                self.do_homhann['rot'] = data
-                # Mise ne puissance du propulseur concerné pour la vitesse :
-                self.sat.get(self.do_homhann['thruster']).on(power=self.do_homhann['power'])
-                # Mise à jour des états actuels
-                self.do_homhann['step'], self.do_homhann['iteration'] = 'reach_elliptic', 0
+            target = [state[0] for state in kepler_propagate(ctr['r2'], ctr['v_final'], elapsed, ctr['mu'])]
+        error = {'position_error': float(np.linalg.norm(r - target[0]))}
+        message = f"Lambert transfer ended (arrival error: {error['position_error']:.0f} m"
+        if not target[1] is None:
+            error['speed_error'] = float(np.linalg.norm(v - target[1]))
+            message += f", {error['speed_error']:.2f} m/s"
+        self.simulator.events.log('ctr', message + ")", time=self.simulator.time, source=self.sat.name, **error)
+        self.do_lambert = None
 
     def power_for_speed(self, speed, direction=(1, 0, 0)):
         """
@@ -209,20 +815,7 @@ class Controler:
                  - thruster : Nom du thruster à activer.
         :rtype : dict[float]
         """
-        # Coefficient nécéssaire pour le choix du thruster (vérifier sa  direction)
-        power = speed * self.sat.mass / self.simulator.dt
-        if power == 0:
-            return {'power': 0, 'n': 1, 'thruster': 'main'}
-        # Essaie de tous les propulseurs :
-        for thruster in self.sat.thrusters:
-            T = thruster.thrust_max * np.dot(thruster.direction, direction) # Force disponnible dans l'axe voulu
-            if T != 0:  # Évite la division par 0
-                pow = power / T
-                if pow <= 20:   # Si le nombre d'itération n'excède pas les 20 (pour se rapprocher de l'instantané)
-                    n = ceil(pow)
-                    return {'power': pow / n, 'n': n, 'thruster': thruster.name}
-        # Si aucun propulseur ne convient, on ne peux pas réaliser la manoeuvre
-        return None
+        return speed_command(speed, self.sat.mass, self.simulator.dt, thruster_specs(self.sat), direction)
 
     def power_for_rotation(self, period, axe=2):
         """
@@ -240,20 +833,7 @@ class Controler:
                  - thruster : Nom du thruster à activer.
         :rtype : dict[float]
         """
-        # Coefficient nécéssaire pour le choix du thruster (vérifier sa  direction)
-        power = 2*np.pi * self.sat.inertia[axe] / (period * self.simulator.dt)
-        if power == 0:
-            return {'power': 0, 'n': 1, 'thruster': 'main'}  # Instructions inutiles, pour ne pas faire crash le sat
-        # Essaie de tous les propulseurs :
-        for thruster in self.sat.thrusters:
-            T = thruster.torque_max[axe]  # Couple disponnible dans l'axe voulu
-            if T != 0:  # Évite la division par 0
-                if sign(power) == sign(T):
-                    power /= thruster.torque_max[axe]
-                    n = ceil(power)
-                    return {'power': power / n, 'n': n, 'thruster': thruster.name}
-        # Si aucun propulseur ne convient, on ne peux pas réaliser la manoeuvre
-        return None
+        return rotation_command(period, self.sat.inertia, self.simulator.dt, thruster_specs(self.sat), axe)
 
     def update(self, infos=True):
         """
@@ -263,11 +843,25 @@ class Controler:
         :param infos: Indique si les informations doivent être affichées (par défaut True).
         :type infos: boolean
         """
+        self.updating = True
+        self.run_instructions()
+        self.updating = False
+        # Prochain instant où le contrôleur devra être évalué
+        self.schedule()
+
+    def run_instructions(self):
+        """
+        Applique le plan de poussée à l'instant actuel, puis fait avancer les différentes instructions en cours
+        (phases de rejoindre la GEO, de synchronisation et de transfert d'Hohmann).
+        """
         # Change le statut du satellite une fois décollé
         if self.sat.islanded or self.sat.istakingoff:
             if self.sat.get_radius() > 1.01 * self.sat.planet_ref.radius:
                 self.sat.islanded, self.sat.istakingoff = False, False
 
+        # Allumage / extinction des propulseurs aux instants prévus par le plan
+        self.plan.apply(sat=self.sat, time=self.simulator.time, tolerance=self.simulator.dt / 2)
+
         # Instruction : Rejoindre l'orbite géo au rayon demandée
         if not self.reach_geo is None:
             # Phase d'approche :
@@ -280,7 +874,7 @@ class Controler:
                 if self.sat.get_radius() / self.reach_geo['radius'] >= self.reach_geo['switch_step']:
                     self.reach_geo['step'] = 'reaching'     # Etape suivante : Phase 2
                     self.sat.get('left').on(power=self.reach_geo['rot_pulse'])  # Mise en rotation (une seul itération)
-                    print(f"   | ctr: phase 2 of geo reaching started")
+                    self.log("phase 2 of geo reaching started")
             elif self.reach_geo['step'] == 'reaching':  # Phase 2
                 self.sat.get('left').off()  # Arrêt de la rotation (une seul itéartion)
                 # Calcul de l'angle entre le vecteur directeur du satellite et ur :
@@ -306,7 +900,7 @@ class Controler:
                             self.sat.v = np.cross(-ur, self.z) * self.reach_geo['speed']
                             # On arrête toute ommande
                             self.sat.get('main').off()
-                            print(f"   | ctr: geo reached (forced)     ({self.simulator.time} sec)")
+                            self.log("geo reached (forced)")
                             self.reach_geo = None
                             # Ordonne au satellite de synchroniser sa rotation, pour toute manoeuvre future :
                             self.reach_sync = self.sat.controls['ctr-run-synchronize'] = [((0, {}))]
@@ -315,15 +909,11 @@ class Controler:
         elif not self.reach_sync is None:
             # Phase 1 : Arrêt de rotation
             if self.reach_sync['step'] == 'stop':
-                # Si le nombre d'itération nécéssaire à la rotation a été atteint, on arrête le propulseur
-                if self.reach_sync['iteration'] == self.reach_sync['n']:
-                    self.sat.get(self.reach_sync['thruster']).off()
+                # Une fois l'allumage prévu terminé (propulseur éteint par le plan) :
+                if self.plan.is_done('sync'):
                     # Passage en Phase 2 : Attente d'avoir le bon angle (perpendiculaire au sol) à 0.5% prés
                     self.reach_sync = {'step': 'wait', 'epsilon': 0.005, 'period': self.get_period()}
                     #print(f"   | ctr: wait to synchronize rotation   ({self.simulator.time} sec)")
-                else:
-                # Sinon, on passe à l'itération suivante
-                    self.reach_sync['iteration'] += 1
             # Phase 2 : Attente du bon angle (perpendiculaire au sol)
             if self.reach_sync['step'] == 'wait':
                 # Angle entre ur et -uy (plus précisement, son cosinus, qui nous suffit à vérifier l'alignement)
@@ -331,37 +921,27 @@ class Controler:
                 if cos_ang > 1 - self.reach_sync['epsilon']:
                     # Si on est suffismeent alligné, on allume le propulseur nécéssaire à la rotation
                     self.reach_sync = self.power_for_rotation(period=self.reach_sync['period'])
-                    self.sat.get(self.reach_sync['thruster']).on(power=self.reach_sync['power'])
+                    self.burn(name='sync', thruster=self.reach_sync['thruster'], power=self.reach_sync['power'],
+                              n=self.reach_sync['n'])
                     # Passage à la Phase 3 : Synchronisation
-                    self.reach_sync['step'], self.reach_sync['iteration'] = 'sync', 0
+                    self.reach_sync['step'] = 'sync'
             # Phase 3 : Synchronisation de la rotation
             if self.reach_sync['step'] == 'sync':
-                # Si le nombre d'itération nécéssaire à la rotation a été atteint, on arrête le propulseur
-                if self.reach_sync['iteration'] == self.reach_sync['n']:
-                    self.sat.get(self.reach_sync['thruster']).off()
-                    print(f"   | ctr: finish to synchronize rotation   ({self.simulator.time} sec)")
+                # Une fois l'allumage prévu terminé, la synchronisation est finie
+                if self.plan.is_done('sync'):
+                    self.log("finish to synchronize rotation")
                     self.reach_sync = None
-                else:
-                # Sinon, on passe à l'itération suivante
-                    self.reach_sync['iteration'] += 1
 
         # Instruction : Réaliser un transfert d'Hohmann
         elif not self.do_homhann is None:
             # Phase 1 : Quitter la GEO initiale pour rejoindre l'elliptique
+            # (les propulseurs de rotation et d'accélération sont éteints par le plan)
             if self.do_homhann['step'] == 'reach_elliptic':
-                # Données de mise en rotation :
-                if self.do_homhann.get('rot'):
-                    if self.do_homhann['rot']['n'] == self.do_homhann['iteration']:
-                        self.sat.get(self.do_homhann['rot']['thruster']).off()
                 # Si les itérations d'accélération/freinage sont atteints:
-                if self.do_homhann['n'] == self.do_homhann['iteration']:
+                if self.plan.is_done('homhann-speed'):
                     # Passage en Phase 2
                     self.do_homhann['step'] = 'on_elliptic'
-                    print(f"   | ctr: elliptical orbit reached   ({self.simulator.time} sec)")
-                    self.sat.get(self.do_homhann['thruster']).off()
-                else:
-                # Sinon, on passe à l'itération suivante
-                    self.do_homhann['iteration'] += 1
+                    self.log("elliptical orbit reached")
             # Phase 2 : Attendre de parcourir la demi-orbite elliptique ...
             # ... Durant cette phase, mise en rotation pour arriver aligné à l'apogée/périgée
             # Si on dépasse le time de 'stop-at' (heure d'arrivée prévue à la demi-orbite) :
@@ -371,27 +951,505 @@ class Controler:
                 # Calcul de la pusisance nécéssaire au changement vers l'orbite GEO finale
                 self.do_homhann = self.power_for_speed(speed=dv)
                 if self.do_homhann is None:
-                    print(f'   | ctr: impossible to reach second GEO   ({self.simulator.time} sec)')
+                    self.log("impossible to reach second GEO")
                     return None # Quitte le programme
                 else:
                     # Si le changement est possible, allumage du propulseur nécessaire :
                     self.do_homhann['radius'] = r
-                    self.sat.get(self.do_homhann['thruster']).on(power=self.do_homhann['power'])
+                    self.burn(name='homhann-geo', thruster=self.do_homhann['thruster'],
+                              power=self.do_homhann['power'], n=self.do_homhann['n'])
                     # Passage à la Phase 3
-                    self.do_homhann['step'], self.do_homhann['iteration'] = 'reach_geo', 0
+                    self.do_homhann['step'] = 'reach_geo'
             # Phase 3 : Rejoindre l'orbite GEO d'arrivée
             if self.do_homhann['step'] == 'reach_geo':
-                if self.do_homhann['iteration'] == self.do_homhann['n']:
-                    self.sat.get(self.do_homhann['thruster']).off()
+                if self.plan.is_done('homhann-geo'):
                     # Si le rayon, la vitesse et la direction sont suffisement proches de ceux désirés (1% max),
                     # la position / vitesse du satellite sont manuellement corrigées, pour éviter une divergence
                     ur = normalize(self.sat.x - self.planet.x)
                     self.sat.x = self.do_homhann['radius'] * ur
                     self.sat.v = self.geo_speed(radius=self.do_homhann['radius']) * np.cross(-ur, self.z)
                     # On arrête toute ommande
-                    print(f"   | ctr: successful Homhann transfer     ({self.simulator.time} sec)")
+                    self.log("successful Homhann transfer")
                     self.do_homhann = None
                     # Ordonne au satellite de synchroniser sa rotation, pour toute manoeuvre future :
                     self.reach_sync = self.sat.controls['ctr-run-synchronize'] = [((0, {}))]
+
+        # Instruction : Réaliser un transfert de Lambert
+        elif not self.do_lambert is None:
+            ctr, time, tolerance = self.do_lambert, self.simulator.time, self.simulator.dt / 2
+            # Orientation atteinte : arrêt de la rotation, puis poussée (départ ou correction) ou attente de l'arrivée
+            if ctr['step'] == 'point' and time + tolerance >= ctr['aligned_at']:
+                stop = self.power_for_synchronize_rotation(axe=2)
+                if not stop is None:
+                    self.burn(name='lambert-point', thruster=stop['thruster'], power=stop['power'], n=stop['n'])
+                if ctr['then'] == 'hold':
+                    ctr['step'] = 'hold'
+                    self.plan.checks.append(ctr['arrival'])
                 else:
-                    self.do_homhann['iteration'] += 1
+                    # Écart de vitesse recalculé depuis l'état réel du satellite
+                    dv, _ = self.lambert_solve()
+                    if dv is None or not self.lambert_burn(dv, name=ctr['burn']):
+                        self.log("impossible to reach the Lambert transfer orbit")
+                        self.do_lambert = None
+            # Fin d'une poussée de départ ou de correction : vérification de la trajectoire
+            elif ctr['step'] == 'burn' and self.plan.is_done(ctr['burn']):
+                self.lambert_check()
+            # Arrivée : poussée pour rejoindre la vitesse finale
+            elif ctr['step'] == 'hold' and time + tolerance >= ctr['arrival']:
+                if ctr['v_final'] is None:
+                    self.lambert_report()
+                    return None
+                r, v = self.relative_state()
+                if not self.lambert_burn(ctr['v_final'] - v, name='lambert-arrival'):
+                    self.log("impossible to reach the Lambert final orbit")
+                    self.lambert_report()
+            # Vérification à mi-chemin de l'arrivée
+            elif ctr['step'] == 'hold' and not ctr['next_check'] is None and time + tolerance >= ctr['next_check']:
+                self.lambert_check()
+            # Fin de la poussée d'arrivée : erreurs d'arrivée enregistrées
+            elif ctr['step'] == 'arrival' and self.plan.is_done('lambert-arrival'):
+                self.lambert_report()
+                # Ordonne au satellite de synchroniser sa rotation, pour toute manoeuvre future :
+                self.reach_sync = self.sat.controls['ctr-run-synchronize'] = [((0, {}))]
+
+
+# Phases des instructions d'une flotte, stockées sous forme de tableaux d'états (0 : aucune instruction)
+IDLE = 0
+GEO_APPROACH, GEO_REACHING = 1, 2
+SYNC_PENDING, SYNC_STOP, SYNC_WAIT, SYNC_SYNC = 1, 2, 3, 4
+HOH_REACH_ELLIPTIC, HOH_ON_ELLIPTIC, HOH_REACH_GEO = 1, 2, 3
+# Tableaux d'états du contrôleur de flotte : nom -> (type, valeur initiale)
+FLEET_STATES = {'geo_step': (np.int8, IDLE), 'geo_radius': (float, np.nan), 'geo_speed': (float, np.nan),
+                'geo_pulse': (float, 0.), 'sync_step': (np.int8, IDLE), 'sync_iter': (np.int64, 0),
+                'sync_n': (np.int64, 0), 'sync_thruster': (np.int64, -1), 'sync_period': (float, np.nan),
+                'hoh_step': (np.int8, IDLE), 'hoh_iter': (np.int64, 0), 'hoh_n': (np.int64, 0),
+                'hoh_thruster': (np.int64, -1), 'hoh_radius': (float, np.nan), 'hoh_stop_at': (float, np.inf),
+                'rot_iter': (np.int64, 0), 'rot_n': (np.int64, 0), 'rot_thruster': (np.int64, -1)}
+
+
+class FleetControler:
+
+    def __init__(self, fleet=None):
+        """
+        Initialisation du contrôleur d'une flotte de satellites. Les instructions de la classe Controler (décollage,
+        rejoindre la GEO, synchronisation, transfert d'Hohmann) sont reprises, mais chaque phase est stockée dans un
+        tableau d'états sur l'ensemble des satellites, et les machines à états sont évaluées par opérations
+        vectorielles masquées : quelques opérations par itération, quel que soit le nombre de satellites.
+
+        :param fleet: Flotte à laquelle s'applique le contrôleur
+        :type fleet: Class Fleet
+        """
+        # Consatant de gravitation universelle
+        self.G = 6.6743015 * 10 ** -11
+        self.z = np.array([0, 0, 1])
+        # Coefficients de la manoeuvre GEO (voir Controler.geo) et erreurs maximales
+        self.switch_step, self.gamma_1, self.gamma_2 = (GEO_SETTINGS[key]
+                                                       for key in ('switch_step', 'gamma_1', 'gamma_2'))
+        self.epsilon = {'radius': 0.02, 'speed': 0.02, 'angle': 0.02, 'sync': 0.005}
+
+        self.fleet, self.size = None, 0
+        self.load(fleet=fleet)
+
+    def load(self, fleet):
+        """
+        Charge la flotte désirée dans le contrôleur, et dimensionne les tableaux d'états.
+
+        :param fleet: Flotte à laquelle s'applique le contrôleur
+        :type fleet: Class Fleet
+        """
+        if not fleet is None:
+            self.fleet = fleet
+            self.planet = fleet.planet_ref
+            self.simulator = fleet.simulator
+            self.resize(len(fleet))
+
+    def resize(self, n):
+        """
+        Redimensionne les tableaux d'états (les états existants sont conservés, les nouveaux sont au repos).
+
+        :param n: Nombre de satellites.
+        :type n: int
+        """
+        for name, (dtype, fill) in FLEET_STATES.items():
+            new = np.full(n, fill, dtype=dtype)
+            if self.size:
+                keep = min(n, self.size)
+                new[:keep] = getattr(self, name)[:keep]
+            setattr(self, name, new)
+        self.size = n
+
+    def select(self, index):
+        """
+        Retourne le masque des satellites en vie désignés par index.
+
+        :param index: Indices (ou masque, ou slice) des satellites.
+        :type index: 1D-array or slice
+        :return: Masque des satellites concernés.
+        :rtype: 1D-array   (boolean)
+        """
+        mask = np.zeros(len(self.fleet), dtype=bool)
+        mask[index] = True
+        return mask & self.fleet.alive
+
+    def orbital_speed(self, radius):
+        """
+        Retourne la vitesse nécessaire pour maintenir l'orbite GEO aux rayons demandés
+
+        :param radius: Rayons autour du centre de l'astre (en m)
+        :type radius: 1D-array
+        :return: Vitesses tangentielles (en m/s)
+        :rtype: 1D-array
+        """
+        return np.sqrt(self.G * self.planet.mass / radius)
+
+    def get_period(self, mask):
+        """
+        Calcule la période orbitale actuelle des satellites désignés (orbite supposée circulaire).
+
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        :return: Périodes orbitales (en s)
+        :rtype: 1D-array
+        """
+        return 2 * np.pi * (np.linalg.norm(self.fleet.x[mask] - self.planet.x, axis=1) /
+                            np.linalg.norm(self.fleet.v[mask], axis=1))
+
+    def power_for_speed(self, mask, speed):
+        """
+        Version vectorisée de Controler.power_for_speed (direction ux) : pour chaque satellite désigné, premier
+        propulseur capable de réaliser l'écart de vitesse en 20 itérations au plus.
+
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        :param speed: Écarts de vitesse à ajouter.
+        :type speed: 1D-array
+        :return: Puissances, nombres d'itérations et indices des propulseurs (-1 si la manoeuvre est impossible).
+        :rtype: tuple   (3 * 1D-array)
+        """
+        power = speed * self.fleet.mass[mask] / self.simulator.dt
+        out, n, thruster = np.zeros(len(power)), np.ones(len(power), dtype=np.int64), np.full(len(power), -1)
+        thruster[power == 0] = 0
+        for k in range(self.fleet.thrust_max.shape[1]):
+            T = self.fleet.thrust_max[mask, k] * np.dot(THRUSTER_DIRECTIONS[k], (1, 0, 0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pw = power / T
+                n_k = np.ceil(pw)
+            # Les écarts négatifs (n <= 0) ne sont pas réalisables avec des propulseurs orientés selon +ux
+            valid = (thruster < 0) & (T != 0) & (pw <= 20) & (n_k > 0)
+            thruster[valid], n[valid], out[valid] = k, n_k[valid], pw[valid] / n_k[valid]
+        return out, n, thruster
+
+    def power_for_torque(self, mask, power, axe=2):
+        """
+        Version vectorisée de la recherche de propulseur pour une rotation (voir Controler.power_for_rotation) :
+        premier propulseur dont le couple est de même signe que celui demandé.
+
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        :param power: Couples demandés, rapportés au pas de temps (I * delta_omega / dt).
+        :type power: 1D-array
+        :param axe: Indice de l'axe de rotation (par défaut 2).
+        :type axe: int
+        :return: Puissances, nombres d'itérations et indices des propulseurs (-1 si aucun ne convient).
+        :rtype: tuple   (3 * 1D-array)
+        """
+        out, n, thruster = np.zeros(len(power)), np.ones(len(power), dtype=np.int64), np.full(len(power), -1)
+        thruster[power == 0] = 0
+        for k in range(self.fleet.torque_max.shape[1]):
+            T = self.fleet.torque_max[mask, k, axe]
+            valid = (thruster < 0) & (T != 0) & (np.sign(power) == np.sign(T))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pw = power / T
+                n_k = np.ceil(pw)
+            thruster[valid], n[valid], out[valid] = k, n_k[valid], pw[valid] / n_k[valid]
+        return out, n, thruster
+
+    def set_power(self, index, thruster, power):
+        """
+        Met en puissance (entre 0 et 1) un propulseur par satellite.
+
+        :param index: Indices des satellites.
+        :type index: 1D-array   (int)
+        :param thruster: Indice du propulseur de chaque satellite.
+        :type thruster: 1D-array   (int)
+        :param power: Puissance de chaque propulseur.
+        :type power: 1D-array
+        """
+        self.fleet.power[index, thruster] = np.clip(power, 0, 1)
+
+    def request_synchronize(self, index):
+        """
+        Ordonne aux satellites désignés de synchroniser leur rotation à l'itération suivante (comme le contrôle
+        'ctr-run-synchronize' d'un satellite).
+
+        :param index: Indices des satellites.
+        :type index: 1D-array   (int)
+        """
+        self.sync_step[index] = SYNC_PENDING
+        self.fleet.controls.setdefault('ctr-run-synchronize', []).append((0, {}, index))
+
+    def info(self, count, message):
+        """
+        Affiche un message concernant un ensemble de satellites de la flotte (un seul message par itération).
+
+        :param count: Nombre de satellites concernés.
+        :type count: int
+        :param message: Message à afficher.
+        :type message: string
+        """
+        if count:
+            self.simulator.events.log('ctr', f"{message} for {count} satellites", time=self.simulator.time,
+                                      source=self.fleet.name, count=int(count))
+
+    def takeoff(self, args={}, index=slice(None)):
+        """
+        Ordonne aux satellites désignés de décoller, à 90% de leur puissance maximale
+
+        :param args: Vide (pour uniformiser la synthaxe)
+        :type args: dict (empty)
+        :param index: Satellites concernés (par défaut tous).
+        :type index: 1D-array or slice
+        """
+        mask = self.select(index)
+        self.fleet.istakingoff[mask] = True
+        self.fleet.power[mask, 0] = 0.90
+
+    def geo(self, args={'radius': 0}, index=slice(None)):
+        """
+        Ordonne aux satellites désignés de rejoindre l'orbite géo-stationnaire au rayon précisé (voir Controler.geo).
+
+        :param args: Rayon de l'orbite géo-stationnaire souhaitée (en m)
+        :type args: dict[float]
+        :param index: Satellites concernés (par défaut tous).
+        :type index: 1D-array or slice
+        """
+        mask = self.select(index)
+        coef = 1 / self.simulator.dt * (self.fleet.inertia[mask, 2] / self.fleet.torque_max[mask, 1, 2])
+        self.geo_step[mask], self.geo_radius[mask] = GEO_APPROACH, args['radius']
+        self.geo_speed[mask] = self.orbital_speed(args['radius'])
+        self.geo_pulse[mask] = GEO_SETTINGS['rot_pulse'] * coef
+        self.info(np.sum(mask), "phase 1 of geo reaching started")
+
+    def synchronize(self, args={}, index=slice(None)):
+        """
+        Ordonne aux satellites désignés de synchroniser leur rotation avec la période orbitale
+        (voir Controler.synchronize).
+
+        :param args: Vide (pour uniformiser la synthaxe)
+        :type args: dict (empty)
+        :param index: Satellites concernés (par défaut tous).
+        :type index: 1D-array or slice
+        """
+        mask = self.select(index)
+        power = - self.fleet.v_ang[mask, 2] * self.fleet.inertia[mask, 2] / self.simulator.dt
+        power, n, thruster = self.power_for_torque(mask, power)
+        idx = np.flatnonzero(mask)[thruster >= 0]
+        ok = thruster >= 0
+        self.set_power(idx, thruster[ok], power[ok])
+        self.sync_step[idx], self.sync_iter[idx], self.sync_n[idx] = SYNC_STOP, 0, n[ok]
+        self.sync_thruster[idx] = thruster[ok]
+        self.info(np.sum(mask), "start to synchronize rotation")
+
+    def homhann(self, args={'radius': 0}, index=slice(None)):
+        """
+        Ordonne aux satellites désignés de réaliser un transfert d'Hohmann jusqu'au rayon demandé
+        (voir Controler.homhann).
+
+        :param args: Rayon d'arrivé du transfert (en m). Le rayon de départ est le rayon actuel de chaque satellite.
+        :type args: dict[float]
+        :param index: Satellites concernés (par défaut tous).
+        :type index: 1D-array or slice
+        """
+        mask = self.select(index)
+        r1, r2 = np.linalg.norm(self.fleet.x[mask] - self.planet.x, axis=1), args['radius']
+        # Vitesse au départ de l'orbite elliptique, et puissances nécessaires
+        v = np.sqrt(2 * self.G * self.planet.mass * (1 / r1 - 1 / (r1 + r2)))
+        power, n, thruster = self.power_for_speed(mask, v - np.linalg.norm(self.fleet.v[mask], axis=1))
+        # Temps de transfert, et rotation durant la demi-orbite elliptique
+        time = 1 / 2 * np.sqrt(4 * np.pi ** 2 / self.G / self.planet.mass * ((r1 + r2) / 2) ** 3)
+        inertia = self.fleet.inertia[mask, 2]
+        rot_power, rot_n, rot_thruster = self.power_for_torque(mask, 2*np.pi * inertia /
+                                                               (-2 * time * self.simulator.dt))
+        already, _, _ = self.power_for_torque(mask, 2*np.pi * inertia / (self.get_period(mask) * self.simulator.dt))
+        ok = (thruster >= 0) & (rot_thruster >= 0)
+        self.info(np.sum(~ok), "impossible to reach an elliptical orbit")
+        self.info(np.sum(ok), "start of Homhann transfer")
+        idx = np.flatnonzero(mask)[ok]
+        self.set_power(idx, rot_thruster[ok], -(rot_power[ok] - already[ok]))
+        self.rot_iter[idx], self.rot_n[idx], self.rot_thruster[idx] = 0, rot_n[ok], rot_thruster[ok]
+        self.set_power(idx, thruster[ok], power[ok])
+        self.hoh_step[idx], self.hoh_iter[idx], self.hoh_n[idx] = HOH_REACH_ELLIPTIC, 0, n[ok]
+        self.hoh_thruster[idx], self.hoh_radius[idx] = thruster[ok], r2
+        self.hoh_stop_at[idx] = time[ok] + self.simulator.time
+
+    def update(self, infos=True):
+        """
+        Fait avancer toutes les instructions en cours de la flotte, par opérations vectorielles masquées. Comme
+        pour Controler.update, une seule instruction est évaluée par satellite (GEO, puis synchronisation, puis
+        transfert d'Hohmann).
+
+        :param infos: Indique si les informations doivent être affichées (par défaut True).
+        :type infos: boolean
+        """
+        fleet = self.fleet
+        # Change le statut des satellites une fois décollés
+        lifting = fleet.islanded | fleet.istakingoff
+        if np.any(lifting):
+            done = lifting & (np.linalg.norm(fleet.x - self.planet.x, axis=1) > 1.01 * self.planet.radius)
+            fleet.islanded[done], fleet.istakingoff[done] = False, False
+
+        # Fin des impulsions de rotation (indépendantes des phases)
+        rot = fleet.alive & (self.rot_thruster >= 0)
+        if np.any(rot):
+            end = rot & (self.rot_iter == self.rot_n)
+            idx = np.flatnonzero(end)
+            fleet.power[idx, self.rot_thruster[idx]] = 0.
+            self.rot_thruster[idx] = -1
+            self.rot_iter[rot & ~end] += 1
+
+        # Une seule instruction par satellite, selon l'ordre de priorité
+        geo = fleet.alive & (self.geo_step != IDLE)
+        sync = fleet.alive & ~geo & (self.sync_step != IDLE)
+        hoh = fleet.alive & ~geo & ~sync & (self.hoh_step != IDLE)
+        if np.any(geo):
+            self.update_geo(geo)
+        if np.any(sync):
+            self.update_sync(sync)
+        if np.any(hoh):
+            self.update_homhann(hoh)
+
+    def update_geo(self, mask):
+        """
+        Fait avancer l'instruction "rejoindre l'orbite GEO" des satellites désignés.
+
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        """
+        fleet = self.fleet
+        approach, reaching = mask & (self.geo_step == GEO_APPROACH), mask & (self.geo_step == GEO_REACHING)
+        radius = np.linalg.norm(fleet.x - self.planet.x, axis=1)
+        # Phase 1 : accélération radiale uniforme
+        if np.any(approach):
+            T = (self.gamma_1 + 1) * np.linalg.norm(fleet.ag[approach], axis=1) * fleet.mass[approach]
+            fleet.power[approach, 0] = np.clip(T / fleet.thrust_max[approach, 0], 0, 1)
+            switch = approach & (radius / self.geo_radius >= self.switch_step)
+            if np.any(switch):
+                self.geo_step[switch] = GEO_REACHING
+                fleet.power[switch, 1] = np.clip(self.geo_pulse[switch], 0, 1)   # Mise en rotation (une itération)
+                self.info(np.sum(switch), "phase 2 of geo reaching started")
+        # Phase 2 : accélération radiale maintenue, et accélération tangentielle
+        if np.any(reaching):
+            fleet.power[reaching, 1] = 0.   # Arrêt de la rotation
+            ur = (fleet.x[reaching] - self.planet.x) / radius[reaching, None]
+            angle = np.arccos(ur[:, 0] * fleet.axes[reaching, 0, 0])
+            speed = np.linalg.norm(fleet.v[reaching], axis=1)
+            T = (self.gamma_2 + 1) * np.linalg.norm(fleet.ag[reaching], axis=1)
+            T -= speed ** 2 / radius[reaching] * np.sin(angle) ** 2
+            T *= fleet.mass[reaching] / np.cos(angle)
+            fleet.power[reaching, 0] = np.clip(T / fleet.thrust_max[reaching, 0], 0, 1)
+            # Vérification si les satellites sont suffisement proches de l'orbite GEO désirée
+            eps = self.epsilon
+            close = (np.abs(radius[reaching] / self.geo_radius[reaching] - 1) < eps['radius']) & \
+                    (np.abs(speed / self.geo_speed[reaching] - 1) < eps['speed']) & \
+                    (np.abs(angle / (np.pi / 2) - 1) < eps['angle'])
+            idx = np.flatnonzero(reaching)[close]
+            if len(idx):
+                # Position / vitesse corrigées manuellement, pour éviter une divergence
+                ur = fleet.x[idx] / np.linalg.norm(fleet.x[idx], axis=1)[:, None]
+                fleet.x[idx] = ur * self.geo_radius[idx, None]
+                fleet.v[idx] = np.cross(-ur, self.z) * self.geo_speed[idx, None]
+                fleet.power[idx, 0] = 0.
+                self.geo_step[idx] = IDLE
+                self.info(len(idx), "geo reached (forced)")
+                # Synchronisation de la rotation, pour toute manoeuvre future
+                self.request_synchronize(idx)
+
+    def update_sync(self, mask):
+        """
+        Fait avancer l'instruction "synchroniser la rotation" des satellites désignés.
+
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        """
+        fleet = self.fleet
+        # Phase 1 : Arrêt de rotation
+        stop = mask & (self.sync_step == SYNC_STOP)
+        if np.any(stop):
+            end = stop & (self.sync_iter == self.sync_n)
+            idx = np.flatnonzero(end)
+            fleet.power[idx, self.sync_thruster[idx]] = 0.
+            self.sync_step[idx], self.sync_period[idx] = SYNC_WAIT, self.get_period(end)
+            self.sync_iter[stop & ~end] += 1
+        # Phase 2 : Attente du bon angle (perpendiculaire au sol)
+        wait = mask & (self.sync_step == SYNC_WAIT)
+        if np.any(wait):
+            ur = fleet.x[wait] - self.planet.x
+            ur /= np.linalg.norm(ur, axis=1)[:, None]
+            aligned = np.einsum('ij,ij->i', ur, -fleet.axes[wait, 1]) > 1 - self.epsilon['sync']
+            sub = np.flatnonzero(wait)[aligned]
+            if len(sub):
+                sel = np.isin(np.arange(len(mask)), sub)
+                power = 2*np.pi * fleet.inertia[sel, 2] / (self.sync_period[sel] * self.simulator.dt)
+                power, n, thruster = self.power_for_torque(sel, power)
+                ok = thruster >= 0
+                idx = np.flatnonzero(sel)[ok]
+                self.set_power(idx, thruster[ok], power[ok])
+                self.sync_step[idx], self.sync_iter[idx], self.sync_n[idx] = SYNC_SYNC, 0, n[ok]
+                self.sync_thruster[idx] = thruster[ok]
+        # Phase 3 : Synchronisation de la rotation
+        sync = mask & (self.sync_step == SYNC_SYNC)
+        if np.any(sync):
+            end = sync & (self.sync_iter == self.sync_n)
+            idx = np.flatnonzero(end)
+            fleet.power[idx, self.sync_thruster[idx]] = 0.
+            self.sync_step[idx], self.sync_thruster[idx] = IDLE, -1
+            self.sync_iter[sync & ~end] += 1
+            self.info(len(idx), "finish to synchronize rotation")
+
+    def update_homhann(self, mask):
+        """
+        Fait avancer l'instruction "transfert d'Hohmann" des satellites désignés.
+
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        """
+        fleet = self.fleet
+        # Phase 1 : Quitter la GEO initiale pour rejoindre l'elliptique
+        reach = mask & (self.hoh_step == HOH_REACH_ELLIPTIC)
+        if np.any(reach):
+            end = reach & (self.hoh_iter == self.hoh_n)
+            idx = np.flatnonzero(end)
+            fleet.power[idx, self.hoh_thruster[idx]] = 0.
+            self.hoh_step[idx] = HOH_ON_ELLIPTIC
+            self.hoh_iter[reach & ~end] += 1
+            self.info(len(idx), "elliptical orbit reached")
+        # Phase 2 : Attendre de parcourir la demi-orbite elliptique
+        arrived = mask & (self.hoh_step == HOH_ON_ELLIPTIC) & (self.simulator.time >= self.hoh_stop_at)
+        if np.any(arrived):
+            dv = self.orbital_speed(self.hoh_radius[arrived]) - np.linalg.norm(fleet.v[arrived], axis=1)
+            power, n, thruster = self.power_for_speed(arrived, dv)
+            ok = thruster >= 0
+            if not np.all(ok):
+                self.hoh_step[np.flatnonzero(arrived)[~ok]] = IDLE
+                self.info(np.sum(~ok), "impossible to reach second GEO")
+            idx = np.flatnonzero(arrived)[ok]
+            self.set_power(idx, thruster[ok], power[ok])
+            self.hoh_step[idx], self.hoh_iter[idx], self.hoh_n[idx] = HOH_REACH_GEO, 0, n[ok]
+            self.hoh_thruster[idx] = thruster[ok]
+        # Phase 3 : Rejoindre l'orbite GEO d'arrivée
+        final = mask & (self.hoh_step == HOH_REACH_GEO)
+        if np.any(final):
+            end = final & (self.hoh_iter == self.hoh_n)
+            idx = np.flatnonzero(end)
+            self.hoh_iter[final & ~end] += 1
+            if len(idx):
+                fleet.power[idx, self.hoh_thruster[idx]] = 0.
+                # Position / vitesse corrigées manuellement, pour éviter une divergence
+                ur = fleet.x[idx] - self.planet.x
+                ur /= np.linalg.norm(ur, axis=1)[:, None]
+                fleet.x[idx] = self.hoh_radius[idx, None] * ur
+                fleet.v[idx] = self.orbital_speed(self.hoh_radius[idx])[:, None] * np.cross(-ur, self.z)
+                self.hoh_step[idx], self.hoh_thruster[idx] = IDLE, -1
+                self.info(np.sum(end), "successful Homhann transfer")
+                # Synchronisation de la rotation, pour toute manoeuvre future
+                self.request_synchronize(idx)
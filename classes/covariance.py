@@ -0,0 +1,170 @@
+import numpy as np
+from classes.soi import G
+"""
+Propagation linéaire des incertitudes : matrices de transition d'état (STM, 6*6) obtenues en intégrant les équations
+variationnelles avec le même intégrateur que les états, par lots de satellites, et covariances propagées.
+"""
+
+
+def gravity_gradient(x, planets, bodies=None):
+    """
+    Calcule le gradient de l'accélération gravitationnelle (d a / d x) de chaque satellite.
+
+    :param x: Positions des satellites.
+    :type x: 2D-array   (N*3 components)
+    :param planets: Liste des objets planètes.
+    :type planets: list[Planet (class)]
+    :param bodies: Indice de la planète dominante de chaque satellite : seule son attraction est prise en compte
+                   (par défaut None : toutes les planètes).
+    :type bodies: 1D-array   (int)
+    :return: Gradients de gravité.
+    :rtype: 3D-array   (N*3*3 components)
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    centers = np.array([pln.x for pln in planets], dtype=float)
+    mus = G * np.array([pln.mass for pln in planets], dtype=float)
+    if bodies is None:
+        d, mu = x[:, None, :] - centers[None], np.broadcast_to(mus, (len(x), len(planets)))
+    else:
+        d, mu = (x - centers[bodies])[:, None, :], mus[bodies][:, None]
+    n = np.linalg.norm(d, axis=-1)
+    # d a / d x = - mu / r^3 (I - 3 u u^T), sommé sur les planètes
+    u = d / n[..., None]
+    grad = 3 * np.einsum('npi,npj->npij', u, u) - np.eye(3)
+    return np.einsum('np,npij->nij', mu / n ** 3, grad)
+
+
+def propagate_covariance(stm, covariance):
+    """
+    Propage des covariances initiales par des matrices de transition : P = STM P0 STM^T.
+
+    :param stm: Matrices de transition (une par satellite, éventuellement pour plusieurs instants).
+    :type stm: 3D-array or 4D-array   (N*6*6 or T*N*6*6 components)
+    :param covariance: Covariance(s) initiale(s) : une commune, ou une par satellite.
+    :type covariance: 2D-array or 3D-array   (6*6 or N*6*6 components)
+    :return: Covariances propagées.
+    :rtype: 3D-array or 4D-array   (N*6*6 or T*N*6*6 components)
+    """
+    stm, covariance = np.asarray(stm, dtype=float), np.asarray(covariance, dtype=float)
+    return np.einsum('...ij,...jk,...lk->...il', stm, covariance, stm)
+
+
+class STMTracker:
+
+    def __init__(self, record=True):
+        """
+        Initialise le suivi des matrices de transition d'état des satellites et des flottes. Pour un satellite, la
+        matrice est découpée en deux blocs (3*6) : dérivées de la position et de la vitesse par rapport à l'état
+        initial. Les équations variationnelles (d STM_v / dt = grad(g) STM_x, d STM_x / dt = STM_v) sont intégrées
+        avec l'intégrateur du simulateur : la matrice obtenue est exactement celle du schéma numérique.
+
+        :param record: Si True (par défaut), enregistre les matrices à chaque itération (aux instants des
+                       sauvegardes).
+        :type record: boolean
+        """
+        self.record = record
+        # Nom du satellite (ou de la flotte) -> blocs (STM_x, STM_v), instant initial, et historique
+        self.stm, self.t0, self.history = {}, {}, {}
+
+    def start(self, name, n, time):
+        """
+        (Re)démarre le suivi d'un satellite ou d'une flotte : les matrices de transition valent l'identité.
+
+        :param name: Nom du satellite ou de la flotte.
+        :type name: string
+        :param n: Nombre de satellites (1 pour un satellite).
+        :type n: int
+        :param time: Instant initial (en sec).
+        :type time: float
+        """
+        eye = np.tile(np.eye(6), (n, 1, 1))
+        self.stm[name] = (eye[:, :3].copy(), eye[:, 3:].copy())
+        self.t0[name], self.history[name] = time, []
+
+    def resize(self, name, n):
+        """
+        Ajoute au suivi d'une flotte les satellites ajoutés depuis (voir Fleet.extend) : leurs matrices de transition
+        valent l'identité à partir de cet instant, celles des satellites déjà suivis sont conservées.
+
+        :param name: Nom de la flotte.
+        :type name: string
+        :param n: Nouveau nombre de satellites.
+        :type n: int
+        """
+        stm_x, stm_v = self.stm[name]
+        eye = np.tile(np.eye(6), (n - len(stm_x), 1, 1))
+        self.stm[name] = (np.concatenate([stm_x, eye[:, :3]]), np.concatenate([stm_v, eye[:, 3:]]))
+
+    def step(self, name, x, planets, simulator, mask=None, bodies=None):
+        """
+        Fait avancer d'un pas de temps les matrices de transition d'un satellite ou d'une flotte. Doit être appelée
+        avec les positions du début du pas de temps (celles utilisées par l'intégrateur).
+
+        :param name: Nom du satellite ou de la flotte.
+        :type name: string
+        :param x: Positions des satellites au début du pas de temps.
+        :type x: 1D-array or 2D-array   (3 or N*3 components)
+        :param planets: Liste des objets planètes.
+        :type planets: list[Planet (class)]
+        :param simulator: Simulateur (intégrateur et instant actuel).
+        :type simulator: Class Simulator
+        :param mask: Satellites en mouvement (par défaut None : tous).
+        :type mask: 1D-array   (boolean)
+        :param bodies: Indice de la planète dominante de chaque satellite (par défaut None : toutes les planètes).
+        :type bodies: 1D-array   (int)
+        """
+        x = np.atleast_2d(x)
+        if name not in self.stm or len(self.stm[name][0]) > len(x):
+            self.start(name, len(x), simulator.time)
+        elif len(self.stm[name][0]) < len(x):
+            # Flotte agrandie : suivi des nouveaux satellites, sans réinitialiser les autres
+            self.resize(name, len(x))
+        stm_x, stm_v = self.stm[name]
+        mask = slice(None) if mask is None else mask
+        grad = gravity_gradient(x[mask], planets, bodies=None if bodies is None else bodies[mask])
+        stm_x[mask], stm_v[mask], _ = simulator.integrate(f=stm_x[mask], df=stm_v[mask], ddf=grad @ stm_x[mask])
+        if self.record:
+            self.history[name].append((simulator.time, np.concatenate([stm_x, stm_v], axis=1)))
+
+    def get_stm(self, name, time=None):
+        """
+        Retourne les matrices de transition d'un satellite ou d'une flotte, depuis le début du suivi.
+
+        :param name: Nom du satellite ou de la flotte.
+        :type name: string
+        :param time: Instant de sauvegarde demandé (par défaut None : dernier instant). Si 'all', retourne tout
+                     l'historique.
+        :type time: float or string
+        :return: Instant(s) et matrices de transition (N = 1 pour un satellite). Dans l'historique, les matrices
+                 des satellites ajoutés à une flotte après un instant valent NaN à cet instant.
+        :rtype: tuple   (float, 3D-array (N*6*6)) or tuple   (1D-array (T), 4D-array (T*N*6*6))
+        """
+        if time is None:
+            stm_x, stm_v = self.stm[name]
+            return (self.history[name][-1][0] if self.history[name] else self.t0[name],
+                    np.concatenate([stm_x, stm_v], axis=1))
+        times = np.array([t for t, _ in self.history[name]], dtype=float)
+        if type(time) == str and time == 'all':
+            n = max((len(stm) for _, stm in self.history[name]), default=0)
+            history = np.full((len(times), n, 6, 6), np.nan)
+            for i, (_, stm) in enumerate(self.history[name]):
+                history[i, :len(stm)] = stm
+            return times, history
+        i = int(np.argmin(np.abs(times - time)))
+        return times[i], self.history[name][i][1]
+
+    def get_covariance(self, name, covariance, time=None):
+        """
+        Retourne les covariances propagées d'un satellite ou d'une flotte (voir get_stm et propagate_covariance).
+
+        :param name: Nom du satellite ou de la flotte.
+        :type name: string
+        :param covariance: Covariance(s) initiale(s), au début du suivi : une commune, ou une par satellite.
+        :type covariance: 2D-array or 3D-array   (6*6 or N*6*6 components)
+        :param time: Instant de sauvegarde demandé (par défaut None : dernier instant, 'all' : tout l'historique).
+        :type time: float or string
+        :return: Instant(s) et covariances propagées.
+        :rtype: tuple   (float, 3D-array (N*6*6)) or tuple   (1D-array (T), 4D-array (T*N*6*6))
+        """
+        times, stm = self.get_stm(name, time=time)
+        return times, propagate_covariance(stm, covariance)
@@ -0,0 +1,111 @@
+import numpy as np
+"""
+Sous-échantillonnage des séries temporelles pour l'affichage : seuls quelques points par pixel sont tracés, choisis
+pour conserver la forme de la courbe (extrema, pics). Les calculs sont réalisés sur des tableaux numpy (colonnes).
+"""
+
+
+def minmax_indices(y, n):
+    """
+    Sélectionne, dans chacun des n intervalles consécutifs (même nombre de points), les indices du minimum et du
+    maximum de la série : les extrema sont tous conservés.
+
+    :param y: Valeurs de la série.
+    :type y: 1D-array
+    :param n: Nombre d'intervalles (ex: largeur du graphique en pixels).
+    :type n: int
+    :return: Indices sélectionnés, croissants (au plus 2 * n + 2).
+    :rtype: 1D-array   (int)
+    """
+    y = np.asarray(y, dtype=float)
+    size = len(y)
+    if size <= 2 * n:
+        return np.arange(size)
+    k = size // n
+    # Valeurs manquantes ignorées (remplacées par +/- l'infini selon le sens de la recherche)
+    blocks = y[:n * k].reshape(n, k)
+    start = np.arange(n) * k
+    low = start + np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1)
+    high = start + np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1)
+    index = [low, high, [0, size - 1]]
+    if n * k < size:
+        rest = y[n * k:]
+        index.append(n * k + np.array([np.nanargmin(rest), np.nanargmax(rest)]) if not np.all(np.isnan(rest))
+                     else [n * k])
+    return np.unique(np.concatenate(index))
+
+
+def lttb_indices(x, y, n):
+    """
+    Sélectionne n points de la série par l'algorithme "Largest Triangle Three Buckets" : premier et dernier points
+    conservés, puis, dans chaque intervalle, le point formant le plus grand triangle avec le point retenu dans
+    l'intervalle précédent et la moyenne de l'intervalle suivant. Les triangles d'un intervalle sont calculés en une
+    seule opération.
+
+    :param x: Abscisses de la série.
+    :type x: 1D-array
+    :param y: Ordonnées de la série.
+    :type y: 1D-array
+    :param n: Nombre de points à conserver (au moins 3).
+    :type n: int
+    :return: Indices sélectionnés, croissants.
+    :rtype: 1D-array   (int)
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    size = len(y)
+    if size <= n or n < 3:
+        return np.arange(size)
+    # Bornes des n - 2 intervalles (premier et dernier points exclus), et moyennes de chaque intervalle
+    edges = (1 + np.arange(n - 1) * (size - 2) / (n - 2)).astype(int)
+    edges[-1] = size - 1
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:size - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(np.nan_to_num(y[:size - 1]), edges[:-1]) / counts
+    # Moyenne de l'intervalle suivant (le dernier point pour le dernier intervalle)
+    next_x, next_y = np.append(mean_x[1:], x[-1]), np.append(mean_y[1:], y[-1])
+    index = np.empty(n, dtype=np.int64)
+    index[0], index[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Double de l'aire des triangles (point retenu, point candidat, moyenne de l'intervalle suivant)
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.)))
+        index[i + 1] = a
+    return index
+
+
+def downsample(x, y, points=2000, method='lttb', lo=None, hi=None):
+    """
+    Sous-échantillonne une série pour l'affichage, éventuellement restreinte à un intervalle d'abscisses (zoom). Les
+    abscisses doivent être croissantes pour la restriction à un intervalle.
+
+    :param x: Abscisses de la série.
+    :type x: 1D-array
+    :param y: Ordonnées de la série.
+    :type y: 1D-array
+    :param points: Nombre de points affichés (par défaut 2000, de l'ordre de la largeur du graphique en pixels).
+    :type points: int
+    :param method: 'lttb' (par défaut), 'minmax' (minimum et maximum par pixel), ou None (aucun
+                   sous-échantillonnage).
+    :type method: string
+    :param lo: Abscisse minimale affichée (par défaut None : début de la série).
+    :type lo: float
+    :param hi: Abscisse maximale affichée (par défaut None : fin de la série).
+    :type hi: float
+    :return: Indices des points à afficher.
+    :rtype: 1D-array   (int)
+    """
+    x = np.asarray(x, dtype=float)
+    start, stop = 0, len(x)
+    if not lo is None or not hi is None:
+        # Un point de part et d'autre de l'intervalle, pour que la courbe atteigne les bords du graphique
+        start = max(int(np.searchsorted(x, -np.inf if lo is None else lo, side='left')) - 1, 0)
+        stop = min(int(np.searchsorted(x, np.inf if hi is None else hi, side='right')) + 1, len(x))
+    if method is None:
+        return np.arange(start, stop)
+    if method == 'minmax':
+        return start + minmax_indices(np.asarray(y, dtype=float)[start:stop], max(points // 2, 1))
+    if method == 'lttb':
+        return start + lttb_indices(x[start:stop], np.asarray(y, dtype=float)[start:stop], points)
+    raise ValueError(f"unknown downsampling method: {method}")
@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+from classes.tools import intervals
+"""
+Éclipses : direction du Soleil, test d'ombre (modèle cylindrique ou conique) et intervalles d'ombre et de pénombre,
+calculés par lots sur des trajectoires enregistrées ou sur des positions instantanées.
+"""
+
+
+class Sun:
+
+    def __init__(self, distance=1.495978707e11, radius=6.957e8, period=365.25636 * 86400, obliquity=23.44,
+                 longitude_0=0.):
+        """
+        Initialise un modèle simplifié du Soleil vu depuis une planète : orbite apparente circulaire dans le plan de
+        l'écliptique, incliné de l'obliquité par rapport au plan équatorial (x, y) de la planète.
+
+        :param distance: Distance entre la planète et le Soleil (en m, par défaut 1 UA).
+        :type distance: float
+        :param radius: Rayon du Soleil (en m).
+        :type radius: float
+        :param period: Période de l'orbite apparente (en s, par défaut une année sidérale).
+        :type period: float
+        :param obliquity: Inclinaison de l'écliptique sur l'équateur (en degrés, par défaut celle de la Terre).
+        :type obliquity: float
+        :param longitude_0: Longitude écliptique du Soleil à l'instant t = 0 (en degrés, par défaut 0 : axe x).
+        :type longitude_0: float
+        """
+        self.distance, self.radius, self.period = distance, radius, period
+        self.obliquity, self.longitude_0 = np.radians(obliquity), np.radians(longitude_0)
+
+    def get_position(self, times):
+        """
+        Calcule la position du Soleil, relative au centre de la planète, aux instants demandés.
+
+        :param times: Instants (en sec).
+        :type times: 1D-array   (T components)
+        :return: Positions du Soleil.
+        :rtype: 2D-array   (T*3 components)
+        """
+        angle = self.longitude_0 + 2 * np.pi / self.period * np.atleast_1d(np.asarray(times, dtype=float))
+        return self.distance * np.stack([np.cos(angle), np.cos(self.obliquity) * np.sin(angle),
+                                         np.sin(self.obliquity) * np.sin(angle)], axis=-1)
+
+    def get_direction(self, times):
+        """
+        Calcule la direction (unitaire) du Soleil depuis le centre de la planète, aux instants demandés.
+
+        :param times: Instants (en sec).
+        :type times: 1D-array   (T components)
+        :return: Directions du Soleil.
+        :rtype: 2D-array   (T*3 components)
+        """
+        return self.get_position(times) / self.distance
+
+
+def shadow_margins(positions, planet_radius, sun_positions, sun_radius, model='conical'):
+    """
+    Calcule, pour chaque satellite et chaque instant, deux marges positives dans l'ombre et négatives au soleil :
+    l'une pour l'ombre totale (umbra), l'autre pour l'ombre partielle ou totale (pénombre comprise).
+
+    Modèle cylindrique : l'ombre est un cylindre de rayon planet_radius derrière la planète (sans pénombre).
+    Modèle conique : comparaison des rayons apparents du Soleil (a) et de la planète (b) avec leur écart angulaire c,
+    vus depuis le satellite (umbra : c < b - a, pénombre : c < a + b).
+
+    :param positions: Positions des satellites, relatives au centre de la planète.
+    :type positions: 3D-array   (T*N*3 components)
+    :param planet_radius: Rayon de la planète (en m).
+    :type planet_radius: float
+    :param sun_positions: Positions du Soleil, relatives au centre de la planète.
+    :type sun_positions: 2D-array   (T*3 components)
+    :param sun_radius: Rayon du Soleil (en m).
+    :type sun_radius: float
+    :param model: Modèle d'ombre : 'conical' (par défaut) ou 'cylindrical'.
+    :type model: string
+    :return: Marges d'ombre totale et d'ombre (en m pour le modèle cylindrique, en rad pour le modèle conique).
+    :rtype: tuple   (2 * 2D-array, T*N components)
+    """
+    positions, sun_positions = np.asarray(positions, dtype=float), np.asarray(sun_positions, dtype=float)
+    with np.errstate(invalid='ignore'):
+        if model == 'cylindrical':
+            us = sun_positions / np.linalg.norm(sun_positions, axis=-1, keepdims=True)
+            along = np.einsum('tnk,tk->tn', positions, us)
+            perp = np.linalg.norm(positions - along[..., None] * us[:, None, :], axis=-1)
+            # Du côté du Soleil, la marge reste négative (sans changement de signe sur le terminateur)
+            margin = np.where(along < 0, planet_radius - perp, -np.linalg.norm(positions, axis=-1))
+            return margin, margin
+        to_sun = sun_positions[:, None, :] - positions
+        d_sun, d_planet = np.linalg.norm(to_sun, axis=-1), np.linalg.norm(positions, axis=-1)
+        a = np.arcsin(np.clip(sun_radius / d_sun, -1, 1))
+        b = np.arcsin(np.clip(planet_radius / d_planet, -1, 1))
+        c = np.arccos(np.clip(-np.sum(positions * to_sun, axis=-1) / (d_sun * d_planet), -1, 1))
+    return (b - a) - c, (a + b) - c
+
+
+def illumination(positions, planet_radius, sun_positions, sun_radius, model='conical'):
+    """
+    Calcule la fraction du disque solaire visible depuis chaque satellite (1 : au soleil, 0 : ombre totale).
+    Dans la pénombre (modèle conique), la fraction est obtenue par l'aire de recouvrement des deux disques apparents.
+
+    :param positions: Positions des satellites, relatives au centre de la planète.
+    :type positions: 3D-array   (T*N*3 components)
+    :param planet_radius: Rayon de la planète (en m).
+    :type planet_radius: float
+    :param sun_positions: Positions du Soleil, relatives au centre de la planète.
+    :type sun_positions: 2D-array   (T*3 components)
+    :param sun_radius: Rayon du Soleil (en m).
+    :type sun_radius: float
+    :param model: Modèle d'ombre : 'conical' (par défaut) ou 'cylindrical'.
+    :type model: string
+    :return: Fractions d'éclairement.
+    :rtype: 2D-array   (T*N components)
+    """
+    if model == 'cylindrical':
+        return np.where(shadow_margins(positions, planet_radius, sun_positions, sun_radius, model)[0] > 0, 0., 1.)
+    positions, sun_positions = np.asarray(positions, dtype=float), np.asarray(sun_positions, dtype=float)
+    to_sun = sun_positions[:, None, :] - positions
+    d_sun, d_planet = np.linalg.norm(to_sun, axis=-1), np.linalg.norm(positions, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        a = np.arcsin(np.clip(sun_radius / d_sun, -1, 1))
+        b = np.arcsin(np.clip(planet_radius / d_planet, -1, 1))
+        c = np.arccos(np.clip(-np.sum(positions * to_sun, axis=-1) / (d_sun * d_planet), -1, 1))
+        # Recouvrement partiel des disques apparents
+        x = (c ** 2 + a ** 2 - b ** 2) / (2 * c)
+        y = np.sqrt(np.maximum(a ** 2 - x ** 2, 0))
+        area = a ** 2 * np.arccos(np.clip(x / a, -1, 1)) + b ** 2 * np.arccos(np.clip((c - x) / b, -1, 1)) - c * y
+        nu = 1 - area / (np.pi * a ** 2)
+    nu = np.where(c >= a + b, 1., nu)
+    nu = np.where(c < a - b, 1 - b ** 2 / a ** 2, nu)    # Planète entièrement devant le disque solaire
+    return np.where(c < b - a, 0., nu)
+
+
+def eclipse_intervals(planet, sun, times, positions, names=None, model='conical', chunk=256):
+    """
+    Calcule les intervalles d'ombre de tous les satellites sur des trajectoires enregistrées, par blocs d'instants
+    (les entrées et sorties d'ombre sont interpolées, voir tools.intervals).
+
+    :param planet: Planète projetant l'ombre.
+    :type planet: Class Planet
+    :param sun: Modèle du Soleil.
+    :type sun: Class Sun
+    :param times: Instants des trajectoires (en sec).
+    :type times: 1D-array   (T components)
+    :param positions: Positions des satellites dans le repère inertiel (NaN si absent).
+    :type positions: 3D-array   (T*N*3 components)
+    :param names: Noms des satellites (par défaut leurs indices).
+    :type names: list[string]
+    :param model: Modèle d'ombre : 'conical' (par défaut) ou 'cylindrical'.
+    :type model: string
+    :param chunk: Nombre d'instants traités par bloc (par défaut 256).
+    :type chunk: int
+    :return: Une ligne par intervalle : satellite, kind ('umbra' : ombre totale, 'penumbra' : de l'entrée à la
+             sortie de la pénombre), start, end, duration.
+    :rtype: DataFrame   (from pandas)
+    """
+    times = np.asarray(times, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    if len(times):
+        # Positions relatives au centre de la planète à chaque instant (planète éventuellement en mouvement)
+        positions = positions - np.broadcast_to(planet.get_state(times)[0], (len(times), 3))[:, None, :]
+    n_sat = positions.shape[1]
+    names = list(range(n_sat)) if names is None else list(names)
+
+    def margins():
+        # Deux colonnes par satellite : ombre totale, puis ombre (pénombre comprise)
+        for start in range(0, len(times), chunk):
+            t = times[start:start + chunk]
+            umbra, shadow = shadow_margins(positions[start:start + chunk], planet.radius, sun.get_position(t),
+                                           sun.radius, model=model)
+            margin = np.concatenate([umbra, shadow], axis=1)
+            margin[np.isnan(margin)] = -np.inf
+            yield t, margin
+
+    column, start, end = intervals(margins())
+    kind, sat = np.divmod(column, n_sat)
+    return pd.DataFrame({'satellite': np.array(names, dtype=object)[sat],
+                         'kind': np.array(['umbra', 'penumbra'], dtype=object)[kind],
+                         'start': start, 'end': end, 'duration': end - start})
+
+
+def eclipse_fraction(planet, sun, times, positions, names=None, model='conical'):
+    """
+    Calcule la fraction du temps passée dans l'ombre par chaque satellite, sur l'ensemble des trajectoires.
+
+    :param planet: Planète projetant l'ombre.
+    :type planet: Class Planet
+    :param sun: Modèle du Soleil.
+    :type sun: Class Sun
+    :param times: Instants des trajectoires (en sec).
+    :type times: 1D-array   (T components)
+    :param positions: Positions des satellites dans le repère inertiel (NaN si absent).
+    :type positions: 3D-array   (T*N*3 components)
+    :param names: Noms des satellites (par défaut leurs indices).
+    :type names: list[string]
+    :param model: Modèle d'ombre : 'conical' (par défaut) ou 'cylindrical'.
+    :type model: string
+    :return: Une ligne par satellite : fractions du temps en ombre totale ('umbra') et en ombre ('penumbra').
+    :rtype: DataFrame   (from pandas)
+    """
+    names = list(range(np.shape(positions)[1])) if names is None else list(names)
+    df = eclipse_intervals(planet, sun, times, positions, names=names, model=model)
+    total = df.pivot_table(index='satellite', columns='kind', values='duration', aggfunc='sum')
+    total = total.reindex(index=names, columns=['umbra', 'penumbra']).fillna(0.)
+    total.columns.name = None
+    return total / (times[-1] - times[0])
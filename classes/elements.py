@@ -0,0 +1,224 @@
+import numpy as np
+"""
+Conversions entre états cartésiens (position, vitesse) et éléments orbitaux, képlériens ou équinoxiaux.
+Toutes les fonctions sont vectorisées sur des tableaux d'états (N*6), afin de traiter une trajectoire complète en un
+seul appel.
+"""
+
+# Tolérance en dessous de laquelle une orbite est considérée circulaire (excentricité) ou équatoriale (inclinaison)
+EPSILON = 1e-10
+
+
+def _dot(u, v):
+    """
+    Produit scalaire ligne à ligne de deux tableaux de vecteurs.
+    """
+    return np.einsum('ij,ij->i', u, v)
+
+
+def _unit(u):
+    """
+    Normalise chaque ligne d'un tableau de vecteurs (les vecteurs nuls donnent NaN).
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return u / np.linalg.norm(u, axis=1)[:, None]
+
+
+def _states(states):
+    """
+    Met en forme un ou plusieurs états cartésiens en un tableau N*6.
+    """
+    return np.atleast_2d(np.asarray(states, dtype=float)).reshape(-1, 6)
+
+
+def cartesian_to_keplerian(states, mu):
+    """
+    Convertit des états cartésiens en éléments képlériens. Les cas singuliers sont traités par convention :
+        - orbite équatoriale : longitude du noeud ascendant nulle, l'argument du périastre devient la longitude du
+          périastre,
+        - orbite circulaire : argument du périastre nul, l'anomalie vraie devient l'argument de latitude (ou la
+          longitude vraie si l'orbite est aussi équatoriale),
+        - trajectoire parabolique : demi-grand axe infini.
+
+    :param states: États cartésiens (x, y, z, vx, vy, vz), relatifs au centre de l'astre.
+    :type states: 2D-array   (N*6 components)
+    :param mu: Paramètre gravitationnel de l'astre (G * M).
+    :type mu: float
+    :return: Éléments (a, e, i, raan, argp, nu) : demi-grand axe (en m), excentricité, inclinaison, longitude du
+             noeud ascendant, argument du périastre et anomalie vraie (en rad, entre 0 et 2 pi).
+    :rtype: 2D-array   (N*6 components)
+    """
+    states = _states(states)
+    r, v = states[:, :3], states[:, 3:]
+    nr, nv = np.linalg.norm(r, axis=1), np.linalg.norm(v, axis=1)
+    h = np.cross(r, v)
+    nh = np.linalg.norm(h, axis=1)
+    uh = _unit(h)
+
+    # Vecteur excentricité et demi-grand axe (énergie spécifique)
+    e_vec = ((nv ** 2 - mu / nr)[:, None] * r - _dot(r, v)[:, None] * v) / mu
+    e = np.linalg.norm(e_vec, axis=1)
+    energy = nv ** 2 / 2 - mu / nr
+    with np.errstate(divide='ignore'):
+        a = np.where(np.abs(energy) > EPSILON * mu / nr, -mu / (2 * energy), np.inf)
+    i = np.arccos(np.clip(uh[:, 2], -1, 1))
+
+    # Ligne des noeuds (axe x si l'orbite est équatoriale)
+    n = np.stack([-h[:, 1], h[:, 0], np.zeros(len(h))], axis=1)
+    equatorial = np.linalg.norm(n, axis=1) <= EPSILON * nh
+    un = np.where(equatorial[:, None], (1., 0., 0.), _unit(n))
+    raan = np.where(equatorial, 0., np.arctan2(un[:, 1], un[:, 0]))
+    # Direction du périastre (ligne des noeuds si l'orbite est circulaire)
+    circular = e <= EPSILON
+    ue = np.where(circular[:, None], un, _unit(e_vec))
+    argp = np.arctan2(_dot(np.cross(un, ue), uh), _dot(un, ue))
+    nu = np.arctan2(_dot(np.cross(ue, r), uh), _dot(ue, r))
+
+    angles = np.mod(np.stack([raan, argp, nu], axis=1), 2 * np.pi)
+    return np.column_stack([a, e, i, angles])
+
+
+def _perifocal_to_inertial(raan, i, argp):
+    """
+    Matrices de passage du repère périfocal au repère inertiel (R3(raan) R1(i) R3(argp)), pour chaque orbite.
+    """
+    cO, sO, ci, si, cw, sw = np.cos(raan), np.sin(raan), np.cos(i), np.sin(i), np.cos(argp), np.sin(argp)
+    return np.stack([np.stack([cO * cw - sO * sw * ci, -cO * sw - sO * cw * ci, sO * si], axis=1),
+                     np.stack([sO * cw + cO * sw * ci, -sO * sw + cO * cw * ci, -cO * si], axis=1),
+                     np.stack([sw * si, cw * si, ci], axis=1)], axis=1)
+
+
+def keplerian_to_cartesian(elements, mu):
+    """
+    Convertit des éléments képlériens en états cartésiens (inverse de cartesian_to_keplerian).
+
+    :param elements: Éléments (a, e, i, raan, argp, nu).
+    :type elements: 2D-array   (N*6 components)
+    :param mu: Paramètre gravitationnel de l'astre (G * M).
+    :type mu: float
+    :return: États cartésiens (x, y, z, vx, vy, vz).
+    :rtype: 2D-array   (N*6 components)
+    """
+    a, e, i, raan, argp, nu = _states(elements).T
+    # Paramètre de l'orbite (non défini pour une trajectoire parabolique décrite par son demi-grand axe)
+    p = a * (1 - e ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = p / (1 + e * np.cos(nu))
+        k = np.sqrt(mu / p)
+    zeros = np.zeros(len(a))
+    r_pf = np.stack([r * np.cos(nu), r * np.sin(nu), zeros], axis=1)
+    v_pf = np.stack([-k * np.sin(nu), k * (e + np.cos(nu)), zeros], axis=1)
+    rot = _perifocal_to_inertial(raan, i, argp)
+    return np.column_stack([np.einsum('nij,nj->ni', rot, r_pf), np.einsum('nij,nj->ni', rot, v_pf)])
+
+
+def cartesian_to_equinoctial(states, mu):
+    """
+    Convertit des états cartésiens en éléments équinoxiaux modifiés, non singuliers pour les orbites circulaires et
+    équatoriales (seule l'inclinaison de pi reste singulière).
+
+    :param states: États cartésiens (x, y, z, vx, vy, vz), relatifs au centre de l'astre.
+    :type states: 2D-array   (N*6 components)
+    :param mu: Paramètre gravitationnel de l'astre (G * M).
+    :type mu: float
+    :return: Éléments (p, f, g, h, k, L) : paramètre (en m), composantes du vecteur excentricité (f, g) et du
+             vecteur inclinaison (h, k), longitude vraie (en rad, entre 0 et 2 pi).
+    :rtype: 2D-array   (N*6 components)
+    """
+    states = _states(states)
+    r, v = states[:, :3], states[:, 3:]
+    nr, nv = np.linalg.norm(r, axis=1), np.linalg.norm(v, axis=1)
+    hv = np.cross(r, v)
+    uh = _unit(hv)
+    p = np.sum(hv ** 2, axis=1) / mu
+    # Vecteur inclinaison : tan(i/2) * (cos raan, sin raan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        h, k = -uh[:, 1] / (1 + uh[:, 2]), uh[:, 0] / (1 + uh[:, 2])
+    uf, ug = _equinoctial_frame(h, k)
+    e_vec = ((nv ** 2 - mu / nr)[:, None] * r - _dot(r, v)[:, None] * v) / mu
+    L = np.mod(np.arctan2(_dot(r, ug), _dot(r, uf)), 2 * np.pi)
+    return np.column_stack([p, _dot(e_vec, uf), _dot(e_vec, ug), h, k, L])
+
+
+def _equinoctial_frame(h, k):
+    """
+    Vecteurs de base (f, g) du repère équinoxial, pour chaque orbite.
+    """
+    s2 = 1 + h ** 2 + k ** 2
+    uf = np.stack([1 - k ** 2 + h ** 2, 2 * k * h, -2 * k], axis=1) / s2[:, None]
+    ug = np.stack([2 * k * h, 1 + k ** 2 - h ** 2, 2 * h], axis=1) / s2[:, None]
+    return uf, ug
+
+
+def equinoctial_to_cartesian(elements, mu):
+    """
+    Convertit des éléments équinoxiaux modifiés en états cartésiens (inverse de cartesian_to_equinoctial).
+
+    :param elements: Éléments (p, f, g, h, k, L).
+    :type elements: 2D-array   (N*6 components)
+    :param mu: Paramètre gravitationnel de l'astre (G * M).
+    :type mu: float
+    :return: États cartésiens (x, y, z, vx, vy, vz).
+    :rtype: 2D-array   (N*6 components)
+    """
+    p, f, g, h, k, L = _states(elements).T
+    uf, ug = _equinoctial_frame(h, k)
+    cL, sL = np.cos(L), np.sin(L)
+    r = p / (1 + f * cL + g * sL)
+    c = np.sqrt(mu / p)
+    x = (r * cL)[:, None] * uf + (r * sL)[:, None] * ug
+    v = (-c * (g + sL))[:, None] * uf + (c * (f + cL))[:, None] * ug
+    return np.column_stack([x, v])
+
+
+def keplerian_to_equinoctial(elements):
+    """
+    Convertit des éléments képlériens en éléments équinoxiaux modifiés.
+
+    :param elements: Éléments (a, e, i, raan, argp, nu).
+    :type elements: 2D-array   (N*6 components)
+    :return: Éléments (p, f, g, h, k, L).
+    :rtype: 2D-array   (N*6 components)
+    """
+    a, e, i, raan, argp, nu = _states(elements).T
+    tan = np.tan(i / 2)
+    return np.column_stack([a * (1 - e ** 2), e * np.cos(argp + raan), e * np.sin(argp + raan),
+                            tan * np.cos(raan), tan * np.sin(raan), np.mod(raan + argp + nu, 2 * np.pi)])
+
+
+def equinoctial_to_keplerian(elements):
+    """
+    Convertit des éléments équinoxiaux modifiés en éléments képlériens (mêmes conventions que
+    cartesian_to_keplerian pour les cas singuliers).
+
+    :param elements: Éléments (p, f, g, h, k, L).
+    :type elements: 2D-array   (N*6 components)
+    :return: Éléments (a, e, i, raan, argp, nu).
+    :rtype: 2D-array   (N*6 components)
+    """
+    p, f, g, h, k, L = _states(elements).T
+    e = np.hypot(f, g)
+    with np.errstate(divide='ignore'):
+        a = np.where(np.abs(1 - e ** 2) > EPSILON, p / (1 - e ** 2), np.inf)
+    tan = np.hypot(h, k)
+    i = 2 * np.arctan(tan)
+    raan = np.where(tan > EPSILON, np.arctan2(k, h), 0.)
+    lon_peri = np.where(e > EPSILON, np.arctan2(g, f), raan)
+    angles = np.mod(np.stack([raan, lon_peri - raan, L - lon_peri], axis=1), 2 * np.pi)
+    return np.column_stack([a, e, i, angles])
+
+
+def period(a, mu):
+    """
+    Calcule la période orbitale à partir du demi-grand axe (NaN pour les trajectoires ouvertes).
+
+    :param a: Demi-grand axe (en m).
+    :type a: float or 1D-array
+    :param mu: Paramètre gravitationnel de l'astre (G * M).
+    :type mu: float
+    :return: Période orbitale (en s).
+    :rtype: float or 1D-array
+    """
+    a = np.asarray(a, dtype=float)
+    with np.errstate(invalid='ignore'):
+        return np.where(a > 0, 2 * np.pi * np.sqrt(a ** 3 / mu), np.nan)
@@ -0,0 +1,199 @@
+import numpy as np
+from classes.elements import keplerian_to_cartesian
+"""
+Éphémérides précalculées des corps en mouvement : les trajectoires connues (orbites képlériennes, fonctions
+quelconques du temps) sont approchées une seule fois par des segments de polynômes de Chebyshev, puis lues à chaque
+itération par une simple évaluation de polynôme.
+"""
+
+
+def solve_kepler(M, e, iterations=30):
+    """
+    Résout l'équation de Kepler (M = E - e sin E) pour des orbites elliptiques, par la méthode de Newton.
+
+    :param M: Anomalies moyennes (en rad).
+    :type M: 1D-array
+    :param e: Excentricités (e < 1).
+    :type e: float or 1D-array
+    :param iterations: Nombre maximal d'itérations (par défaut 30).
+    :type iterations: int
+    :return: Anomalies excentriques (en rad).
+    :rtype: 1D-array
+    """
+    M = np.mod(np.asarray(M, dtype=float), 2 * np.pi)
+    E = np.where(np.asarray(e) < 0.8, M, np.pi)
+    for _ in range(iterations):
+        delta = (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+        E = E - delta
+        if np.max(np.abs(delta), initial=0) < 1e-14:
+            break
+    return E
+
+
+class KeplerTrack:
+
+    def __init__(self, elements, mu, t0=0., center=None):
+        """
+        Initialise une trajectoire képlérienne elliptique connue, décrite par ses éléments à l'instant t0.
+
+        :param elements: Éléments (a, e, i, raan, argp, M0) : demi-grand axe (en m), excentricité, inclinaison,
+                         longitude du noeud ascendant, argument du périastre et anomalie moyenne à t0 (en rad).
+        :type elements: 1D-array   (6 components)
+        :param mu: Paramètre gravitationnel du corps central (G * M).
+        :type mu: float
+        :param t0: Instant de référence (en sec).
+        :type t0: float
+        :param center: Trajectoire du corps central (par défaut None : corps central fixe à l'origine).
+        :type center: callable
+        """
+        self.elements, self.mu, self.t0, self.center = np.asarray(elements, dtype=float), mu, t0, center
+        self.rate = np.sqrt(mu / self.elements[0] ** 3)
+
+    def __call__(self, t):
+        """
+        Retourne les positions et vitesses du corps aux instants demandés.
+
+        :param t: Instants (en sec).
+        :type t: 1D-array
+        :return: Positions et vitesses.
+        :rtype: tuple   (2 * 2D-array, T*3 components)
+        """
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        a, e, i, raan, argp, M0 = self.elements
+        E = solve_kepler(M0 + self.rate * (t - self.t0), e)
+        nu = 2 * np.arctan2(np.sqrt(1 + e) * np.sin(E / 2), np.sqrt(1 - e) * np.cos(E / 2))
+        elements = np.column_stack([np.full((len(t), 5), (a, e, i, raan, argp)), nu])
+        states = keplerian_to_cartesian(elements, self.mu)
+        x, v = states[:, :3], states[:, 3:]
+        if not self.center is None:
+            xc, vc = self.center(t)
+            x, v = x + xc, v + vc
+        return x, v
+
+
+class Ephemeris:
+
+    def __init__(self, track, t_start, t_end, segment=86400., degree=12):
+        """
+        Construit l'éphéméride d'un corps à partir de sa trajectoire connue : l'intervalle [t_start, t_end] est
+        découpé en segments de même durée, sur chacun desquels la position est approchée par un polynôme de
+        Chebyshev (interpolation aux noeuds de Chebyshev). La trajectoire est évaluée en un seul appel.
+
+        :param track: Trajectoire connue (t -> positions, ou t -> (positions, vitesses)), ex: KeplerTrack.
+        :type track: callable
+        :param t_start: Début de l'intervalle couvert (en sec).
+        :type t_start: float
+        :param t_end: Fin de l'intervalle couvert (en sec).
+        :type t_end: float
+        :param segment: Durée de chaque segment (en sec, par défaut 1 jour).
+        :type segment: float
+        :param degree: Degré des polynômes (par défaut 12).
+        :type degree: int
+        """
+        self.t_start, self.segment = float(t_start), float(segment)
+        n_seg = max(int(np.ceil((t_end - t_start) / segment)), 1)
+        self.t_end = self.t_start + n_seg * self.segment
+        n = degree + 1
+        # Noeuds de Chebyshev de chaque segment
+        k = np.arange(n)
+        nodes = np.cos(np.pi * (k + 0.5) / n)
+        times = self.t_start + (np.arange(n_seg)[:, None] + (nodes[None, :] + 1) / 2) * self.segment
+        values = track(times.reshape(-1))
+        values = values[0] if type(values) == tuple else values
+        values = np.asarray(values, dtype=float).reshape(n_seg, n, 3)
+        # Coefficients : c_j = 2/n * sum_k f(x_k) T_j(x_k)   (c_0 divisé par 2)
+        basis = np.cos(np.pi * np.outer(k, k + 0.5) / n) * 2 / n
+        basis[0] /= 2
+        self.coefs = np.einsum('jk,skd->sjd', basis, values)
+        # Coefficients des dérivées (par rapport à x dans [-1, 1]), pour les vitesses et les accélérations
+        self.dcoefs = self.derivative(self.coefs)
+        self.ddcoefs = self.derivative(self.dcoefs)
+
+    @staticmethod
+    def derivative(coefs):
+        """
+        Calcule les coefficients de la dérivée de séries de Chebyshev (par rapport à x dans [-1, 1]).
+
+        :param coefs: Coefficients de chaque segment.
+        :type coefs: 3D-array   (S*(degree+1)*3 components)
+        :return: Coefficients des dérivées.
+        :rtype: 3D-array   (S*(degree+1)*3 components)
+        """
+        degree = coefs.shape[1] - 1
+        dcoefs = np.zeros_like(coefs)
+        for j in range(degree, 0, -1):
+            dcoefs[:, j - 1] = 2 * j * coefs[:, j] + (dcoefs[:, j + 1] if j + 1 <= degree else 0)
+        dcoefs[:, 0] /= 2
+        return dcoefs
+
+    def covers(self, t_start, t_end):
+        """
+        Indique si l'éphéméride couvre l'intervalle demandé.
+
+        :param t_start: Début de l'intervalle (en sec).
+        :type t_start: float
+        :param t_end: Fin de l'intervalle (en sec).
+        :type t_end: float
+        :rtype: boolean
+        """
+        return self.t_start <= t_start and t_end <= self.t_end
+
+    def locate(self, t):
+        """
+        Retourne le segment de chaque instant, et la variable réduite x dans [-1, 1] de ce segment.
+        """
+        t = np.asarray(t, dtype=float)
+        seg = np.minimum(np.maximum((t - self.t_start) // self.segment, 0), len(self.coefs) - 1).astype(np.int64)
+        return seg, 2 * (t - self.t_start - seg * self.segment) / self.segment - 1
+
+    @staticmethod
+    def evaluate(coefs, x):
+        """
+        Évalue des séries de Chebyshev, une série par valeur de x : les polynômes T_j(x) = cos(j * arccos(x)) sont
+        calculés en une seule opération, puis combinés aux coefficients.
+
+        :param coefs: Coefficients de chaque série.
+        :type coefs: 2D-array or 3D-array   ((degree+1)*3 or N*(degree+1)*3 components)
+        :param x: Variables réduites, dans [-1, 1].
+        :type x: float or 1D-array
+        :return: Valeurs des séries.
+        :rtype: 1D-array or 2D-array   (3 or N*3 components)
+        """
+        basis = np.cos(np.multiply.outer(np.arccos(np.clip(x, -1, 1)), np.arange(coefs.shape[-2])))
+        return np.einsum('...j,...jd->...d', basis, coefs)
+
+    def position(self, t):
+        """
+        Retourne la position du corps aux instants demandés (un instant : une seule évaluation de polynôme).
+
+        :param t: Instant(s) (en sec).
+        :type t: float or 1D-array
+        :return: Position(s).
+        :rtype: 1D-array or 2D-array   (3 or T*3 components)
+        """
+        seg, x = self.locate(t)
+        return self.evaluate(self.coefs[seg], x)
+
+    def velocity(self, t):
+        """
+        Retourne la vitesse du corps aux instants demandés (dérivée de la série de Chebyshev).
+
+        :param t: Instant(s) (en sec).
+        :type t: float or 1D-array
+        :return: Vitesse(s).
+        :rtype: 1D-array or 2D-array   (3 or T*3 components)
+        """
+        seg, x = self.locate(t)
+        return self.evaluate(self.dcoefs[seg], x) * 2 / self.segment
+
+    def acceleration(self, t):
+        """
+        Évalue l'accélération du corps à un ou plusieurs instants (dérivée seconde des polynômes).
+
+        :param t: Instant(s) (en sec).
+        :type t: float or 1D-array
+        :return: Accélération(s).
+        :rtype: 1D-array or 2D-array   (3 or T*3 components)
+        """
+        seg, x = self.locate(t)
+        return self.evaluate(self.ddcoefs[seg], x) * (2 / self.segment) ** 2
@@ -0,0 +1,169 @@
+import queue
+import sys
+import threading
+from collections import namedtuple
+from time import monotonic
+import pandas as pd
+"""
+Journal d'événements de la simulation : les messages (contrôleurs, collisions, sphères d'influence, ...) sont
+enregistrés sous forme d'enregistrements typés, en mémoire, et interrogeables après la simulation. L'affichage est
+réalisé par un fil d'exécution dédié, limité en débit par catégorie : la boucle de simulation n'attend jamais la
+console.
+"""
+
+# Enregistrement d'un événement : instant simulé, catégorie, objet concerné, message et données associées
+Event = namedtuple('Event', ['time', 'category', 'source', 'message', 'data'])
+
+
+class EventLog:
+
+    def __init__(self, echo=True, rate=20, burst=50, stream=None):
+        """
+        Initialise le journal d'événements.
+
+        :param echo: Si True (par défaut), les événements sont aussi affichés (par le fil d'affichage).
+        :type echo: boolean
+        :param rate: Nombre moyen de messages affichés par seconde et par catégorie (par défaut 20). Les messages en
+                     excès sont enregistrés mais non affichés ; leur nombre est affiché ensuite.
+        :type rate: float
+        :param burst: Nombre de messages pouvant être affichés d'un coup par catégorie (par défaut 50).
+        :type burst: int
+        :param stream: Flux d'affichage (par défaut la sortie standard).
+        :type stream: file
+        """
+        self.echo, self.rate, self.burst, self.stream = echo, rate, burst, stream
+        self.records = []
+        # Limitation du débit d'affichage : jetons disponibles, date de mise à jour et messages non affichés
+        self.tokens, self.updated, self.suppressed = {}, {}, {}
+        self.queue, self.writer = queue.Queue(), None
+
+    def __len__(self):
+        """
+        Retourne le nombre d'événements enregistrés.
+
+        :rtype: int
+        """
+        return len(self.records)
+
+    def log(self, category, message, time=None, source=None, **data):
+        """
+        Enregistre un événement, et le transmet au fil d'affichage si le débit de sa catégorie le permet. Ne réalise
+        aucune écriture sur la console.
+
+        :param category: Catégorie de l'événement (ex: 'ctr', 'crash', 'soi', 'info').
+        :type category: string
+        :param message: Message de l'événement.
+        :type message: string
+        :param time: Instant simulé de l'événement (en sec).
+        :type time: float
+        :param source: Nom de l'objet concerné.
+        :type source: string
+        :param data: Données associées à l'événement.
+        """
+        event = Event(time, category, source, message, data)
+        self.records.append(event)
+        if self.echo and self.allow(category):
+            self.write(self.format(event))
+
+    def allow(self, category):
+        """
+        Indique si un message de la catégorie peut être affiché (seau à jetons, un par catégorie).
+
+        :param category: Catégorie du message.
+        :type category: string
+        :rtype: boolean
+        """
+        now = monotonic()
+        tokens = min(self.burst, self.tokens.get(category, self.burst) + (now - self.updated.get(category, now)) *
+                     self.rate)
+        self.updated[category] = now
+        if tokens < 1:
+            self.tokens[category] = tokens
+            self.suppressed[category] = self.suppressed.get(category, 0) + 1
+            return False
+        self.tokens[category] = tokens - 1
+        if self.suppressed.get(category):
+            self.write(f"   | {category}: {self.suppressed.pop(category)} messages not displayed")
+        return True
+
+    @staticmethod
+    def format(event):
+        """
+        Met en forme un événement pour l'affichage.
+
+        :param event: Événement.
+        :type event: Event
+        :rtype: string
+        """
+        text = f"   | {event.category}: {event.message}"
+        if not event.source is None:
+            text += f"   [{event.source}]"
+        return text if event.time is None else text + f"   ({event.time} sec)"
+
+    def write(self, text):
+        """
+        Transmet un texte au fil d'affichage (démarré à la première utilisation).
+
+        :param text: Texte à afficher.
+        :type text: string
+        """
+        if self.writer is None or not self.writer.is_alive():
+            self.writer = threading.Thread(target=self.work, daemon=True)
+            self.writer.start()
+        self.queue.put(text)
+
+    def work(self):
+        """
+        Boucle du fil d'affichage : écrit les textes reçus, en vidant le flux lorsque la file est vide.
+        """
+        while True:
+            text = self.queue.get()
+            stream = sys.stdout if self.stream is None else self.stream
+            stream.write(text + '\n')
+            if self.queue.empty():
+                stream.flush()
+            self.queue.task_done()
+
+    def flush(self):
+        """
+        Affiche le nombre de messages non affichés, puis attend que tous les messages transmis soient écrits (fin de
+        simulation).
+        """
+        for category, count in list(self.suppressed.items()):
+            self.write(f"   | {category}: {count} messages not displayed")
+        self.suppressed = {}
+        if not self.writer is None:
+            self.queue.join()
+
+    def query(self, category=None, source=None, t_min=None, t_max=None):
+        """
+        Recherche les événements enregistrés.
+
+        :param category: Catégorie(s) recherchée(s) (par défaut toutes).
+        :type category: string or list[string]
+        :param source: Nom de l'objet concerné (par défaut tous).
+        :type source: string
+        :param t_min: Instant simulé minimal (en sec).
+        :type t_min: float
+        :param t_max: Instant simulé maximal (en sec).
+        :type t_max: float
+        :return: Une ligne par événement : time, category, source, message, data.
+        :rtype: DataFrame   (from pandas)
+        """
+        categories = None if category is None else ({category} if type(category) == str else set(category))
+        records = [e for e in self.records if (categories is None or e.category in categories) and
+                   (source is None or e.source == source) and
+                   (t_min is None or (not e.time is None and e.time >= t_min)) and
+                   (t_max is None or (not e.time is None and e.time <= t_max))]
+        return pd.DataFrame(records, columns=Event._fields)
+
+    def count(self):
+        """
+        Compte les événements enregistrés par catégorie.
+
+        :rtype: dict
+        """
+        counts = {}
+        for event in self.records:
+            counts[event.category] = counts.get(event.category, 0) + 1
+        return counts
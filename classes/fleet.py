@@ -0,0 +1,596 @@
+import numpy as np
+from classes.controler import FleetControler, THRUSTER_DIRECTIONS
+from classes.satellite import plot_boxes
+from classes.soi import G, kepler_propagate
+from classes.relative import to_lvlh, from_lvlh, cw_propagate
+from classes.parallel import FleetWorkers
+
+# Configuration de propulseurs d'une flotte (identique à Satellite.add('auto_build_thrusters'))
+THRUSTER_NAMES = ('main', 'left', 'right', 'brake')
+THRUSTER_RATIOS = np.array([12, 1 / 200, 1 / 200, 1])     # Poussée maximale / masse du satellite
+
+
+# Tableaux d'états d'une flotte (une ligne par satellite)
+FLEET_ARRAYS = ['mass', 'size', 'inertia', 'x', 'v', 'ag', 'a', 'axes', 'a_ang', 'v_ang', 'x_ang', 'alive',
+                'islanded', 'istakingoff', 'xr', 'thrust_max', 'torque_max', 'power']
+
+
+def member_states(mass, x, v=None, size=(1, 1, 1), thrusters=True):
+    """
+    Construit les tableaux d'états initiaux de nouveaux satellites de flotte (voir FLEET_ARRAYS).
+
+    :param mass: Masse des satellites (une valeur commune, ou une par satellite).
+    :type mass: float or 1D-array
+    :param x: Positions initiales des satellites.
+    :type x: 2D-array   (N*3 components)
+    :param v: Vitesses initiales des satellites (par défaut nulles).
+    :type v: 2D-array   (N*3 components)
+    :param size: Taille des satellites (une commune, ou une par satellite).
+    :type size: 1D-array or 2D-array   (3 or N*3 components)
+    :param thrusters: Si False, les satellites n'ont pas de propulseurs.
+    :type thrusters: boolean
+    :return: Nom de l'état -> tableau.
+    :rtype: dict
+    """
+    x = np.array(x, dtype=float).reshape(-1, 3)
+    n = len(x)
+    # Masse, taille et inertie
+    mass = np.broadcast_to(np.asarray(mass, dtype=float), (n,)).copy()
+    s = np.broadcast_to(np.asarray(size, dtype=float), (n, 3)).copy()
+    inertia = 1/12 * mass[:, None] * np.stack([s[:, 1]**2 + s[:, 2]**2, s[:, 0]**2 + s[:, 2]**2,
+                                               s[:, 0]**2 + s[:, 1]**2], axis=1)
+    states = {'mass': mass, 'size': s, 'inertia': inertia}
+
+    # Position, Vitesse et Accélération :
+    states['x'] = x
+    states['v'] = np.zeros((n, 3)) if v is None else np.array(v, dtype=float).reshape(-1, 3)
+    states['ag'], states['a'] = np.zeros((n, 3)), np.zeros((n, 3))
+    # Orientation : axes propres (ux, uy, uz) de chaque satellite, et angles
+    states['axes'] = np.tile(np.eye(3), (n, 1, 1))
+    for key in ['a_ang', 'v_ang', 'x_ang']:
+        states[key] = np.zeros((n, 3))
+    states['alive'] = np.ones(n, dtype=bool)
+    states['islanded'], states['istakingoff'] = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+
+    # Propulseurs : position par rapport au centre de masse, poussée et couple maximaux, puissance actuelle
+    xr = np.zeros((n, len(THRUSTER_NAMES), 3))
+    xr[:, 0, 0], xr[:, 3, 0] = -s[:, 0] / 2, -s[:, 0] / 2
+    xr[:, 1] = np.stack([-s[:, 0] / 3, s[:, 1] / 2, np.zeros(n)], axis=1)
+    xr[:, 2] = np.stack([-s[:, 0] / 3, -s[:, 1] / 2, np.zeros(n)], axis=1)
+    states['xr'] = xr
+    states['thrust_max'] = mass[:, None] * THRUSTER_RATIOS if thrusters else np.zeros((n, len(THRUSTER_NAMES)))
+    states['torque_max'] = states['thrust_max'][..., None] * np.cross(xr, THRUSTER_DIRECTIONS)
+    states['power'] = np.zeros((n, len(THRUSTER_NAMES)))
+    return states
+
+
+class Fleet:
+
+    def __init__(self, mass, x, v=None, size=(1, 1, 1), name='fleet', names=None, planet_ref=None, color='g',
+                 scale=1, thrusters=True):
+        """
+        Initialise une flotte de satellites identiques dans leur principe (4 propulseurs construits automatiquement),
+        dont tous les états sont stockés sous forme de tableaux : une ligne par satellite. L'intégration, les
+        collisions et le contrôleur de la flotte sont évalués par opérations vectorielles sur l'ensemble des
+        satellites, au lieu d'un appel par satellite.
+
+        :param mass: Masse des satellites (une valeur commune, ou une par satellite).
+        :type mass: float or 1D-array
+        :param x: Positions initiales des satellites.
+        :type x: 2D-array   (N*3 components)
+        :param v: Vitesses initiales des satellites (par défaut nulles).
+        :type v: 2D-array   (N*3 components)
+        :param size: Taille des satellites (une commune, ou une par satellite).
+        :type size: 1D-array or 2D-array   (3 or N*3 components)
+        :param name: Nom de la flotte (par défaut 'fleet').
+        :type name: string
+        :param names: Nom de chaque satellite (par défaut 'name-i').
+        :type names: list[string]
+        :param planet_ref: Planète de référence commune à la flotte (par défaut None).
+        :type planet_ref: Class Planet
+        :param color: Couleur des satellites sur les graphiques (par défaut 'g').
+        :type color: string
+        :param scale: Échelle des satellites sur les graphiques (ne change pas les caractéristiques mécaniques).
+        :type scale: float
+        :param thrusters: Si False, les satellites n'ont pas de propulseurs (poussées maximales nulles, objets passifs).
+        :type thrusters: boolean
+        """
+        x = np.array(x, dtype=float).reshape(-1, 3)
+        n = len(x)
+        self.name = name
+        self.names = list(names) if not names is None else [f"{name}-{i}" for i in range(n)]
+        self.index = {sat: i for i, sat in enumerate(self.names)}
+        self.simulator = None
+        self.planet_ref = planet_ref
+        self.color, self.scale = color, scale
+
+        # États de chaque satellite (voir member_states), dans des tableaux à capacité extensible (voir extend)
+        for key, value in member_states(mass, x, v, size, thrusters).items():
+            setattr(self, key, value)
+        self.buffers, self.capacity = {key: getattr(self, key) for key in FLEET_ARRAYS}, n
+        self.n_alive = n # Nombre de satellites en vie (tenu à jour par crash et extend)
+        self.thrust, self.torque = np.zeros((n, 3)), np.zeros((n, 3))
+
+        # Contrôles manuels et contrôleur de flotte
+        self.controls = {}
+        self.controler = FleetControler()
+        self.controler.load(fleet=self)
+
+        # Mouvement relatif autour d'un satellite chef (voir set_chief)
+        self.chief, self.chief_planet, self.e_max = None, None, 1e-3
+        self.rel_x, self.rel_v = None, None
+        # Processus de calcul en mémoire partagée (voir set_workers)
+        self.workers = None
+
+    def __len__(self):
+        """
+        Retourne le nombre de satellites de la flotte.
+
+        :return: Nombre de satellites.
+        :rtype: int
+        """
+        return len(self.x)
+
+    def extend(self, mass, x, v=None, size=(1, 1, 1), names=None, thrusters=False):
+        """
+        Ajoute des satellites à la flotte en une seule opération. Les tableaux d'états ont une capacité extensible :
+        lorsqu'elle est dépassée, elle est au moins doublée, de sorte que des ajouts répétés ont un coût amorti
+        proportionnel au nombre de satellites ajoutés. Les nouveaux satellites sont enregistrés à partir de leur
+        premier pas de temps.
+
+        :param mass: Masse des nouveaux satellites (une valeur commune, ou une par satellite).
+        :type mass: float or 1D-array
+        :param x: Positions initiales.
+        :type x: 2D-array   (K*3 components)
+        :param v: Vitesses initiales (par défaut nulles).
+        :type v: 2D-array   (K*3 components)
+        :param size: Taille des nouveaux satellites (une commune, ou une par satellite).
+        :type size: 1D-array or 2D-array   (3 or K*3 components)
+        :param names: Nom de chaque nouveau satellite (par défaut 'name-i').
+        :type names: list[string]
+        :param thrusters: Si True, les nouveaux satellites reçoivent les 4 propulseurs (par défaut False).
+        :type thrusters: boolean
+        :return: Indices des nouveaux satellites.
+        :rtype: 1D-array   (int)
+        """
+        states = member_states(mass, x, v, size, thrusters)
+        n, k = len(self), len(states['x'])
+        workers = 0 if self.workers is None else len(self.workers)
+        if workers:
+            self.set_workers(0)
+        # Les tableaux remplacés depuis leur création (ex: rechargement d'un cache) sont recopiés dans les réserves
+        for key in FLEET_ARRAYS:
+            if not np.shares_memory(getattr(self, key), self.buffers[key]):
+                self.buffers[key][:n] = getattr(self, key)
+        if n + k > self.capacity:
+            self.capacity = max(2 * self.capacity, n + k)
+            for key in FLEET_ARRAYS:
+                buffer = np.empty((self.capacity,) + self.buffers[key].shape[1:], dtype=self.buffers[key].dtype)
+                buffer[:n] = self.buffers[key][:n]
+                self.buffers[key] = buffer
+        for key in FLEET_ARRAYS:
+            self.buffers[key][n:n + k] = states[key]
+            setattr(self, key, self.buffers[key][:n + k])
+        self.thrust, self.torque = np.zeros((n + k, 3)), np.zeros((n + k, 3))
+        self.n_alive = int(np.sum(self.alive))
+
+        names = list(names) if not names is None else [f"{self.name}-{i}" for i in range(n, n + k)]
+        self.index.update({sat: i for i, sat in enumerate(names, start=n)})
+        self.names.extend(names)
+        self.controler.resize(n + k)
+        if not self.chief is None:
+            pln = self.chief_planet
+            rel_x, rel_v = to_lvlh(self.chief.x - pln.x, self.chief.v - pln.v, self.x[n:] - pln.x, self.v[n:] - pln.v)
+            self.rel_x, self.rel_v = np.concatenate([self.rel_x, rel_x]), np.concatenate([self.rel_v, rel_v])
+        if workers:
+            self.set_workers(workers)
+        return np.arange(n, n + k)
+
+    def linkto(self, simulator):
+        """
+        Lie la flotte à un simulateur existant.
+
+        :param simulator: Simulateur auquel la flotte doit être liée.
+        :type simulator: Simulator (class)
+        """
+        self.simulator = simulator
+        self.controler.load(fleet=self)
+
+    def get_ag(self, planets, bodies=None, index=None):
+        """
+        Calcule l'accélération gravitationnelle subie par les satellites désignés.
+
+        :param planets: Liste des objets planètes.
+        :type planets: list[Planet (class)]
+        :param bodies: Indice de la planète dominante de chaque satellite : seule son attraction est prise en compte
+                       (par défaut None : toutes les planètes).
+        :type bodies: 1D-array   (int)
+        :param index: Indices des satellites concernés (par défaut None : tous les satellites).
+        :type index: 1D-array   (int)
+        :return: Accélération gravitationnelle de chaque satellite concerné.
+        :rtype: 2D-array   (N*3 components)
+        """
+        x = self.x if index is None else self.x[index]
+        ag = np.zeros(x.shape)
+        if not bodies is None:
+            bodies = bodies if index is None else bodies[index]
+            d = x - np.array([pln.x for pln in planets], dtype=float)[bodies]
+            n = np.linalg.norm(d, axis=1)[:, None]
+            return -(d / n) * 6.67*10**-11 * np.array([pln.mass for pln in planets])[bodies, None] / n ** 2
+        for pln in planets:
+            d = x - pln.x
+            n = np.linalg.norm(d, axis=1)[:, None]
+            ag = ag + -(d / n) * 6.67*10**-11 * pln.mass / n ** 2
+        return ag
+
+    def get_thrust(self):
+        """
+        Calcule la force totale et le couple total générés par les propulseurs de chaque satellite, dans le repère
+        global.
+
+        :return: Force totale et couple total de chaque satellite.
+        :rtype: tuple   (2 * 2D-array, N*3 components)
+        """
+        thrust = np.einsum('nk,nk,kj->nj', self.power, self.thrust_max, THRUSTER_DIRECTIONS)
+        torque = np.einsum('nk,nkj->nj', self.power, self.torque_max)
+        # Conversion dans la base de chaque satellite
+        self.thrust = np.einsum('nij,ni->nj', self.axes, thrust)
+        self.torque = np.einsum('nij,ni->nj', self.axes, torque)
+        return self.thrust, self.torque
+
+    def get_radius(self):
+        """
+        Calcule la distance entre chaque satellite et la planète de référence.
+
+        :return: Rayons (NaN si aucune planète de référence).
+        :rtype: 1D-array
+        """
+        saved = None if self.workers is None else self.workers.get_saved('radius')
+        if not saved is None:
+            return saved
+        if self.planet_ref is None:
+            return np.full(len(self), np.nan)
+        return np.linalg.norm(self.x - self.planet_ref.x, axis=1)
+
+    def get_speed(self):
+        """
+        Calcule la vitesse de chaque satellite.
+
+        :return: Vitesses.
+        :rtype: 1D-array
+        """
+        saved = None if self.workers is None else self.workers.get_saved('speed')
+        if not saved is None:
+            return saved
+        return np.linalg.norm(self.v, axis=1)
+
+    def rotate(self, dalpha, mask):
+        """
+        Fait tourner les axes propres des satellites désignés, successivement autour des axes x, y puis z.
+
+        :param dalpha: Angles de rotation autour de chaque axe (en radians).
+        :type dalpha: 2D-array   (N*3 components)
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        """
+        for axe in range(3):
+            turn = mask & (dalpha[:, axe] != 0)
+            if not np.any(turn):
+                continue
+            c, s = np.cos(dalpha[turn, axe]), np.sin(dalpha[turn, axe])
+            rot = np.tile(np.eye(3), (len(c), 1, 1))
+            i, j = [(1, 2), (0, 2), (0, 1)][axe]
+            sign = -1 if axe == 1 else 1        # Rotation autour de y : signes inversés
+            rot[:, i, i], rot[:, j, j] = c, c
+            rot[:, i, j], rot[:, j, i] = -sign * s, sign * s
+            self.axes[turn] = np.einsum('nij,nkj->nki', rot, self.axes[turn])
+
+    def step(self, planets, infos=0, bodies=None, kepler=False):
+        """
+        Effectue un pas de simulation pour tous les satellites de la flotte.
+
+        :param planets: Liste des planètes présentes dans la simulation.
+        :type planets: list[Class Planet]
+        :param infos: Quantité d'informations à afficher (toutes les 'infos' étapes. Si 0, affiche aucune infos).
+        :type infos: int
+        :param bodies: Indice de la planète dominante de chaque satellite (par défaut None : toutes les planètes).
+        :type bodies: 1D-array   (int)
+        :param kepler: Si True (et bodies précisé), les satellites sans poussée suivent exactement leur orbite
+                       képlérienne autour de leur planète dominante (par défaut False).
+        :type kepler: boolean
+        """
+        moving = self.alive & (~self.islanded | self.istakingoff)
+        relative = not self.chief is None and self.chief.alive
+        if np.any(moving) and not self.workers is None and not relative:
+            self.parallel_step(planets=planets, bodies=bodies, kepler=kepler)
+        elif np.any(moving):
+            F, C = self.get_thrust()
+            # Coniques raccordées : accélération propre de la planète dominante de chaque satellite, entraîné avec elle
+            drift = 0. if bodies is None else np.array([pln.a for pln in planets], dtype=float)[bodies]
+            # Force :
+            if relative:
+                # Mouvement relatif : l'accélération est calculée comme en repère inertiel (y compris pour les
+                # satellites sans poussée), mais seuls les satellites en poussée sont intégrés, les autres sont
+                # propagés analytiquement par relative_step
+                ag = self.get_ag(planets=planets, bodies=bodies)
+                self.ag[moving] = ag[moving]
+                a = self.ag + F / self.mass[:, None] + drift
+                thrusting = np.flatnonzero(moving & np.any(self.power, axis=1))
+                x, v = self.x.copy(), self.v.copy()
+                if len(thrusting):
+                    x[thrusting], v[thrusting], a[thrusting] = self.simulator.integrate(
+                        f=self.x[thrusting], df=self.v[thrusting], ddf=a[thrusting])
+                x, v = self.relative_step(x, v, moving)
+            else:
+                ag = self.get_ag(planets=planets, bodies=bodies)
+                self.ag[moving] = ag[moving]
+                a = self.ag + F / self.mass[:, None] + drift
+                x, v, a = self.simulator.integrate(f=self.x, df=self.v, ddf=a)
+            if kepler and not bodies is None and not relative:
+                # Vol balistique : propagation képlérienne autour de la planète dominante
+                coasting = np.flatnonzero(moving & ~np.any(self.power, axis=1))
+                x[coasting], v[coasting] = self.kepler_step(planets, bodies, coasting)
+            self.x[moving], self.v[moving], self.a[moving] = x[moving], v[moving], a[moving]
+            # Couple :
+            a_ang = C / self.inertia
+            x_ang, v_ang, a_ang = self.simulator.integrate(f=self.x_ang, df=self.v_ang, ddf=a_ang)
+            delta_ang = x_ang - self.x_ang
+            self.x_ang[moving], self.v_ang[moving], self.a_ang[moving] = x_ang[moving], v_ang[moving], a_ang[moving]
+            # Mise à jour des axes des satellites
+            self.rotate(dalpha=delta_ang, mask=moving)
+            # Vérifie s'il y a eu une collision avec une planète
+            self.check_for_collision(planets=planets, mask=moving & ~(self.islanded | self.istakingoff),
+                                     bodies=bodies)
+        # Mise à jour des contrôles de la flotte
+        self.update_controls(infos=infos)
+
+    def parallel_step(self, planets, bodies=None, kepler=False):
+        """
+        Effectue un pas de simulation réparti entre les processus de calcul (voir set_workers) : chacun traite sa
+        tranche de satellites (poussée, intégration, attitude, collisions, rayons et vitesses sauvegardés). Seules
+        la propagation képlérienne, dont la convergence porte sur tous les satellites, et la journalisation des
+        collisions restent dans le processus principal.
+
+        :param planets: Liste des planètes présentes dans la simulation.
+        :type planets: list[Class Planet]
+        :param bodies: Indice de la planète dominante de chaque satellite (par défaut None : toutes les planètes).
+        :type bodies: 1D-array   (int)
+        :param kepler: Si True (et bodies précisé), les satellites sans poussée suivent exactement leur orbite
+                       képlérienne autour de leur planète dominante (par défaut False).
+        :type kepler: boolean
+        """
+        x, v = self.workers.integrate(planets, bodies=bodies)
+        if kepler and not bodies is None:
+            # Vol balistique : propagation képlérienne autour de la planète dominante
+            moving = self.alive & (~self.islanded | self.istakingoff)
+            coasting = np.flatnonzero(moving & ~np.any(self.power, axis=1))
+            x[coasting], v[coasting] = self.kepler_step(planets, bodies, coasting)
+        hit = self.workers.commit(planet_ref=self.planet_ref)
+        crashed = hit[hit >= 0]
+        if len(crashed):
+            for i in np.unique(crashed):
+                self.log_crash(planets[i], int(np.sum(crashed == i)))
+
+    def set_workers(self, workers):
+        """
+        Répartit le pas de simulation des satellites entre plusieurs processus de calcul, sur des tableaux en mémoire
+        partagée (voir Class FleetWorkers et parallel_step). Les résultats sont identiques à ceux d'un calcul en un seul processus.
+
+        :param workers: Nombre de processus de calcul (0 : calcul dans le processus principal).
+        :type workers: int
+        """
+        if not self.workers is None:
+            self.workers.close()
+            self.workers = None
+        if workers > 0:
+            self.workers = FleetWorkers(self, workers)
+
+    def set_chief(self, chief, planet=None, e_max=1e-3):
+        """
+        Active le mouvement relatif : les satellites de la flotte sont des adjoints d'un satellite chef, et leur état
+        relatif dans le repère local orbital du chef (radial, le long de la trace, normal) est conservé. Sans poussée,
+        il est propagé par la solution analytique de Clohessy-Wiltshire (orbite du chef quasi circulaire), ou par
+        propagation képlérienne exacte si l'orbite du chef est excentrique ; les satellites en poussée sont intégrés
+        normalement. Le chef doit être un satellite de la simulation (intégré avant les flottes).
+
+        :param chief: Satellite chef (None : désactive le mouvement relatif).
+        :type chief: Class Satellite
+        :param planet: Planète autour de laquelle orbite le chef (par défaut sa planète de référence, ou celle de la
+                       flotte).
+        :type planet: Class Planet
+        :param e_max: Excentricité maximale de l'orbite du chef pour utiliser Clohessy-Wiltshire (par défaut 1e-3).
+        :type e_max: float
+        """
+        self.chief, self.e_max = chief, e_max
+        if chief is None:
+            self.chief_planet, self.rel_x, self.rel_v = None, None, None
+            return
+        self.chief_planet = planet if not planet is None else (
+            chief.planet_ref if not chief.planet_ref is None else self.planet_ref)
+        if self.chief_planet is None:
+            raise ValueError(f"no reference planet for the chief {chief.name} of {self.name}")
+        pln = self.chief_planet
+        self.rel_x, self.rel_v = to_lvlh(chief.x - pln.x, chief.v - pln.v, self.x - pln.x, self.v - pln.v)
+
+    def relative_step(self, x, v, mask):
+        """
+        Calcule l'état des satellites désignés après un pas de temps en mouvement relatif (voir set_chief) : les
+        satellites sans poussée sont propagés analytiquement, ceux en poussée conservent l'état intégré (x, v).
+
+        :param x: Positions intégrées après un pas de temps.
+        :type x: 2D-array   (N*3 components)
+        :param v: Vitesses intégrées après un pas de temps.
+        :type v: 2D-array   (N*3 components)
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        :return: Positions et vitesses après un pas de temps.
+        :rtype: tuple   (2 * 2D-array, N*3 components)
+        """
+        time, dt, pln = self.simulator.time, self.simulator.dt, self.chief_planet
+        # Le chef a déjà été intégré : son état est celui de la fin du pas de temps
+        xp, vp = pln.get_state(time + dt)
+        rc, vc = self.chief.x - xp, self.chief.v - vp
+        mu = G * pln.mass
+        coasting = mask & ~np.any(self.power, axis=1)
+        integrated = mask & ~coasting
+        if np.any(coasting):
+            nr, nv = np.linalg.norm(rc), np.linalg.norm(vc)
+            e = np.linalg.norm((nv ** 2 - mu / nr) * rc - np.dot(rc, vc) * vc) / mu
+            if e <= self.e_max:
+                # Clohessy-Wiltshire : l'état relatif est propagé directement
+                n = np.sqrt(mu * (2 / nr - nv ** 2 / mu) ** 3)
+                rho, drho = cw_propagate(self.rel_x[coasting], self.rel_v[coasting], n, dt)
+                self.rel_x[coasting], self.rel_v[coasting] = rho, drho
+                r, w = from_lvlh(rc, vc, rho, drho)
+            else:
+                # Orbite du chef excentrique : propagation képlérienne exacte de chaque adjoint
+                x0, v0 = pln.get_state(time)
+                r, w = kepler_propagate(self.x[coasting] - x0, self.v[coasting] - v0, dt, mu)
+                integrated = mask
+            x[coasting], v[coasting] = xp + r, vp + w
+        if np.any(integrated):
+            self.rel_x[integrated], self.rel_v[integrated] = to_lvlh(rc, vc, x[integrated] - xp, v[integrated] - vp)
+        return x, v
+
+    def get_relative(self):
+        """
+        Retourne l'état relatif des satellites dans le repère local orbital du chef (voir set_chief).
+
+        :return: Positions et vitesses relatives (x radial, y le long de la trace, z normal).
+        :rtype: tuple   (2 * 2D-array, N*3 components)
+        """
+        return self.rel_x, self.rel_v
+
+    def kepler_step(self, planets, bodies, index):
+        """
+        Calcule l'état des satellites désignés après un pas de temps, sur leur orbite képlérienne autour de leur
+        planète dominante (coniques raccordées).
+
+        :param planets: Liste des objets planètes.
+        :type planets: list[Planet (class)]
+        :param bodies: Indice de la planète dominante de chaque satellite.
+        :type bodies: 1D-array   (int)
+        :param index: Indices des satellites concernés.
+        :type index: 1D-array   (int)
+        :return: Positions et vitesses après un pas de temps.
+        :rtype: tuple   (2 * 2D-array, N*3 components)
+        """
+        time, dt = self.simulator.time, self.simulator.dt
+        start = [pln.get_state(time) for pln in planets]
+        end = [pln.get_state(time + dt) for pln in planets]
+        body = bodies[index]
+        x0, v0 = np.array([s[0] for s in start])[body], np.array([s[1] for s in start])[body]
+        x1, v1 = np.array([s[0] for s in end])[body], np.array([s[1] for s in end])[body]
+        mu = G * np.array([pln.mass for pln in planets])[body]
+        r, v = kepler_propagate(self.x[index] - x0, self.v[index] - v0, dt, mu)
+        return x1 + r, v1 + v
+
+    def check_for_collision(self, planets, mask, bodies=None):
+        """
+        Vérifie s'il y a une collision entre les satellites désignés et les planètes spécifiées, et tue les
+        satellites concernés.
+
+        :param planets: Liste des objets planètes.
+        :type planets: list[Planet (class)]
+        :param mask: Satellites concernés.
+        :type mask: 1D-array   (boolean)
+        :param bodies: Indice de la planète dominante de chaque satellite : seule une collision avec celle-ci est
+                       recherchée (par défaut None : toutes les planètes).
+        :type bodies: 1D-array   (int)
+        """
+        if not bodies is None:
+            # Uniquement la planète dominante de chaque satellite
+            d = self.x - np.array([pln.x for pln in planets], dtype=float)[bodies]
+            n = np.linalg.norm(d, axis=1)
+            crash = mask & self.alive & (n < np.array([pln.radius for pln in planets])[bodies])
+            for i in np.unique(bodies[crash]):
+                self.crash(planets[i], crash & (bodies == i), d, n)
+            return
+        for pln in planets:
+            d = self.x - pln.x
+            n = np.linalg.norm(d, axis=1)
+            crash = mask & self.alive & (n < pln.radius)
+            if np.any(crash):
+                self.crash(pln, crash, d, n)
+
+    def crash(self, pln, crash, d, n):
+        """
+        Tue les satellites désignés, entrés en collision avec la planète, et les replace à sa surface.
+
+        :param pln: Planète percutée.
+        :type pln: Class Planet
+        :param crash: Satellites concernés.
+        :type crash: 1D-array   (boolean)
+        :param d: Vecteurs planète -> satellite.
+        :type d: 2D-array   (N*3 components)
+        :param n: Distances planète -> satellite.
+        :type n: 1D-array
+        """
+        self.log_crash(pln, int(np.sum(crash)))
+        self.alive[crash] = False
+        self.x[crash] = pln.x + d[crash] / n[crash, None] * pln.radius
+
+    def log_crash(self, pln, count):
+        """
+        Enregistre la collision de satellites de la flotte avec une planète, et met à jour le nombre de satellites
+        en vie.
+
+        :param pln: Planète percutée.
+        :type pln: Class Planet
+        :param count: Nombre de satellites concernés.
+        :type count: int
+        """
+        self.simulator.events.log('crash', f"{count} satellites crashed into {pln.name}", time=self.simulator.time,
+                                  source=self.name, planet=pln.name, count=count)
+        self.n_alive -= count
+
+    def update_controls(self, infos=0):
+        """
+        Met à jour les contrôles de la flotte. Chaque contrôle est une liste de (temps, valeur) ou de
+        (temps, valeur, indices), pour ne l'appliquer qu'à une partie des satellites.
+
+        :param infos: Quantité d'informations à afficher (toutes les 'infos' étapes. Si 0, affiche aucune infos).
+        :type infos: int
+        """
+        for controler in list(self.controls.keys()):
+            steps, self.controls[controler] = self.controls[controler], []
+            for step in steps:
+                time, value = step[0], step[1]
+                index = step[2] if len(step) > 2 else slice(None)
+                if self.simulator.time < time:
+                    # Contrôle conservé pour une itération future
+                    self.controls[controler].append(step)
+                else:
+                    if infos:
+                        self.simulator.events.log('set', f"set {controler} to {value}", time=self.simulator.time,
+                                                  source=self.name)
+                    if '-' in controler:
+                        if controler[:8] == 'thruster':
+                            # Activation du propulseur correspondant
+                            self.power[index, THRUSTER_NAMES.index(controler[9:])] = np.clip(value, 0, 1)
+                        if controler[:3] == 'ctr':
+                            if controler[4:7] == 'run':
+                                getattr(self.controler, controler[8:])(value, index=index)
+                            else:
+                                setattr(self.controler, controler[4:], value)
+                    else:
+                        setattr(self, controler, value)
+
+    def plot(self, fig=None, ax=None, display=True, direction=True):
+        """
+        Trace la représentation en 3D des satellites en vie de la flotte.
+
+        :param fig: Objet de la figure matplotlib (Si None, création d'une nouvelle).
+        :type fig: figure    (from matplotlib)
+        :param ax: Objet des axes matplotlib en 3D (Si None, création d'une nouvelle).
+        :type ax: axe    (from matplotlib)
+        :param display: Indique si le tracé doit être affiché (par défaut True).
+        :type display: boolean
+        :param direction: Affiche ou non le vecteur directeur des satellites (par défaut True).
+        :type direction: boolean
+        :return: Figure et des axes matplotlib mis à jour.
+        :rtype: figure, axe    (from matplotlib)
+        """
+        return plot_boxes(x=self.x[self.alive], size=self.size[self.alive] * self.scale, axes=self.axes[self.alive],
+                          colors=[self.color] * int(np.sum(self.alive)), fig=fig, ax=ax, display=display,
+                          direction=direction)
@@ -0,0 +1,213 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+"""
+Problème de Lambert : détermination de l'orbite de transfert reliant deux positions en un temps donné.
+Toutes les fonctions sont vectorisées sur des tableaux de positions et de durées, afin d'évaluer des grilles
+complètes de transferts (diagrammes "porkchop") en une seule fois.
+"""
+
+
+def stumpff(psi):
+    """
+    Calcule les fonctions de Stumpff c2 et c3, pour un tableau de valeurs de psi (variable universelle au carré).
+
+    :param psi: Variable universelle (psi > 0 : elliptique, psi < 0 : hyperbolique).
+    :type psi: 1D-array
+    :return: Fonctions c2(psi) et c3(psi).
+    :rtype: tuple   (2 * 1D-array)
+    """
+    psi = np.asarray(psi, dtype=float)
+    c2, c3 = np.full(psi.shape, 1 / 2), np.full(psi.shape, 1 / 6)
+    pos, neg = psi > 1e-6, psi < -1e-6
+    sp, sn = np.sqrt(psi[pos]), np.sqrt(-psi[neg])
+    c2[pos] = (1 - np.cos(sp)) / psi[pos]
+    c3[pos] = (sp - np.sin(sp)) / sp ** 3
+    c2[neg] = (np.cosh(sn) - 1) / -psi[neg]
+    c3[neg] = (np.sinh(sn) - sn) / sn ** 3
+    return c2, c3
+
+
+def lambert(r1, r2, tof, mu, prograde=True, iterations=80):
+    """
+    Résout le problème de Lambert (sans révolution complète) par la méthode des variables universelles.
+    Le calcul est vectorisé : r1, r2 et tof peuvent contenir N transferts différents (diffusion numpy).
+    La variable universelle est cherchée par dichotomie, le temps de vol étant croissant avec psi.
+
+    :param r1: Positions de départ, relatives au centre de l'astre (en m).
+    :type r1: 2D-array   (N*3 components)
+    :param r2: Positions d'arrivée, relatives au centre de l'astre (en m).
+    :type r2: 2D-array   (N*3 components)
+    :param tof: Durées de transfert (en sec).
+    :type tof: 1D-array   (N components)
+    :param mu: Paramètre gravitationnel de l'astre (G * M).
+    :type mu: float
+    :param prograde: Sens du transfert autour de l'axe z (par défaut True, sens trigonométrique).
+    :type prograde: boolean
+    :param iterations: Nombre d'itérations de dichotomie (par défaut 80).
+    :type iterations: int
+    :return: Vitesses au départ et à l'arrivée de l'orbite de transfert (NaN si le transfert n'existe pas).
+    :rtype: tuple   (2 * 2D-array, N*3 components)
+    """
+    r1, r2 = np.atleast_2d(np.asarray(r1, dtype=float)), np.atleast_2d(np.asarray(r2, dtype=float))
+    r1, r2 = np.broadcast_arrays(r1, r2)
+    tof = np.broadcast_to(np.asarray(tof, dtype=float), r1.shape[:-1])
+    n1, n2 = np.linalg.norm(r1, axis=-1), np.linalg.norm(r2, axis=-1)
+
+    # Sens du transfert (court ou long chemin), selon le sens de rotation souhaité
+    cos_dnu = np.clip(np.sum(r1 * r2, axis=-1) / (n1 * n2), -1, 1)
+    cross_z = np.cross(r1, r2)[..., 2]
+    tm = np.where((cross_z >= 0) == prograde, 1., -1.)
+    A = tm * np.sqrt(n1 * n2 * (1 + cos_dnu))
+
+    def time_of_flight(psi):
+        c2, c3 = stumpff(psi.reshape(-1))
+        c2, c3 = c2.reshape(psi.shape), c3.reshape(psi.shape)
+        y = n1 + n2 + A * (psi * c3 - 1) / np.sqrt(c2)
+        with np.errstate(invalid='ignore'):
+            chi = np.sqrt(y / c2)
+            t = (chi ** 3 * c3 + A * np.sqrt(y)) / np.sqrt(mu)
+        # y < 0 : psi trop faible (temps de vol considéré comme nul)
+        return np.where(y > 0, t, -np.inf), y
+
+    # Dichotomie sur psi (0 révolution : psi < 4 pi^2)
+    low, high = np.full(tof.shape, -4 * np.pi ** 2), np.full(tof.shape, 4 * np.pi ** 2 - 1e-6)
+    # Élargissement de la borne basse pour les transferts très rapides (hyperboliques)
+    for _ in range(20):
+        t, _ = time_of_flight(low)
+        too_high = t > tof
+        if not np.any(too_high):
+            break
+        low = np.where(too_high, 4 * low, low)
+    for _ in range(iterations):
+        psi = (low + high) / 2
+        t, _ = time_of_flight(psi)
+        low, high = np.where(t <= tof, psi, low), np.where(t <= tof, high, psi)
+    psi = (low + high) / 2
+    t, y = time_of_flight(psi)
+
+    # Coefficients de Lagrange, puis vitesses
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f = 1 - y / n1
+        g = A * np.sqrt(y / mu)
+        gdot = 1 - y / n2
+        v1 = (r2 - f[..., None] * r1) / g[..., None]
+        v2 = (gdot[..., None] * r2 - r1) / g[..., None]
+    # Transferts sans solution (demi-tour exact, ou temps de vol inatteignable)
+    invalid = ~np.isfinite(t) | (np.abs(t - tof) > 1e-6 * np.maximum(tof, 1)) | (np.abs(A) < 1e-9)
+    v1[invalid], v2[invalid] = np.nan, np.nan
+    return v1, v2
+
+
+class CircularOrbit:
+
+    def __init__(self, radius, mu, phase=0., t0=0., prograde=True):
+        """
+        Initialise une orbite circulaire dans le plan équatorial (z = 0), décrivant l'état d'un objet en fonction
+        du temps. Sert de fonction d'éphéméride (sérialisable) pour le calcul de diagrammes porkchop.
+
+        :param radius: Rayon de l'orbite (en m).
+        :type radius: float
+        :param mu: Paramètre gravitationnel de l'astre (G * M).
+        :type mu: float
+        :param phase: Angle de l'objet sur son orbite à l'instant t0 (en rad).
+        :type phase: float
+        :param t0: Instant de référence (en sec).
+        :type t0: float
+        :param prograde: Sens de rotation (par défaut True, sens trigonométrique).
+        :type prograde: boolean
+        """
+        self.radius, self.mu, self.phase, self.t0 = radius, mu, phase, t0
+        self.rate = np.sqrt(mu / radius ** 3) * (1 if prograde else -1)
+
+    def __call__(self, t):
+        """
+        Retourne les positions et vitesses de l'objet aux instants demandés.
+
+        :param t: Instants (en sec).
+        :type t: 1D-array
+        :return: Positions et vitesses.
+        :rtype: tuple   (2 * 2D-array, N*3 components)
+        """
+        theta = self.phase + self.rate * (np.asarray(t, dtype=float) - self.t0)
+        ur = np.stack([np.cos(theta), np.sin(theta), np.zeros(np.shape(theta))], axis=-1)
+        ut = np.stack([-np.sin(theta), np.cos(theta), np.zeros(np.shape(theta))], axis=-1)
+        return self.radius * ur, self.radius * self.rate * ut
+
+
+def _porkchop_rows(args):
+    """
+    Évalue une partie (quelques dates de départ) d'une grille porkchop. Fonction de niveau module, pour pouvoir être
+    exécutée par un processus de travail.
+    """
+    departure, arrival, t_dep, t_arr, mu, prograde = args
+    T_dep, T_arr = np.meshgrid(t_dep, t_arr, indexing='ij')
+    r1, v_dep = departure(T_dep.reshape(-1))
+    r2, v_arr = arrival(T_arr.reshape(-1))
+    tof = (T_arr - T_dep).reshape(-1)
+    v1, v2 = np.full(r1.shape, np.nan), np.full(r1.shape, np.nan)
+    valid = tof > 0
+    v1[valid], v2[valid] = lambert(r1[valid], r2[valid], tof[valid], mu, prograde=prograde)
+    shape = T_dep.shape
+    return {'dv1': np.linalg.norm(v1 - v_dep, axis=-1).reshape(shape),
+            'dv2': np.linalg.norm(v_arr - v2, axis=-1).reshape(shape),
+            'v1': v1.reshape(shape + (3,)), 'v2': v2.reshape(shape + (3,)),
+            'r2': r2.reshape(shape + (3,)), 'v_final': v_arr.reshape(shape + (3,))}
+
+
+def porkchop(departure, arrival, t_dep, t_arr, mu, prograde=True, workers=None, chunk=64):
+    """
+    Calcule une grille de transferts de Lambert (diagramme porkchop) entre un objet de départ et un objet d'arrivée,
+    pour toutes les combinaisons de dates de départ et d'arrivée. La grille est évaluée par blocs de lignes en
+    opérations numpy groupées, éventuellement répartis sur plusieurs processus.
+
+    :param departure: Fonction d'éphéméride de l'objet de départ (t -> positions, vitesses), ex: CircularOrbit.
+    :type departure: callable
+    :param arrival: Fonction d'éphéméride de l'objet d'arrivée (t -> positions, vitesses).
+    :type arrival: callable
+    :param t_dep: Dates de départ (en sec).
+    :type t_dep: 1D-array
+    :param t_arr: Dates d'arrivée (en sec).
+    :type t_arr: 1D-array
+    :param mu: Paramètre gravitationnel de l'astre (G * M).
+    :type mu: float
+    :param prograde: Sens du transfert (par défaut True).
+    :type prograde: boolean
+    :param workers: Nombre de processus (par défaut None : calcul dans le processus courant).
+    :type workers: int
+    :param chunk: Nombre de dates de départ par bloc (par défaut 64).
+    :type chunk: int
+    :return: Grilles (départ * arrivée) : dv1, dv2, dv (total), v1, v2, r2 et v_final (position et vitesse de
+             l'objet d'arrivée), ainsi que les dates t_dep et t_arr.
+    :rtype: dict
+    """
+    t_dep, t_arr = np.asarray(t_dep, dtype=float), np.asarray(t_arr, dtype=float)
+    tasks = [(departure, arrival, t_dep[i:i + chunk], t_arr, mu, prograde) for i in range(0, len(t_dep), chunk)]
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        parts = [_porkchop_rows(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_porkchop_rows, tasks))
+    result = {key: np.concatenate([part[key] for part in parts], axis=0) for key in parts[0].keys()}
+    result['dv'] = result['dv1'] + result['dv2']
+    result['t_dep'], result['t_arr'] = t_dep, t_arr
+    return result
+
+
+def get_burn_target(result, i=None, j=None):
+    """
+    Extrait un transfert d'une grille porkchop, sous forme de contrôle utilisable par le contrôleur d'un satellite
+    ('ctr-run-lambert'). Par défaut, le transfert de delta-v total minimal est choisi.
+
+    :param result: Grille calculée par porkchop.
+    :type result: dict
+    :param i: Indice de la date de départ (par défaut celui du minimum).
+    :type i: int
+    :param j: Indice de la date d'arrivée (par défaut celui du minimum).
+    :type j: int
+    :return: Contrôle (date de départ, arguments du contrôleur).
+    :rtype: tuple   (float, dict)
+    """
+    if i is None or j is None:
+        i, j = np.unravel_index(np.nanargmin(result['dv']), result['dv'].shape)
+    return (result['t_dep'][i], {'v1': result['v1'][i, j], 'tof': result['t_arr'][j] - result['t_dep'][i],
+                                 'r2': result['r2'][i, j], 'v_final': result['v_final'][i, j]})
@@ -0,0 +1,208 @@
+import numpy as np
+from classes.soi import G
+"""
+Suivi en ligne de la conservation de l'énergie orbitale spécifique et du moment cinétique spécifique des objets en
+vol balistique (sans poussée). La dérive mesurée signale les erreurs d'intégration (méthode d'Euler), et peut piloter
+le pas de temps de la simulation : il est réduit si la dérive est trop forte, et augmenté si elle est négligeable.
+"""
+
+
+def orbital_invariants(x, v, mu):
+    """
+    Calcule l'énergie orbitale spécifique et le moment cinétique spécifique d'un ensemble d'objets.
+
+    :param x: Positions relatives à l'astre.
+    :type x: 2D-array   (N*3 components)
+    :param v: Vitesses relatives à l'astre.
+    :type v: 2D-array   (N*3 components)
+    :param mu: Paramètre gravitationnel de l'astre de chaque objet (G * M).
+    :type mu: float or 1D-array
+    :return: Énergies (en J/kg) et moments cinétiques (en m^2/s).
+    :rtype: tuple   (1D-array, 2D-array (N*3 components))
+    """
+    energy = 0.5 * np.einsum('ij,ij->i', v, v) - mu / np.linalg.norm(x, axis=1)
+    return energy, np.cross(x, v)
+
+
+class ConservationMonitor:
+
+    def __init__(self, warn=1e-3, reduce=None, grow=None, factor=2., dt_min=None, dt_max=None, interval=10):
+        """
+        Initialise le suivi de conservation. La dérive relative d'un objet est mesurée depuis le début de son vol
+        balistique (référence réinitialisée à chaque poussée).
+
+        :param warn: Dérive relative (énergie ou moment cinétique) au-delà de laquelle un avertissement est enregistré
+                     dans le journal d'événements (par défaut 1e-3).
+        :type warn: float
+        :param reduce: Dérive relative entre deux vérifications au-delà de laquelle le pas de temps est réduit (par
+                       défaut None : jamais réduit).
+        :type reduce: float
+        :param grow: Dérive relative entre deux vérifications en deçà de laquelle le pas de temps est augmenté (par
+                     défaut None : jamais augmenté). À choisir inférieur à reduce / factor**2, la dérive de la méthode
+                     d'Euler variant comme le carré du pas de temps.
+        :type grow: float
+        :param factor: Facteur de modification du pas de temps (par défaut 2).
+        :type factor: float
+        :param dt_min: Pas de temps minimal (en sec, par défaut celui de la simulation / 16).
+        :type dt_min: float
+        :param dt_max: Pas de temps maximal (en sec, par défaut celui de la simulation * 16).
+        :type dt_max: float
+        :param interval: Nombre d'itérations entre deux vérifications (par défaut 10).
+        :type interval: int
+        """
+        self.warn, self.reduce, self.grow, self.factor = warn, reduce, grow, factor
+        self.dt_min, self.dt_max, self.interval = dt_min, dt_max, interval
+        self.counter = 0
+        # États de chaque groupe d'objets (satellites, puis une entrée par flotte) :
+        # nom -> {'energy', 'momentum' (références), 'last_energy', 'last_momentum', 'warned'}
+        self.states = {}
+        # Dérives maximales mesurées à chaque vérification : (instant, dérive d'énergie, dérive de moment, dt)
+        self.history = []
+
+    def check(self, simulator):
+        """
+        Vérifie la conservation (toutes les interval itérations), enregistre les avertissements, et adapte le pas de
+        temps de la simulation si cela est demandé.
+
+        :param simulator: Simulation concernée.
+        :type simulator: Class Simulator
+        """
+        self.counter += 1
+        if self.counter < self.interval:
+            return
+        self.counter = 0
+        if self.dt_min is None:
+            self.dt_min = simulator.dt / 16
+        if self.dt_max is None:
+            self.dt_max = simulator.dt * 16
+        drift_energy, drift_momentum = 0., 0.
+        for name, x, v, mu, coasting in self.groups(simulator):
+            step_energy, step_momentum = self.measure(simulator, name, x, v, mu, coasting)
+            drift_energy, drift_momentum = max(drift_energy, step_energy), max(drift_momentum, step_momentum)
+        self.history.append((simulator.time, drift_energy, drift_momentum, simulator.dt))
+        if self.is_steady(simulator):
+            self.adapt(simulator, max(drift_energy, drift_momentum))
+
+    def groups(self, simulator):
+        """
+        Rassemble les états relatifs à leur astre des satellites (un groupe) et de chaque flotte. L'astre est la
+        planète de référence de l'objet, ou à défaut la planète la plus massive.
+
+        :param simulator: Simulation concernée.
+        :type simulator: Class Simulator
+        :return: Pour chaque groupe : nom, positions, vitesses, paramètres gravitationnels, objets en vol balistique.
+        :rtype: list[tuple]
+        """
+        if not simulator.planets:
+            return []
+        default = max(simulator.planets, key=lambda pln: pln.mass)
+        groups = []
+        if simulator.satellites:
+            planets = [default if sat.planet_ref is None else sat.planet_ref for sat in simulator.satellites]
+            x = np.array([sat.x - pln.x for sat, pln in zip(simulator.satellites, planets)], dtype=float)
+            v = np.array([sat.v - pln.v for sat, pln in zip(simulator.satellites, planets)], dtype=float)
+            mu = G * np.array([pln.mass for pln in planets])
+            coasting = np.array([sat.alive and not (sat.islanded or sat.istakingoff) and
+                                 not any(thr.power for thr in sat.thrusters) for sat in simulator.satellites])
+            groups.append(('satellites', x, v, mu, coasting))
+        for fleet in simulator.fleets:
+            pln = default if fleet.planet_ref is None else fleet.planet_ref
+            coasting = fleet.alive & ~(fleet.islanded | fleet.istakingoff) & ~np.any(fleet.power, axis=1)
+            groups.append((fleet.name, fleet.x - pln.x, fleet.v - pln.v, G * pln.mass, coasting))
+        return groups
+
+    def measure(self, simulator, name, x, v, mu, coasting):
+        """
+        Mesure la dérive des objets d'un groupe en vol balistique, depuis le début de leur vol balistique (pour les
+        avertissements) et depuis la vérification précédente (pour le pas de temps).
+
+        :return: Dérives relatives maximales d'énergie et de moment cinétique depuis la vérification précédente.
+        :rtype: tuple   (float, float)
+        """
+        energy, momentum = orbital_invariants(x, v, mu)
+        n = len(energy)
+        state = self.states.get(name)
+        if state is None or len(state['energy']) != n:
+            # Nouveau groupe (ou taille modifiée) : références conservées pour les objets déjà suivis
+            new = {'energy': np.full(n, np.nan), 'momentum': np.full((n, 3), np.nan),
+                   'last_energy': np.full(n, np.nan), 'last_momentum': np.full((n, 3), np.nan),
+                   'warned': np.zeros(n, dtype=bool)}
+            if not state is None:
+                k = min(n, len(state['energy']))
+                for key in new:
+                    new[key][:k] = state[key][:k]
+            state = self.states[name] = new
+        # Référence réinitialisée pour les objets en poussée, et fixée au début du vol balistique
+        state['energy'][~coasting], state['momentum'][~coasting] = np.nan, np.nan
+        state['warned'][~coasting] = False
+        start = coasting & np.isnan(state['energy'])
+        state['energy'][start], state['momentum'][start] = energy[start], momentum[start]
+        state['last_energy'][start], state['last_momentum'][start] = energy[start], momentum[start]
+        if not np.any(coasting):
+            return 0., 0.
+        e0, h0 = state['energy'][coasting], state['momentum'][coasting]
+        e, h = energy[coasting], momentum[coasting]
+        scale_e, scale_h = np.abs(e0), np.linalg.norm(h0, axis=1)
+        total = np.maximum(np.abs(e - e0) / scale_e, np.linalg.norm(h - h0, axis=1) / scale_h)
+        step_e = np.abs(e - state['last_energy'][coasting]) / scale_e
+        step_h = np.linalg.norm(h - state['last_momentum'][coasting], axis=1) / scale_h
+        state['last_energy'][coasting], state['last_momentum'][coasting] = e, h
+        # Avertissement (une seule fois par vol balistique) pour les objets dont la dérive dépasse le seuil
+        idx = np.flatnonzero(coasting)
+        warned = idx[(total > self.warn) & ~state['warned'][coasting]]
+        if len(warned):
+            state['warned'][warned] = True
+            source = simulator.satellites[warned[0]].name if name == 'satellites' else name
+            simulator.events.log('warning', f"conservation drift {np.max(total):.2e} above {self.warn:.0e} "
+                                            f"for {len(warned)} objects", time=simulator.time, source=source,
+                                 count=len(warned), drift=float(np.max(total)))
+        return float(np.max(step_e)), float(np.max(step_h))
+
+    @staticmethod
+    def is_steady(simulator):
+        """
+        Indique si le pas de temps peut être modifié : aucune poussée ni instruction de contrôleur en cours (les
+        durées de poussée sont comptées en itérations), et aucun plan en attente.
+
+        :param simulator: Simulation concernée.
+        :type simulator: Class Simulator
+        :rtype: boolean
+        """
+        if not simulator.planning is None and len(simulator.planning):
+            return False
+        for sat in simulator.satellites:
+            if not sat.alive:
+                continue
+            if sat.islanded or sat.istakingoff or any(thr.power for thr in sat.thrusters):
+                return False
+            ctr = sat.controler
+            if not ctr is None and (ctr.plan.burns or not (ctr.reach_geo is None and ctr.reach_sync is None and
+                                                          ctr.do_homhann is None and ctr.do_lambert is None)):
+                return False
+        for fleet in simulator.fleets:
+            ctr, alive = fleet.controler, fleet.alive
+            if np.any(alive & (fleet.islanded | fleet.istakingoff | np.any(fleet.power, axis=1))):
+                return False
+            if np.any(alive & ((ctr.geo_step != 0) | (ctr.sync_step != 0) | (ctr.hoh_step != 0) |
+                               (ctr.rot_thruster >= 0))):
+                return False
+        return True
+
+    def adapt(self, simulator, drift):
+        """
+        Adapte le pas de temps de la simulation à la dérive mesurée entre deux vérifications.
+
+        :param simulator: Simulation concernée.
+        :type simulator: Class Simulator
+        :param drift: Dérive relative maximale depuis la vérification précédente.
+        :type drift: float
+        """
+        dt = simulator.dt
+        if not self.reduce is None and drift > self.reduce:
+            dt = max(dt / self.factor, self.dt_min)
+        elif not self.grow is None and drift < self.grow:
+            dt = min(dt * self.factor, self.dt_max)
+        if dt != simulator.dt:
+            simulator.events.log('dt', f"time step set to {dt} sec (drift {drift:.2e})", time=simulator.time,
+                                 dt=dt, drift=drift)
+            simulator.dt = dt
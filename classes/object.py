@@ -85,7 +85,8 @@ class Object:
         for pln in planets:
             # Si la distance entre le satellite et la planète est inférieure au rayon de la planète
             if np.linalg.norm(self.x - pln.x) < pln.radius:
-                print(f"   Satellite {self.name} crashed into {pln.name} after {self.simulator.time} sec alive")
+                self.simulator.events.log('crash', f"crashed into {pln.name}", time=self.simulator.time,
+                                          source=self.name, planet=pln.name)
                 # Marquer le satellite comme détruit
                 self.alive = False
                 self.x = pln.x + (self.x - pln.x) / np.linalg.norm(self.x - pln.x) * pln.radius
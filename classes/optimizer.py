@@ -0,0 +1,252 @@
+import contextlib
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+"""
+Optimisation des paramètres d'une manoeuvre (réglages de Controler.geo, instants des poussées, ...) par une méthode
+sans dérivée (Nelder-Mead) : chaque candidat est une simulation complète, évaluée par des processus de travail, et
+les candidats déjà évalués ne sont jamais simulés deux fois.
+"""
+
+# Constante de gravitation universelle (même valeur que Class Controler)
+G = 6.6743015 * 10 ** -11
+
+
+def manoeuvre_cost(simulator, sat, radius, objective='fuel', tolerance=0.01, penalty=10**4):
+    """
+    Évalue une manoeuvre simulée : consommation (delta-v fourni par les propulseurs, proportionnel à la masse
+    d'ergols consommée) ou durée nécessaire pour rejoindre l'orbite circulaire visée, avec une pénalité si l'état
+    final n'est pas dans les tolérances.
+
+    :param simulator: Simulation terminée.
+    :type simulator: Class Simulator
+    :param sat: Nom du satellite manoeuvré.
+    :type sat: string
+    :param radius: Rayon de l'orbite circulaire visée (en m).
+    :type radius: float
+    :param objective: Critère à minimiser : 'fuel' (par défaut) ou 'time'.
+    :type objective: string
+    :param tolerance: Écart relatif toléré sur le rayon et la vitesse finaux (par défaut 1%).
+    :type tolerance: float
+    :param penalty: Pénalité d'un état final hors tolérances (ajoutée au critère, par défaut 10**4).
+    :type penalty: float
+    :return: Coût, et détails (delta-v, durée, écarts finaux, satellite en vie).
+    :rtype: tuple   (float, dict)
+    """
+    satellite = simulator.get(sat)
+    speed = np.sqrt(G * satellite.planet_ref.mass / radius)
+    time, data = simulator.saves.series(sat, 'power')
+    r, v, dt = [simulator.saves.series(sat, y)[1][None] for y in ['r', 'v', 'dt']]
+    # Delta-v fourni par les propulseurs : somme des poussées sur la masse, sur toute la manoeuvre
+    thrust = sum(np.abs(power) * satellite.get(name).thrust_max for name, power in data.items())
+    dv = float(np.sum(thrust * dt) / satellite.mass)
+    # Durée : premier instant à partir duquel le rayon et la vitesse restent dans les tolérances
+    inside = (np.abs(r / radius - 1) <= tolerance) & (np.abs(v / speed - 1) <= tolerance)
+    outside = np.flatnonzero(~inside)
+    reached = len(inside) > 0 and inside[-1] and satellite.alive
+    duration = float(time[0 if not len(outside) else outside[-1] + 1] - time[0]) if reached else np.inf
+    errors = (float(abs(r[-1] / radius - 1)), float(abs(v[-1] / speed - 1)))
+    info = {'dv': dv, 'time': duration, 'error_r': errors[0], 'error_v': errors[1], 'alive': satellite.alive}
+    cost = dv if objective == 'fuel' else (duration if reached else 0.)
+    if not reached:
+        cost += penalty * (1 + max(errors) / tolerance)
+    return cost, info
+
+
+def run_candidate(build, params, sat, radius, objective, tolerance, penalty, run):
+    """
+    Simule un candidat et évalue sa manoeuvre (voir manoeuvre_cost). Fonction de niveau module, exécutée par un
+    processus de travail ; la simulation n'affiche rien.
+
+    :param build: Fonction construisant la simulation d'un candidat (paramètres -> Simulator, de niveau module).
+    :type build: callable
+    :param params: Paramètres du candidat.
+    :type params: dict
+    :param run: Arguments de Simulator.run (durée maximale, temps maximal).
+    :type run: dict
+    :return: Coût, et détails de la manoeuvre.
+    :rtype: tuple   (float, dict)
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        simulator = build(params)
+        simulator.events.echo = False
+        simulator.run(**run)
+    return manoeuvre_cost(simulator, sat, radius, objective=objective, tolerance=tolerance, penalty=penalty)
+
+
+class ManoeuvreOptimizer:
+
+    def __init__(self, build, parameters, sat, radius, objective='fuel', tolerance=0.01, penalty=10**4, run=None,
+                 workers=None):
+        """
+        Initialise l'optimisation d'une manoeuvre.
+
+        Exemple de fonction build (de niveau module, pour être transmise aux processus) :
+            def build(params):
+                simu = ...  # Planète, satellite
+                sat.controls = {'ctr-run-takeoff': [(60, {})],
+                                'ctr-run-geo': [(120, {'radius': 9*10**6, 'gamma_1': params['gamma_1']})],
+                                'ctr-run-homhann': [(params['t_homhann'], {'radius': 12*10**6})]}
+                return simu
+
+        :param build: Fonction construisant la simulation d'un candidat (paramètres -> Simulator).
+        :type build: callable
+        :param parameters: Paramètres optimisés : nom -> (valeur initiale, borne inférieure, borne supérieure).
+        :type parameters: dict
+        :param sat: Nom du satellite manoeuvré.
+        :type sat: string
+        :param radius: Rayon de l'orbite circulaire visée (en m).
+        :type radius: float
+        :param objective: Critère à minimiser : 'fuel' (par défaut) ou 'time'.
+        :type objective: string
+        :param tolerance: Écart relatif toléré sur le rayon et la vitesse finaux (par défaut 1%).
+        :type tolerance: float
+        :param penalty: Pénalité d'un état final hors tolérances (par défaut 10**4).
+        :type penalty: float
+        :param run: Arguments de Simulator.run (par défaut {'duration_max': 600, 'time_max': 10**5}).
+        :type run: dict
+        :param workers: Nombre de processus de travail (par défaut None : nombre de coeurs, 1 : aucun processus).
+        :type workers: int
+        """
+        if not objective in ('fuel', 'time'):
+            raise ValueError(f"unknown objective: {objective}")
+        self.build, self.sat, self.radius = build, sat, radius
+        self.names = list(parameters.keys())
+        bounds = np.array([parameters[name][1:] for name in self.names], dtype=float)
+        self.lower, self.upper = bounds[:, 0], bounds[:, 1]
+        self.x0 = self.normalize([parameters[name][0] for name in self.names])
+        self.settings = {'objective': objective, 'tolerance': tolerance, 'penalty': penalty,
+                         'run': {'duration_max': 600, 'time_max': 10**5} if run is None else run}
+        self.workers = os.cpu_count() if workers is None else workers
+        # Candidats déjà évalués : paramètres (arrondis) -> (coût, détails)
+        self.memo = {}
+        self.evaluations = 0
+        self.pool = None
+
+    def normalize(self, values):
+        """
+        Convertit des paramètres en coordonnées normalisées (0 et 1 aux bornes).
+
+        :rtype: 1D-array
+        """
+        return (np.asarray(values, dtype=float) - self.lower) / (self.upper - self.lower)
+
+    def params(self, point):
+        """
+        Convertit un point en coordonnées normalisées en paramètres d'un candidat.
+
+        :rtype: dict
+        """
+        values = self.lower + np.clip(point, 0, 1) * (self.upper - self.lower)
+        return {name: float(value) for name, value in zip(self.names, values)}
+
+    @staticmethod
+    def key(point):
+        """
+        Clé d'un candidat dans la mémoire des évaluations (coordonnées arrondies).
+        """
+        return tuple(np.round(np.clip(point, 0, 1), 9))
+
+    def evaluate(self, points):
+        """
+        Évalue un ensemble de candidats : les candidats déjà évalués sont lus dans la mémoire, les autres sont simulés
+        en parallèle.
+
+        :param points: Candidats, en coordonnées normalisées.
+        :type points: list[1D-array]
+        :return: Coût de chaque candidat.
+        :rtype: list[float]
+        """
+        keys = [self.key(point) for point in points]
+        missing = list(dict.fromkeys(key for key in keys if not key in self.memo))
+        tasks = [(self.build, self.params(np.array(key)), self.sat, self.radius, self.settings['objective'],
+                  self.settings['tolerance'], self.settings['penalty'], self.settings['run']) for key in missing]
+        if self.workers <= 1 or len(tasks) <= 1:
+            results = [run_candidate(*task) for task in tasks]
+        elif not self.pool is None:
+            results = list(self.pool.map(run_candidate, *zip(*tasks)))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+                results = list(pool.map(run_candidate, *zip(*tasks)))
+        self.memo.update(zip(missing, results))
+        self.evaluations += len(missing)
+        return [self.memo[key][0] for key in keys]
+
+    def optimize(self, max_iter=50, step=0.1, xtol=1e-3, ftol=1e-3):
+        """
+        Recherche les paramètres de coût minimal par la méthode de Nelder-Mead, en coordonnées normalisées (bornes
+        respectées). Avec plusieurs processus, les points candidats d'une itération (réflexion, expansion,
+        contractions) sont évalués ensemble, par anticipation.
+
+        :param max_iter: Nombre maximal d'itérations (par défaut 50).
+        :type max_iter: int
+        :param step: Taille du simplexe initial, en fraction de l'intervalle de chaque paramètre (par défaut 0.1).
+        :type step: float
+        :param xtol: Taille du simplexe (normalisée) en deçà de laquelle l'optimisation s'arrête (par défaut 1e-3).
+        :type xtol: float
+        :param ftol: Écart relatif des coûts du simplexe en deçà duquel l'optimisation s'arrête (par défaut 1e-3).
+        :type ftol: float
+        :return: Meilleurs paramètres, leur coût et les détails de la manoeuvre.
+        :rtype: tuple   (dict, float, dict)
+        """
+        # Processus de travail conservés pendant toute l'optimisation
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            return self.nelder_mead(max_iter, step, xtol, ftol)
+        finally:
+            if not self.pool is None:
+                self.pool.shutdown()
+                self.pool = None
+
+    def nelder_mead(self, max_iter, step, xtol, ftol):
+        """
+        Itérations de la méthode de Nelder-Mead (voir optimize).
+        """
+        n = len(self.names)
+        # Simplexe initial : point de départ, et un pas sur chaque paramètre (vers l'intérieur des bornes)
+        simplex = [np.clip(self.x0, 0, 1)]
+        for i in range(n):
+            point = simplex[0].copy()
+            point[i] += step if point[i] + step <= 1 else -step
+            simplex.append(point)
+        costs = self.evaluate(simplex)
+        for _ in range(max_iter):
+            order = np.argsort(costs, kind='stable')
+            simplex, costs = [simplex[i] for i in order], [costs[i] for i in order]
+            size = max(np.max(np.abs(point - simplex[0])) for point in simplex[1:])
+            if size < xtol or abs(costs[-1] - costs[0]) <= ftol * max(abs(costs[0]), 1e-12):
+                break
+            centroid = np.mean(simplex[:-1], axis=0)
+            worst = simplex[-1]
+            reflected = np.clip(2 * centroid - worst, 0, 1)
+            expanded = np.clip(3 * centroid - 2 * worst, 0, 1)
+            outside = np.clip(1.5 * centroid - 0.5 * worst, 0, 1)
+            inside = np.clip(0.5 * centroid + 0.5 * worst, 0, 1)
+            if self.workers > 1:
+                # Évaluation anticipée des points candidats (lus ensuite dans la mémoire)
+                self.evaluate([reflected, expanded, outside, inside])
+            f_r = self.evaluate([reflected])[0]
+            if f_r < costs[0]:
+                f_e = self.evaluate([expanded])[0]
+                simplex[-1], costs[-1] = (expanded, f_e) if f_e < f_r else (reflected, f_r)
+                continue
+            if f_r < costs[-2]:
+                simplex[-1], costs[-1] = reflected, f_r
+                continue
+            if f_r < costs[-1]:
+                f_c = self.evaluate([outside])[0]
+                if f_c <= f_r:
+                    simplex[-1], costs[-1] = outside, f_c
+                    continue
+            else:
+                f_c = self.evaluate([inside])[0]
+                if f_c < costs[-1]:
+                    simplex[-1], costs[-1] = inside, f_c
+                    continue
+            # Réduction du simplexe vers le meilleur point
+            simplex = [simplex[0]] + [simplex[0] + 0.5 * (point - simplex[0]) for point in simplex[1:]]
+            costs = [costs[0]] + self.evaluate(simplex[1:])
+        best = int(np.argmin(costs))
+        key = self.key(simplex[best])
+        return self.params(np.array(key)), self.memo[key][0], self.memo[key][1]
@@ -0,0 +1,345 @@
+import multiprocessing as mp
+import weakref
+import numpy as np
+from multiprocessing import shared_memory
+from classes.tools import euler
+from classes.controler import THRUSTER_DIRECTIONS
+"""
+Décomposition de domaine en mémoire partagée : les états d'une flotte sont placés dans des tableaux
+multiprocessing.shared_memory, et chaque processus de calcul effectue sur place le pas complet de sa tranche de
+satellites (poussée, intégration, attitude, collisions, grandeurs sauvegardées). Les processus avancent au même rythme
+que le simulateur (barrières) ; le processus principal conserve l'API du simulateur et ne traite que le travail
+commun à toutes les tranches (contrôles, propagation képlérienne, journal des collisions).
+"""
+
+# Nombre maximal de planètes transmises aux processus de calcul
+MAX_PLANETS = 64
+# Commandes des processus de calcul
+STEP, COMMIT, STOP = 0., 1., 2.
+# États de la flotte placés en mémoire partagée (les attributs de la flotte deviennent des vues sur ces tableaux)
+SHARED_ARRAYS = ['mass', 'inertia', 'x', 'v', 'ag', 'a', 'axes', 'a_ang', 'v_ang', 'x_ang', 'alive', 'islanded',
+                 'istakingoff', 'thrust_max', 'torque_max', 'power', 'thrust', 'torque']
+
+
+def create_arrays(shapes):
+    """
+    Crée des tableaux en mémoire partagée.
+
+    :param shapes: Nom -> (forme, type) de chaque tableau.
+    :type shapes: dict
+    :return: Blocs de mémoire partagée, tableaux, et description transmissible aux processus (nom -> (bloc, forme,
+             type)).
+    :rtype: tuple   (dict, dict, dict)
+    """
+    blocks, arrays, spec = {}, {}, {}
+    for name, (shape, dtype) in shapes.items():
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        blocks[name] = shared_memory.SharedMemory(create=True, size=size)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+        arrays[name][...] = 0
+        spec[name] = (blocks[name].name, shape, np.dtype(dtype).str)
+    return blocks, arrays, spec
+
+
+def attach_arrays(spec):
+    """
+    Ouvre, dans un processus de calcul, les tableaux en mémoire partagée décrits par create_arrays.
+
+    :param spec: Nom -> (bloc, forme, type) de chaque tableau.
+    :type spec: dict
+    :return: Blocs de mémoire partagée et tableaux.
+    :rtype: tuple   (dict, dict)
+    """
+    blocks, arrays = {}, {}
+    for name, (block, shape, dtype) in spec.items():
+        blocks[name] = shared_memory.SharedMemory(name=block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+    return blocks, arrays
+
+
+def rotate_slice(axes, dalpha, mask):
+    """
+    Fait tourner les axes propres des satellites désignés d'une tranche (mêmes opérations que Fleet.rotate).
+
+    :param axes: Axes propres des satellites de la tranche (modifiés sur place).
+    :type axes: 3D-array   (N*3*3 components)
+    :param dalpha: Angles de rotation autour de chaque axe (en radians).
+    :type dalpha: 2D-array   (N*3 components)
+    :param mask: Satellites concernés.
+    :type mask: 1D-array   (boolean)
+    """
+    for axe in range(3):
+        turn = mask & (dalpha[:, axe] != 0)
+        if not np.any(turn):
+            continue
+        c, s = np.cos(dalpha[turn, axe]), np.sin(dalpha[turn, axe])
+        rot = np.tile(np.eye(3), (len(c), 1, 1))
+        i, j = [(1, 2), (0, 2), (0, 1)][axe]
+        sign = -1 if axe == 1 else 1        # Rotation autour de y : signes inversés
+        rot[:, i, i], rot[:, j, j] = c, c
+        rot[:, i, j], rot[:, j, i] = -sign * s, sign * s
+        axes[turn] = np.einsum('nij,nkj->nki', rot, axes[turn])
+
+
+def integrate_slice(arrays, lo, hi):
+    """
+    Intègre d'un pas de temps les satellites d'une tranche : poussée et couple des propulseurs, accélération
+    gravitationnelle, intégration de la position (résultat dans x_new, v_new, a_new, validé par commit_slice) puis
+    de l'attitude et rotation des axes (mêmes opérations que Fleet.step, dans le même ordre : les résultats sont
+    identiques à ceux d'un calcul en un seul processus).
+
+    :param arrays: Tableaux partagés de la flotte.
+    :type arrays: dict
+    :param lo: Indice du premier satellite de la tranche.
+    :type lo: int
+    :param hi: Indice suivant le dernier satellite de la tranche.
+    :type hi: int
+    """
+    dt, n_planets, _, use_bodies = arrays['control'][:4]
+    planets = arrays['planets'][:int(n_planets)]
+    x, v, mass, axes = arrays['x'][lo:hi], arrays['v'][lo:hi], arrays['mass'][lo:hi], arrays['axes'][lo:hi]
+    moving = arrays['alive'][lo:hi] & (~arrays['islanded'][lo:hi] | arrays['istakingoff'][lo:hi])
+    # Poussée et couple (voir Fleet.get_thrust)
+    power = arrays['power'][lo:hi]
+    thrust = np.einsum('nk,nk,kj->nj', power, arrays['thrust_max'][lo:hi], THRUSTER_DIRECTIONS)
+    torque = np.einsum('nk,nkj->nj', power, arrays['torque_max'][lo:hi])
+    F = arrays['thrust'][lo:hi] = np.einsum('nij,ni->nj', axes, thrust)
+    C = arrays['torque'][lo:hi] = np.einsum('nij,ni->nj', axes, torque)
+    # Force (voir Fleet.get_ag)
+    if use_bodies:
+        body = planets[arrays['bodies'][lo:hi]]
+        d = x - body[:, :3]
+        n = np.linalg.norm(d, axis=1)[:, None]
+        ag = -(d / n) * 6.67*10**-11 * body[:, 3, None] / n ** 2
+    else:
+        ag = np.zeros(x.shape)
+        for pln in planets:
+            d = x - pln[:3]
+            n = np.linalg.norm(d, axis=1)[:, None]
+            ag = ag + -(d / n) * 6.67*10**-11 * pln[3] / n ** 2
+    arrays['ag'][lo:hi][moving] = ag[moving]
+    a = arrays['ag'][lo:hi] + F / mass[:, None]
+    if use_bodies:
+        # Coniques raccordées : accélération propre de la planète dominante
+        a = a + body[:, 4:7]
+    arrays['x_new'][lo:hi], arrays['v_new'][lo:hi], arrays['a_new'][lo:hi] = euler(x, v, a, dt)
+    # Couple
+    x_ang, v_ang, a_ang = euler(arrays['x_ang'][lo:hi], arrays['v_ang'][lo:hi], C / arrays['inertia'][lo:hi], dt)
+    delta_ang = x_ang - arrays['x_ang'][lo:hi]
+    arrays['x_ang'][lo:hi][moving], arrays['v_ang'][lo:hi][moving] = x_ang[moving], v_ang[moving]
+    arrays['a_ang'][lo:hi][moving] = a_ang[moving]
+    rotate_slice(axes, delta_ang, moving)
+
+
+def commit_slice(arrays, lo, hi):
+    """
+    Valide le pas de temps des satellites d'une tranche (états calculés par integrate_slice, éventuellement
+    remplacés par la propagation képlérienne du processus principal), puis recherche les collisions avec les planètes
+    (mêmes opérations que Fleet.check_for_collision et Fleet.crash : la planète percutée est notée dans hit, -1 sinon)
+    et calcule les grandeurs sauvegardées (rayon et vitesse, voir Fleet.get_radius et Fleet.get_speed).
+
+    :param arrays: Tableaux partagés de la flotte.
+    :type arrays: dict
+    :param lo: Indice du premier satellite de la tranche.
+    :type lo: int
+    :param hi: Indice suivant le dernier satellite de la tranche.
+    :type hi: int
+    """
+    _, n_planets, _, use_bodies, has_ref = arrays['control'][:5]
+    planets = arrays['planets'][:int(n_planets)]
+    x, v, alive = arrays['x'][lo:hi], arrays['v'][lo:hi], arrays['alive'][lo:hi]
+    islanded, istakingoff = arrays['islanded'][lo:hi], arrays['istakingoff'][lo:hi]
+    moving = alive & (~islanded | istakingoff)
+    x[moving], v[moving] = arrays['x_new'][lo:hi][moving], arrays['v_new'][lo:hi][moving]
+    arrays['a'][lo:hi][moving] = arrays['a_new'][lo:hi][moving]
+    # Collisions
+    mask, hit = moving & ~(islanded | istakingoff), arrays['hit'][lo:hi]
+    hit[...] = -1
+    if use_bodies:
+        bodies = arrays['bodies'][lo:hi]
+        body = planets[bodies]
+        d = x - body[:, :3]
+        n = np.linalg.norm(d, axis=1)
+        crash = mask & alive & (n < body[:, 7])
+        x[crash] = body[crash, :3] + d[crash] / n[crash, None] * body[crash, 7, None]
+        alive[crash], hit[crash] = False, bodies[crash]
+    else:
+        for k, pln in enumerate(planets):
+            d = x - pln[:3]
+            n = np.linalg.norm(d, axis=1)
+            crash = mask & alive & (n < pln[7])
+            x[crash] = pln[:3] + d[crash] / n[crash, None] * pln[7]
+            alive[crash], hit[crash] = False, k
+    # Grandeurs sauvegardées
+    ref = arrays['control'][5:8]
+    arrays['radius'][lo:hi] = np.linalg.norm(x - ref, axis=1) if has_ref else np.nan
+    arrays['speed'][lo:hi] = np.linalg.norm(v, axis=1)
+
+
+def work(spec, lo, hi, start, done):
+    """
+    Boucle d'un processus de calcul : attend le début de chaque phase (barrière start), traite sa tranche
+    (integrate_slice ou commit_slice), puis signale la fin de la phase (barrière done), jusqu'à la commande d'arrêt.
+    """
+    blocks, arrays = attach_arrays(spec)
+    while True:
+        start.wait()
+        if arrays['control'][2] == STOP:
+            break
+        if arrays['control'][2] == STEP:
+            integrate_slice(arrays, lo, hi)
+        else:
+            commit_slice(arrays, lo, hi)
+        done.wait()
+    for block in blocks.values():
+        block.close()
+
+
+class FleetWorkers:
+
+    def __init__(self, fleet, workers):
+        """
+        Répartit les satellites d'une flotte entre plusieurs processus de calcul. Les états de la flotte (voir
+        SHARED_ARRAYS) deviennent des vues sur la mémoire partagée : les autres méthodes de la flotte (contrôleur,
+        sauvegardes) les utilisent sans changement.
+
+        :param fleet: Flotte concernée.
+        :type fleet: Class Fleet
+        :param workers: Nombre de processus de calcul.
+        :type workers: int
+        """
+        n = len(fleet)
+        shapes = {key: (getattr(fleet, key).shape, getattr(fleet, key).dtype) for key in SHARED_ARRAYS}
+        shapes.update({'bodies': ((n,), np.int64), 'x_new': ((n, 3), float), 'v_new': ((n, 3), float),
+                       'a_new': ((n, 3), float), 'hit': ((n,), np.int64), 'radius': ((n,), float),
+                       'speed': ((n,), float), 'planets': ((MAX_PLANETS, 8), float), 'control': ((8,), float)})
+        self.blocks, self.arrays, spec = create_arrays(shapes)
+        self.fleet = fleet
+        self.share()
+        self.time = None        # Temps de simulation des rayons et vitesses calculés par les processus
+
+        # Tranches contiguës de satellites, une par processus
+        bounds = np.linspace(0, n, workers + 1).astype(int)
+        ctx = mp.get_context()
+        self.start, self.done = ctx.Barrier(workers + 1), ctx.Barrier(workers + 1)
+        self.processes = [ctx.Process(target=work, args=(spec, bounds[k], bounds[k + 1], self.start, self.done),
+                                      daemon=True) for k in range(workers)]
+        for process in self.processes:
+            process.start()
+        self.finalizer = weakref.finalize(self, FleetWorkers.release, self.processes, self.blocks, self.arrays,
+                                          self.start)
+
+    def __len__(self):
+        """
+        Retourne le nombre de processus de calcul.
+
+        :rtype: int
+        """
+        return len(self.processes)
+
+    def share(self):
+        """
+        Place les états de la flotte en mémoire partagée. Un tableau remplacé depuis (ex: rechargement d'un cache)
+        est recopié, et l'attribut de la flotte redevient une vue sur la mémoire partagée.
+        """
+        for key in SHARED_ARRAYS:
+            value = getattr(self.fleet, key)
+            if not value is self.arrays[key]:
+                self.arrays[key][...] = value
+                setattr(self.fleet, key, self.arrays[key])
+
+    def run(self, command):
+        """
+        Lance une phase sur toutes les tranches, et attend qu'elle soit terminée.
+
+        :param command: Phase à exécuter (STEP ou COMMIT).
+        :type command: float
+        """
+        self.arrays['control'][2] = command
+        # Départ commun, puis attente de toutes les tranches
+        self.start.wait()
+        self.done.wait()
+
+    def integrate(self, planets, bodies=None, dt=None):
+        """
+        Intègre d'un pas de temps tous les satellites de la flotte, en parallèle (voir integrate_slice). Les
+        positions, vitesses et accélérations ne sont appliquées qu'à la validation du pas (voir commit).
+
+        :param planets: Liste des objets planètes.
+        :type planets: list[Planet (class)]
+        :param bodies: Indice de la planète dominante de chaque satellite (par défaut None : toutes les planètes).
+        :type bodies: 1D-array   (int)
+        :param dt: Pas de temps (par défaut celui du simulateur de la flotte).
+        :type dt: float
+        :return: Positions et vitesses après un pas de temps (modifiables avant la validation).
+        :rtype: tuple   (2 * 2D-array, N*3 components)
+        """
+        if len(planets) > MAX_PLANETS:
+            raise ValueError(f"at most {MAX_PLANETS} planets can be shared with the workers")
+        arrays = self.arrays
+        self.share()
+        arrays['planets'][:len(planets)] = [(*pln.x, pln.mass, *pln.a, pln.radius) for pln in planets]
+        if not bodies is None:
+            arrays['bodies'][...] = bodies
+        arrays['control'][:4] = (self.fleet.simulator.dt if dt is None else dt, len(planets), STEP,
+                                 not bodies is None)
+        self.run(STEP)
+        return arrays['x_new'], arrays['v_new']
+
+    def commit(self, planet_ref=None):
+        """
+        Valide le pas de temps de tous les satellites de la flotte, recherche les collisions avec les planètes et
+        calcule les rayons et vitesses à sauvegarder, en parallèle (voir commit_slice).
+
+        :param planet_ref: Planète de référence des rayons (par défaut None : rayons NaN).
+        :type planet_ref: Class Planet
+        :return: Indice de la planète percutée par chaque satellite pendant ce pas de temps (-1 si aucune).
+        :rtype: 1D-array   (int)
+        """
+        arrays = self.arrays
+        arrays['control'][4] = not planet_ref is None
+        if not planet_ref is None:
+            arrays['control'][5:8] = planet_ref.x
+        self.run(COMMIT)
+        self.time = self.fleet.simulator.time
+        return arrays['hit']
+
+    def get_saved(self, key):
+        """
+        Retourne les rayons ('radius') ou vitesses ('speed') calculés par les processus lors du dernier pas de
+        temps, s'ils correspondent au temps actuel du simulateur.
+
+        :param key: Grandeur désirée ('radius' ou 'speed').
+        :type key: string
+        :return: Valeurs de chaque satellite (None si elles ne sont plus à jour).
+        :rtype: 1D-array
+        """
+        if self.time is None or self.time != self.fleet.simulator.time:
+            return None
+        return self.arrays[key].copy()
+
+    def close(self):
+        """
+        Arrête les processus de calcul et libère la mémoire partagée ; la flotte retrouve des tableaux ordinaires.
+        """
+        for key in SHARED_ARRAYS:
+            setattr(self.fleet, key, np.array(getattr(self.fleet, key)))
+        self.finalizer()
+
+    @staticmethod
+    def release(processes, blocks, arrays, start):
+        """
+        Arrête les processus de calcul et libère les blocs de mémoire partagée.
+        """
+        if any(process.is_alive() for process in processes):
+            arrays['control'][2] = STOP
+            start.wait()
+            for process in processes:
+                process.join()
+        arrays.clear()
+        for block in blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                pass        # Vues encore utilisées (fin de l'interpréteur) : le bloc est tout de même supprimé
+            block.unlink()
@@ -1,10 +1,18 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from classes.object import Object
+from classes.ephemeris import Ephemeris
+
+# Niveaux de détail (nombre de points sur la surface), du plus grossier au plus fin
+LOD_POINTS = (60, 150, 600, 2400)
+# Cache des maillages de sphère, par couple (rayon, niveau de détail)
+_MESH_CACHE = {}
+
 
 class Planet(Object):
 
-    def __init__(self, radius, mass, name='unnamed', x=(0, 0, 0), v=(0, 0, 0), a=(0, 0, 0)):
+    def __init__(self, radius, mass, name='unnamed', x=(0, 0, 0), v=(0, 0, 0), a=(0, 0, 0), rotation_rate=0.,
+                 rotation_0=0.):
         """
        Initialise un objet de classe Planet.
 
@@ -20,11 +28,170 @@ class Planet(Object):
        :type v: 1D-array or tuple   (3 components)
        :param a: Accélération initiale de la planète (par défaut (0, 0, 0)).
        :type a: 1D-array or tuple   (3 components)
+       :param rotation_rate: Vitesse de rotation propre autour de l'axe z (en rad/s, par défaut 0).
+       :type rotation_rate: float
+       :param rotation_0: Angle de rotation à l'instant t = 0 (en rad, par défaut 0).
+       :type rotation_0: float
        """
         super().__init__(mass=mass, x=x, v=v, a=a, name=name)
+        self.a = np.array(a, dtype=float) # Accélération de la planète (lue dans l'éphéméride si elle se déplace)
         self.radius = radius
+        self.rotation_rate, self.rotation_0 = rotation_rate, rotation_0
+        # Stations sol : nom -> latitude, longitude (en rad), altitude (en m) et élévation minimale (en rad)
+        self.stations = {}
+        # Trajectoire connue (si la planète se déplace), et éphéméride précalculée correspondante
+        self.track, self.ephemeris = None, None
+        self.ephemeris_args = {}
+
+    def set_track(self, track, segment=86400., degree=12):
+        """
+        Définit la trajectoire connue de la planète. Sa position n'est pas intégrée : elle est lue à chaque itération
+        dans une éphéméride (segments de Chebyshev) construite une seule fois à partir de cette trajectoire.
+
+        :param track: Trajectoire connue (t -> positions, ou t -> (positions, vitesses)), ex: KeplerTrack.
+        :type track: callable
+        :param segment: Durée de chaque segment de l'éphéméride (en sec, par défaut 1 jour).
+        :type segment: float
+        :param degree: Degré des polynômes de l'éphéméride (par défaut 12).
+        :type degree: int
+        """
+        self.track, self.ephemeris = track, None
+        self.ephemeris_args = {'segment': segment, 'degree': degree}
+
+    def build_ephemeris(self, t_start, t_end):
+        """
+        Construit l'éphéméride de la planète sur l'intervalle demandé (30 segments au minimum), si elle ne le couvre
+        pas déjà.
+
+        :param t_start: Début de l'intervalle (en sec).
+        :type t_start: float
+        :param t_end: Fin de l'intervalle (en sec).
+        :type t_end: float
+        """
+        if not self.track is None and (self.ephemeris is None or not self.ephemeris.covers(t_start, t_end)):
+            # Au moins 30 segments, pour éviter de reconstruire l'éphéméride à chaque itération
+            t_end = max(t_end, t_start + 30 * self.ephemeris_args['segment'])
+            self.ephemeris = Ephemeris(self.track, t_start, t_end, **self.ephemeris_args)
+
+    def get_state(self, time):
+        """
+        Retourne la position et la vitesse de la planète à un ou plusieurs instants (lecture de l'éphéméride si la
+        planète se déplace, état actuel sinon).
+
+        :param time: Instant(s) (en sec).
+        :type time: float or 1D-array
+        :return: Position(s) et vitesse(s).
+        :rtype: tuple   (2 * 1D-array (3 components) or 2 * 2D-array (T*3 components))
+        """
+        if self.track is None:
+            return self.x, self.v
+        self.build_ephemeris(np.min(time), np.max(time))
+        return self.ephemeris.position(time), self.ephemeris.velocity(time)
+
+    def update(self, time):
+        """
+        Met à jour la position et la vitesse de la planète à l'instant demandé, par lecture de son éphéméride.
+        Sans trajectoire connue, la planète reste immobile.
+
+        :param time: Instant de la simulation (en sec).
+        :type time: float
+        """
+        if self.track is None:
+            return
+        self.build_ephemeris(time, time)
+        self.x, self.v = self.ephemeris.position(time), self.ephemeris.velocity(time)
+        self.a = self.ephemeris.acceleration(time)
+
+    def add_station(self, name, lat, lon, altitude=0., min_elevation=0.):
+        """
+        Ajoute une station sol à la surface de la planète.
+
+        :param name: Nom de la station.
+        :type name: string
+        :param lat: Latitude de la station (en degrés).
+        :type lat: float
+        :param lon: Longitude de la station (en degrés).
+        :type lon: float
+        :param altitude: Altitude de la station (en m, par défaut 0).
+        :type altitude: float
+        :param min_elevation: Élévation minimale de visibilité au-dessus de l'horizon (en degrés, par défaut 0).
+        :type min_elevation: float
+        """
+        self.stations[name] = {'lat': np.radians(lat), 'lon': np.radians(lon), 'altitude': altitude,
+                               'min_elevation': np.radians(min_elevation)}
+
+    def get_stations(self, times, names=None):
+        """
+        Calcule les positions des stations sol (relatives au centre de la planète) et leurs verticales locales, dans
+        le repère inertiel, à chaque instant demandé (la planète tourne autour de l'axe z).
+
+        :param times: Instants (en sec).
+        :type times: 1D-array   (T components)
+        :param names: Noms des stations (par défaut toutes).
+        :type names: list[string]
+        :return: Positions (T*S*3), verticales locales (T*S*3) et élévations minimales (S) des stations.
+        :rtype: tuple   (3D-array, 3D-array, 1D-array)
+        """
+        names = list(self.stations.keys()) if names is None else names
+        lat = np.array([self.stations[name]['lat'] for name in names])
+        lon = np.array([self.stations[name]['lon'] for name in names])
+        altitude = np.array([self.stations[name]['altitude'] for name in names])
+        # Longitude inertielle de chaque station à chaque instant
+        angle = lon[None, :] + self.rotation_0 + self.rotation_rate * np.asarray(times, dtype=float)[:, None]
+        up = np.stack([np.cos(lat) * np.cos(angle), np.cos(lat) * np.sin(angle),
+                       np.broadcast_to(np.sin(lat), angle.shape)], axis=-1)
+        return (self.radius + altitude)[None, :, None] * up, up, \
+            np.array([self.stations[name]['min_elevation'] for name in names])
+
+    def choose_lod(self, view_scale=None):
+        """
+        Choisit le niveau de détail du maillage selon l'échelle de la vue : plus la planète occupe une petite partie
+        de la vue, moins il est nécessaire d'afficher de points.
+
+        :param view_scale: Demi-largeur de la zone affichée (en m). Si None, niveau de détail le plus fin.
+        :type view_scale: float
+        :return: Indice du niveau de détail dans LOD_POINTS.
+        :rtype: int
+        """
+        if view_scale is None or view_scale <= 0:
+            return len(LOD_POINTS) - 1
+        # Fraction de la vue occupée par la planète (1 = la planète remplit la vue)
+        fraction = min(self.radius / view_scale, 1)
+        if fraction > 0.5:
+            return 3
+        elif fraction > 0.2:
+            return 2
+        elif fraction > 0.05:
+            return 1
+        return 0
+
+    def get_mesh(self, lod=None, N_points=None):
+        """
+        Retourne le maillage de la surface de la planète, centré sur l'origine. Le maillage est calculé une seule fois
+        par couple (rayon, niveau de détail), puis conservé en cache pour les appels suivants.
+
+        :param lod: Indice du niveau de détail dans LOD_POINTS (par défaut le plus fin).
+        :type lod: int
+        :param N_points: Nombre de points imposé, prioritaire sur lod (par défaut None).
+        :type N_points: int
+        :return: Coordonnées x, y, z des points de la surface.
+        :rtype: tuple   (3 * 2D-array)
+        """
+        if N_points is None:
+            N_points = LOD_POINTS[len(LOD_POINTS) - 1 if lod is None else lod]
+        key = (self.radius, N_points)
+        if key not in _MESH_CACHE:
+            # Définition des angles azimutal et polaire
+            theta = np.linspace(0, 2 * np.pi, round(np.sqrt(N_points*2)))  # Angle azimutal
+            phi = np.linspace(0, np.pi, round(np.sqrt(N_points/2)))  # Angle polaire
+            # Calcul des coordonnées des points sur la surface de la planète
+            x = self.radius * np.outer(np.cos(theta), np.sin(phi))
+            y = self.radius * np.outer(np.sin(theta), np.sin(phi))
+            z = self.radius * np.outer(np.ones(np.size(theta)), np.cos(phi))
+            _MESH_CACHE[key] = (x, y, z)
+        return _MESH_CACHE[key]
 
-    def plot(self, fig=None, ax=None, display=True, N_points=600):
+    def plot(self, fig=None, ax=None, display=True, N_points=None, view_scale=None):
         """
         Trace la représentation en 3D de la planète.
 
@@ -34,24 +201,21 @@ class Planet(Object):
         :type ax: axe    (from matplotlib)
         :param display: Indique si le tracé doit être affiché (par défaut True).
         :type display: boolean
-        :param N_points: Nombre de points à tracer sur la surface de la planète (par défaut 600).
+        :param N_points: Nombre de points à tracer sur la surface de la planète. Si None, il est choisi selon
+                         l'échelle de la vue (par défaut None).
         :type N_points: int
+        :param view_scale: Demi-largeur de la zone affichée (en m), pour le choix du niveau de détail.
+        :type view_scale: float
         :return: Figure et des axes matplotlib mis à jour.
         :rtype: figure, axe    (from matplotlib)
         """
         if fig is None or ax is None:
             fig = plt.figure()
             ax = fig.add_subplot(111, projection='3d')
-        # Définition des angles azimutal et polaire
-        theta = np.linspace(0, 2 * np.pi, round(np.sqrt(N_points*2)))  # Angle azimutal
-        phi = np.linspace(0, np.pi, round(np.sqrt(N_points/2)))  # Angle polaire
-
-        # Calcul des coordonnées des points sur la surface de la planète
-        x = self.radius * np.outer(np.cos(theta), np.sin(phi)) + self.x[0]
-        y = self.radius * np.outer(np.sin(theta), np.sin(phi)) + self.x[1]
-        z = self.radius * np.outer(np.ones(np.size(theta)), np.cos(phi)) + self.x[2]
+        # Maillage en cache, translaté à la position actuelle de la planète
+        x, y, z = self.get_mesh(lod=self.choose_lod(view_scale=view_scale), N_points=N_points)
         # Tracé de la surface de la planète en 3D
-        ax.plot_surface(x, y, z, color='b', alpha=0.7)
+        ax.plot_surface(x + self.x[0], y + self.x[1], z + self.x[2], color='b', alpha=0.7)
 
         if display:
             ax.axis('equal')
@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+"""
+Planification en arrière-plan : les calculs coûteux des contrôleurs (plans de manoeuvre) sont confiés à un pool de
+fils ou de processus, pendant que la simulation continue. Chaque plan est appliqué à un instant simulé fixé dès sa
+soumission (et non à la fin du calcul) : les résultats d'une simulation ne dépendent pas de la durée des calculs.
+"""
+
+
+class PlanningPool:
+
+    def __init__(self, workers=1, kind='thread', delay=0.):
+        """
+        Initialise le pool de planification.
+
+        :param workers: Nombre de fils (ou de processus) de calcul (par défaut 1).
+        :type workers: int
+        :param kind: 'thread' (par défaut) ou 'process'. Avec des processus, les fonctions de planification doivent
+                     être de niveau module, et leurs arguments sérialisables.
+        :type kind: string
+        :param delay: Délai simulé entre la soumission d'un calcul et l'application de son plan (en sec, par défaut
+                      0 : à la mise à jour suivante des contrôleurs).
+        :type delay: float
+        """
+        if not kind in ('thread', 'process'):
+            raise ValueError(f"unknown kind of planning pool: {kind}")
+        self.workers, self.kind, self.delay = workers, kind, delay
+        self.executor = None
+        # Calculs en attente : (instant d'application, numéro de soumission, calcul, application du plan)
+        self.pending = []
+        self.submitted = 0
+
+    def __len__(self):
+        """
+        Retourne le nombre de plans en attente d'application.
+
+        :rtype: int
+        """
+        return len(self.pending)
+
+    def submit(self, function, state, apply, time):
+        """
+        Soumet un calcul de plan au pool.
+
+        :param function: Fonction de planification (state -> plan).
+        :type function: callable
+        :param state: Instantané de l'état nécessaire au calcul.
+        :type state: dict
+        :param apply: Fonction appliquant le plan calculé (exécutée par la simulation, voir collect).
+        :type apply: callable
+        :param time: Instant simulé de la soumission (en sec).
+        :type time: float
+        :return: Instant simulé d'application du plan (en sec).
+        :rtype: float
+        """
+        if self.executor is None:
+            pool = ThreadPoolExecutor if self.kind == 'thread' else ProcessPoolExecutor
+            self.executor = pool(max_workers=self.workers)
+        due = time + self.delay
+        self.pending.append((due, self.submitted, self.executor.submit(function, state), apply))
+        self.submitted += 1
+        return due
+
+    def collect(self, time, tolerance=0.):
+        """
+        Applique les plans dont l'instant d'application est atteint, dans l'ordre des instants puis des soumissions.
+        Un calcul non terminé est attendu : l'instant d'application ne dépend jamais de la durée du calcul.
+
+        :param time: Instant simulé actuel (en sec).
+        :type time: float
+        :param tolerance: Tolérance sur les instants d'application (en sec, par défaut 0).
+        :type tolerance: float
+        :return: Nombre de plans appliqués.
+        :rtype: int
+        """
+        due = [job for job in self.pending if job[0] <= time + tolerance]
+        if not due:
+            return 0
+        self.pending = [job for job in self.pending if job[0] > time + tolerance]
+        for _, _, future, apply in sorted(due, key=lambda job: job[:2]):
+            apply(future.result())
+        return len(due)
+
+    def close(self):
+        """
+        Termine les calculs en cours puis arrête le pool (il est recréé à la soumission suivante). Les plans en
+        attente restent applicables.
+        """
+        if not self.executor is None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
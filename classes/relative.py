@@ -0,0 +1,96 @@
+import numpy as np
+"""
+Mouvement relatif autour d'un satellite "chef" : repère local orbital (LVLH : radial, le long de la trace, normal au
+plan de l'orbite) et solution analytique de Clohessy-Wiltshire, vectorisée sur un grand nombre de satellites
+"adjoints".
+"""
+
+
+def lvlh_frame(r, v):
+    """
+    Calcule la base du repère local orbital d'un satellite : x radial (vers l'extérieur), z selon le moment cinétique,
+    y complétant le trièdre direct (sens du mouvement pour une orbite circulaire).
+
+    :param r: Position du satellite, relative au centre de l'astre.
+    :type r: 1D-array   (3 components)
+    :param v: Vitesse du satellite, relative au centre de l'astre.
+    :type v: 1D-array   (3 components)
+    :return: Matrice de passage (lignes : vecteurs x, y, z du repère local) et vitesse de rotation du repère (rad/s).
+    :rtype: tuple   (2D-array (3*3), float)
+    """
+    r, v = np.asarray(r, dtype=float), np.asarray(v, dtype=float)
+    h = np.cross(r, v)
+    ux, uz = r / np.linalg.norm(r), h / np.linalg.norm(h)
+    return np.array([ux, np.cross(uz, ux), uz]), np.linalg.norm(h) / np.dot(r, r)
+
+
+def to_lvlh(chief_r, chief_v, r, v):
+    """
+    Convertit des états inertiels en états relatifs, exprimés dans le repère local orbital (tournant) du chef.
+
+    :param chief_r: Position du chef.
+    :type chief_r: 1D-array   (3 components)
+    :param chief_v: Vitesse du chef.
+    :type chief_v: 1D-array   (3 components)
+    :param r: Positions des adjoints.
+    :type r: 2D-array   (N*3 components)
+    :param v: Vitesses des adjoints.
+    :type v: 2D-array   (N*3 components)
+    :return: Positions et vitesses relatives dans le repère local.
+    :rtype: tuple   (2 * 2D-array, N*3 components)
+    """
+    frame, omega = lvlh_frame(chief_r, chief_v)
+    rho = (np.atleast_2d(r) - chief_r) @ frame.T
+    drho = (np.atleast_2d(v) - chief_v) @ frame.T - np.cross((0, 0, omega), rho)
+    return rho, drho
+
+
+def from_lvlh(chief_r, chief_v, rho, drho):
+    """
+    Convertit des états relatifs (repère local orbital du chef) en états inertiels (inverse de to_lvlh).
+
+    :param chief_r: Position du chef.
+    :type chief_r: 1D-array   (3 components)
+    :param chief_v: Vitesse du chef.
+    :type chief_v: 1D-array   (3 components)
+    :param rho: Positions relatives.
+    :type rho: 2D-array   (N*3 components)
+    :param drho: Vitesses relatives.
+    :type drho: 2D-array   (N*3 components)
+    :return: Positions et vitesses inertielles.
+    :rtype: tuple   (2 * 2D-array, N*3 components)
+    """
+    frame, omega = lvlh_frame(chief_r, chief_v)
+    rho = np.atleast_2d(rho)
+    return chief_r + rho @ frame, chief_v + (np.atleast_2d(drho) + np.cross((0, 0, omega), rho)) @ frame
+
+
+def cw_propagate(rho, drho, n, t):
+    """
+    Propage des états relatifs par la solution analytique de Clohessy-Wiltshire (chef sur orbite circulaire,
+    adjoints proches). Le calcul est vectorisé sur les N adjoints et, éventuellement, sur T instants.
+
+    :param rho: Positions relatives initiales (x radial, y le long de la trace, z normal).
+    :type rho: 2D-array   (N*3 components)
+    :param drho: Vitesses relatives initiales.
+    :type drho: 2D-array   (N*3 components)
+    :param n: Moyen mouvement de l'orbite du chef (en rad/s).
+    :type n: float
+    :param t: Durée(s) de propagation (en sec).
+    :type t: float or 1D-array   (T components)
+    :return: Positions et vitesses relatives (de forme N*3, ou T*N*3 si t est un tableau).
+    :rtype: tuple   (2 * 2D-array or 2 * 3D-array)
+    """
+    rho, drho = np.atleast_2d(np.asarray(rho, dtype=float)), np.atleast_2d(np.asarray(drho, dtype=float))
+    t = np.asarray(t, dtype=float)
+    nt = n * t[..., None]
+    c, s = np.cos(nt), np.sin(nt)
+    x0, y0, z0 = rho[:, 0], rho[:, 1], rho[:, 2]
+    vx0, vy0, vz0 = drho[:, 0], drho[:, 1], drho[:, 2]
+    x = (4 - 3 * c) * x0 + s / n * vx0 + 2 / n * (1 - c) * vy0
+    y = 6 * (s - nt) * x0 + y0 - 2 / n * (1 - c) * vx0 + (4 * s - 3 * nt) / n * vy0
+    z = c * z0 + s / n * vz0
+    vx = 3 * n * s * x0 + c * vx0 + 2 * s * vy0
+    vy = -6 * n * (1 - c) * x0 - 2 * s * vx0 + (4 * c - 3) * vy0
+    vz = -n * s * z0 + c * vz0
+    return np.stack([x, y, z], axis=-1), np.stack([vx, vy, vz], axis=-1)
@@ -1,9 +1,19 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection, Line3DCollection
 from classes.tools import zero, rotation_matrix, from_other_base
 from classes.thruster import Thruster
 from classes.controler import Controler
 from classes.object import Object
+from assets.stl_reader import STLReader
+from classes.soi import G, kepler_propagate
+
+# Sommets du cube unitaire (centré sur l'origine), dans la base (ux, uy, uz) du satellite
+CUBE_CORNERS = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                         [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]]) - 0.5
+# Indices des faces du cube
+CUBE_FACES = np.array([[0, 1, 2, 3], [4, 5, 6, 7], [0, 1, 5, 4],
+                       [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]])
 
 
 class Satellite(Object):
@@ -43,10 +53,13 @@ class Satellite(Object):
 
         # Thrusters
         self.thrusters = []                 # Liste des thrusters
+        self.thruster_index = {}            # Indice de chaque thruster dans la liste, selon son nom
         self.thrust = zero()   # Force en N
         self.torque = zero()
         self.inertia = 1/12 * self.mass * np.array([self.size[1]**2 + self.size[2]**2, self.size[0]**2 + self.size[2]**2, self.size[0]**2 + self.size[1]**2])
         self.a_ang, self.v_ang, self.x_ang = zero(), zero(), zero()
+        self.model, self.model_scale, self.model_center = None, 1., zero()     # Maillage STL (optionnel)
+        self.arc = None     # Arc képlérien précalculé (coniques raccordées)
 
         # Controlers :
         self.controls = {}          # Manuals controls
@@ -63,6 +76,45 @@ class Satellite(Object):
         self.scale = scale
         self.size = np.dot(scale, self.size)
 
+    def set_model(self, model, scale=1.):
+        """
+        Associe un maillage STL au satellite, et remplace l'inertie du parallélépipède par celle du maillage (densité
+        uniforme, masse du satellite). Les propriétés de masse ne sont calculées qu'une fois, au chargement.
+        Seuls les termes diagonaux du tenseur d'inertie (dans la base du satellite) sont utilisés par l'intégration.
+
+        :param model: Chemin du fichier STL ou lecteur déjà chargé.
+        :type model: string or Class STLReader
+        :param scale: Facteur d'échelle entre les unités du fichier STL et le mètre (par défaut 1).
+        :type scale: float
+        """
+        if not isinstance(model, STLReader):
+            model = STLReader(model)
+        if not model.isLoaded:
+            return
+        properties = model.get_mass_properties(mass=self.mass, scale=scale)
+        if properties is None:
+            return
+        self.model, self.model_scale, self.model_center = model, scale, properties['center']
+        self.inertia_tensor = properties['inertia']
+        self.inertia = np.diag(self.inertia_tensor).copy()
+
+    def get_clearance(self, points):
+        """
+        Calcule la distance exacte entre des points (repère global) et le maillage STL du satellite. Le centre de
+        masse du maillage est placé à la position du satellite, et le maillage suit l'orientation du satellite.
+
+        :param points: Coordonnées des points (par exemple, une trajectoire).
+        :type points: 2D-array   (N*3 components)
+        :return: Distance de chaque point au maillage (en m), None si aucun maillage n'est associé.
+        :rtype: 1D-array
+        """
+        if self.model is None:
+            return None
+        # Passage dans le repère du maillage : base du satellite, puis unités du fichier STL
+        local = np.dot(np.atleast_2d(points) - self.x, np.array([self.ux, self.uy, self.uz]).T)
+        local = local / self.model_scale + self.model_center / self.model_scale
+        return self.model.get_bvh().query(local)[0] * self.model_scale
+
     def set_planet_ref(self, planet_ref):
         """
         Définit la référence planétaire pour le satellite (pour le calcul de rayon, du vcteur ur, des orbites GEO ...)
@@ -84,6 +136,7 @@ class Satellite(Object):
         """
         if type(obj) == Thruster: # Si l'objet est de type Thruster
             # Ajoute le thruster à la liste des thrusters du satellite
+            self.thruster_index.setdefault(obj.name, len(self.thrusters))
             self.thrusters.append(obj)
         elif type(obj) == Controler: # Si l'objet est de type Controler
             # Définit le controleur pour le satellite
@@ -99,6 +152,29 @@ class Satellite(Object):
         else:
             print(f" > Impossible d'ajouter ce type d'objet à la simulation")
 
+    @property
+    def alive(self):
+        """
+        Indique si le satellite est en vie.
+
+        :rtype: boolean
+        """
+        return self._alive
+
+    @alive.setter
+    def alive(self, value):
+        """
+        Modifie l'état du satellite, et signale le changement à la simulation (nombre de satellites en vie et
+        satellites actifs tenus à jour sans parcourir la liste des satellites).
+
+        :param value: Nouvel état du satellite.
+        :type value: boolean
+        """
+        changed = bool(value) != getattr(self, '_alive', bool(value))
+        self._alive = bool(value)
+        if changed and not self.simulator is None:
+            self.simulator.set_alive(self, self._alive)
+
     def get(self, name):
         """
         Récupère un thruster du satellite par son nom.
@@ -108,12 +184,11 @@ class Satellite(Object):
         :return: Thruster correspondant au nom spécifié, None s'il n'est pas trouvé.
         :rtype: Class Thruster
         """
-        # Parcours tous les thrusters du satellite
-        for thruster in self.thrusters:
-            if thruster.name == name: # Si le nom du thruster correspond au nom spécifié
-                # Retourne le thruster correspondant
-                return thruster
-        return None  # Si aucun thruster n'est trouvé avec le nom spécifié, retourne None
+        # Recherche directe de l'indice du thruster selon son nom
+        index = self.thruster_index.get(name)
+        if index is None:
+            return None  # Si aucun thruster n'est trouvé avec le nom spécifié, retourne None
+        return self.thrusters[index]
 
     def get_altitude(self):
         """
@@ -201,7 +276,7 @@ class Satellite(Object):
         else:
             return self.speed
 
-    def step(self, planets, infos=0):
+    def step(self, planets, infos=0, kepler=False, patched=False):
         """
         Effectue un pas de simulation pour le satellite.
 
@@ -209,6 +284,12 @@ class Satellite(Object):
         :type planets: list[Class Planet]
         :param infos: Quantité d'informations à afficher (toutes les 'infos' étapes. Si 0, affiche aucune infos).
         :type infos: int
+        :param kepler: Si True et qu'une seule planète est prise en compte, le satellite sans poussée suit exactement
+                       son orbite képlérienne autour d'elle (par défaut False).
+        :type kepler: boolean
+        :param patched: Si True (coniques raccordées), planets ne contient que la planète dominante : l'accélération
+                        propre de celle-ci est ajoutée, le satellite étant entraîné avec elle (par défaut False).
+        :type patched: boolean
         """
         if self.alive and (not self.islanded or self.istakingoff):
             # Obtient la force et le couple générés par les propulseurs du satellite
@@ -216,7 +297,13 @@ class Satellite(Object):
             # Force :
             # Calcul de l'accélération en ajoutant l'accélération gravitationnelle et la force divisée par la masse
             self.a = self.get_ag(planets=planets) + F / self.mass
-            self.x, self.v, self.a = self.simulator.integrate(f=self.x, df=self.v, ddf=self.a)
+            if patched:
+                self.a = self.a + planets[0].a
+            if kepler and len(planets) == 1 and not np.any(F):
+                # Vol balistique dans la SOI d'une seule planète : propagation képlérienne
+                self.x, self.v = self.kepler_step(planets[0])
+            else:
+                self.x, self.v, self.a = self.simulator.integrate(f=self.x, df=self.v, ddf=self.a)
             self.radius, self.speed = None, None
             # Couple :
             # Calcul de l'accélération angulaire en divisant le couple par l'inertie
@@ -232,6 +319,34 @@ class Satellite(Object):
         # Mise à jour des contrôles du satellite
         self.update_controls(infos=infos)
 
+    def kepler_step(self, pln, steps=256):
+        """
+        Calcule l'état du satellite après un pas de temps, sur son orbite képlérienne autour de la planète (coniques
+        raccordées : les autres planètes sont ignorées). L'arc képlérien des prochains pas de temps est calculé en
+        un seul appel vectorisé, puis lu pas à pas tant que le satellite le suit (même planète, état non modifié).
+
+        :param pln: Planète dominante.
+        :type pln: Class Planet
+        :param steps: Nombre de pas de temps calculés à l'avance (par défaut 256).
+        :type steps: int
+        :return: Position et vitesse après un pas de temps.
+        :rtype: tuple   (2 * 1D-array, 3 components)
+        """
+        time, dt = self.simulator.time, self.simulator.dt
+        arc = self.arc
+        if arc is None or arc['planet'] is not pln or arc['dt'] != dt or arc['k'] >= steps or \
+                not (np.array_equal(arc['x'], self.x) and np.array_equal(arc['v'], self.v)):
+            # Nouvel arc : propagation depuis l'état actuel, vers les instants des prochains pas de temps
+            delays = dt * np.arange(1, steps + 1)
+            x0, v0 = pln.get_state(time)
+            r, v = kepler_propagate(np.tile(self.x - x0, (steps, 1)), np.tile(self.v - v0, (steps, 1)), delays,
+                                    G * pln.mass)
+            x1, v1 = pln.get_state(time + delays)
+            arc = self.arc = {'planet': pln, 'dt': dt, 'k': 0, 'xs': x1 + r, 'vs': v1 + v}
+        x, v = arc['xs'][arc['k']].copy(), arc['vs'][arc['k']].copy()
+        arc['k'], arc['x'], arc['v'] = arc['k'] + 1, x.copy(), v.copy()
+        return x, v
+
     def update_controls(self, infos=0):
         """
         Met à jour les contrôles du satellite.
@@ -244,7 +359,8 @@ class Satellite(Object):
                 time, value = step[0], step[1]
                 if self.simulator.time >= time:
                     if infos:
-                        print(f"   | set {controler} to {value}" + ' '*3 + f"({self.simulator.time} sec)")
+                        self.simulator.events.log('set', f"set {controler} to {value}", time=self.simulator.time,
+                                                  source=self.name)
                     # Gestion des différents types de contrôleurs
                     if '-' in controler:
                         if controler[:8] == 'thruster':
@@ -259,6 +375,15 @@ class Satellite(Object):
                         setattr(self, controler, value)
                     self.controls[controler].remove(step)
 
+    def get_vertices(self):
+        """
+        Calcule les coordonnées des 8 sommets du parallélépipède représentant le satellite.
+
+        :return: Coordonnées des sommets.
+        :rtype: 2D-array   (8*3 components)
+        """
+        return self.x + np.dot(CUBE_CORNERS * self.size, np.array([self.ux, self.uy, self.uz]))
+
     def plot(self, fig=None, ax=None, display=True, direction=True):
         """
         Trace la représentation en 3D du satellite.
@@ -274,38 +399,85 @@ class Satellite(Object):
         :return: Figure et des axes matplotlib mis à jour.
         :rtype: figure, axe    (from matplotlib)
         """
-        if fig is None or ax is None:
-            fig = plt.figure()
-            ax = fig.add_subplot(111, projection='3d')
-
-        # Coordonnées des sommets du cube
-        vertices = np.zeros((8, 3))
-        vertices[1], vertices[2] = self.size[0] * self.ux, self.size[0] * self.ux + self.size[1] * self.uy
-        vertices[3] = self.size[1] * self.uy
-        vertices[4:] = vertices[:4] + self.size[2] * self.uz
-        vertices += self.x - np.dot(np.array(self.size), np.array([self.ux, self.uy, self.uz])) / 2
-
-        # Indices des faces du cube
-        faces = np.array([[0, 1, 2, 3], [4, 5, 6, 7],  [0, 1, 5, 4],
-                          [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]])
-
-        # Tracer les faces du cube
-        for face in faces:
-            x, y, z = vertices[face, 0], vertices[face, 1], vertices[face, 2]
-            x[2::], y[2::], z[2::] = x[:1:-1], y[:1:-1], z[:1:-1]
-            ax.plot_surface(x.reshape((2, 2)), y.reshape((2, 2)), z.reshape((2, 2)), facecolors=self.color)
-
-        # Vecteur direction
+        return plot_satellites([self], fig=fig, ax=ax, display=display, direction=direction)
+
+
+def plot_satellites(satellites, fig=None, ax=None, display=True, direction=True):
+    """
+    Trace la représentation en 3D de plusieurs satellites en une seule fois (voir plot_boxes).
+
+    :param satellites: Liste des satellites à tracer.
+    :type satellites: list[Class Satellite]
+    :param fig: Objet de la figure matplotlib (Si None, création d'une nouvelle).
+    :type fig: figure    (from matplotlib)
+    :param ax: Objet des axes matplotlib en 3D (Si None, création d'une nouvelle).
+    :type ax: axe    (from matplotlib)
+    :param display: Indique si le tracé doit être affiché (par défaut True).
+    :type display: boolean
+    :param direction: Affiche ou non le vecteur directeur des satellites (par défaut True).
+    :type direction: boolean
+    :return: Figure et des axes matplotlib mis à jour.
+    :rtype: figure, axe    (from matplotlib)
+    """
+    return plot_boxes(x=[sat.x for sat in satellites], size=[sat.size for sat in satellites],
+                      axes=[[sat.ux, sat.uy, sat.uz] for sat in satellites], colors=[sat.color for sat in satellites],
+                      fig=fig, ax=ax, display=display, direction=direction)
+
+
+def plot_boxes(x, size, axes, colors, fig=None, ax=None, display=True, direction=True):
+    """
+    Trace des parallélépipèdes (satellites) à partir de tableaux de positions, tailles et bases. Les faces de tous
+    les satellites sont regroupées dans une unique collection de polygones (et les vecteurs directeurs dans une
+    unique collection de segments), ce qui évite un appel de tracé par face et par satellite.
+
+    :param x: Positions des satellites.
+    :type x: 2D-array   (N*3 components)
+    :param size: Tailles des satellites.
+    :type size: 2D-array   (N*3 components)
+    :param axes: Bases (ux, uy, uz) des satellites.
+    :type axes: 3D-array   (N*3*3 components)
+    :param colors: Couleur de chaque satellite.
+    :type colors: list[string]
+    :param fig: Objet de la figure matplotlib (Si None, création d'une nouvelle).
+    :type fig: figure    (from matplotlib)
+    :param ax: Objet des axes matplotlib en 3D (Si None, création d'une nouvelle).
+    :type ax: axe    (from matplotlib)
+    :param display: Indique si le tracé doit être affiché (par défaut True).
+    :type display: boolean
+    :param direction: Affiche ou non le vecteur directeur des satellites (par défaut True).
+    :type direction: boolean
+    :return: Figure et des axes matplotlib mis à jour.
+    :rtype: figure, axe    (from matplotlib)
+    """
+    if fig is None or ax is None:
+        fig = plt.figure()
+        ax = fig.add_subplot(111, projection='3d')
+
+    if len(x) > 0:
+        x = np.asarray(x, dtype=float).reshape(-1, 3)
+        size = np.asarray(size, dtype=float).reshape(-1, 3)
+        axes = np.asarray(axes, dtype=float).reshape(-1, 3, 3)
+
+        # Coordonnées des sommets des cubes : (N, 8, 3)
+        vertices = x[:, None, :] + np.einsum('ck,nk,nkj->ncj', CUBE_CORNERS, size, axes)
+        # Faces de tous les cubes : (N * 6, 4, 3)
+        faces = vertices[:, CUBE_FACES].reshape(-1, 4, 3)
+        colors = np.repeat(colors, len(CUBE_FACES))
+        # Mise à l'échelle des axes (les collections ne sont pas prises en compte automatiquement)
+        ax.auto_scale_xyz(vertices[..., 0], vertices[..., 1], vertices[..., 2], had_data=ax.has_data())
+        ax.add_collection3d(Poly3DCollection(faces, facecolors=colors))
+
+        # Vecteurs directeurs
         if direction:
-            dir = np.array([self.x, self.x - self.ux * self.size[0]])
-            ax.plot(dir[:, 0], dir[:, 1], dir[:, 2], '-k')
-
-        # Affichage
-        if display:
-            ax.axis('equal')
-            ax.set_xlabel('X')
-            ax.set_ylabel('Y')
-            ax.set_zlabel('Z')
-            plt.show()
-
-        return fig, ax
+            segments = np.stack([x, x - axes[:, 0] * size[:, :1]], axis=1)
+            ax.add_collection3d(Line3DCollection(segments, colors='k'))
+
+    # Affichage
+    if display:
+        ax.axis('equal')
+        ax.set_xlabel('X')
+        ax.set_ylabel('Y')
+        ax.set_zlabel('Z')
+        plt.show()
+
+    return fig, ax
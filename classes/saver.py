@@ -1,6 +1,173 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from classes.fleet import THRUSTER_NAMES
+from classes.elements import cartesian_to_keplerian, cartesian_to_equinoctial
+from classes.downsample import downsample
+
+# Colonnes de la base de données
+COLUMNS = ['name', 'time', 'r', 'x1', 'x2', 'x3', 'v', 'v1', 'v2', 'v3', 'dt', 'orientation', 'power']
+# Noms des colonnes d'éléments orbitaux
+ELEMENTS = {'keplerian': ['a', 'e', 'i', 'raan', 'argp', 'nu'], 'equinoctial': ['p', 'f', 'g', 'h', 'k', 'L']}
+# Puissances quantifiées : type entier -> valeur représentant une puissance de 1 (puissances comprises dans [-1, 1])
+QUANTIZED = {'int8': 127, 'int16': 32767}
+# Nombre de niveaux de zoom dont les points affichés sont conservés (les moins récemment utilisés sont oubliés)
+ZOOM_LEVELS = 8
+
+
+class CompactHistory:
+
+    def __init__(self, position='float32', velocity='float32', scalars='float32', power='int8', time='delta',
+                 resolution=1e-3):
+        """
+        Initialise un historique compact : les lignes sont stockées par colonnes, dans des tampons d'octets de
+        précision choisie, au lieu de cellules float64 et d'objets Python. Les positions sont enregistrées par rapport
+        à la planète de référence de chaque satellite (position de la planète conservée en float64), les puissances
+        des propulseurs peuvent être quantifiées, et les instants sont codés par différences entières successives.
+
+        :param position: Type des positions relatives (par défaut 'float32').
+        :type position: string
+        :param velocity: Type des vitesses (par défaut 'float32').
+        :type velocity: string
+        :param scalars: Type des colonnes r, v, dt et orientation (par défaut 'float32').
+        :type scalars: string
+        :param power: Type des puissances : 'int8' ou 'int16' (quantifiées), ou un type flottant (par défaut 'int8').
+        :type power: string
+        :param time: Codage des instants : 'delta' (différences entières, par défaut) ou 'float64'.
+        :type time: string
+        :param resolution: Résolution du codage 'delta' des instants (en sec, par défaut 1 ms).
+        :type resolution: float
+        """
+        self.dtypes = {'position': np.dtype(position), 'velocity': np.dtype(velocity), 'scalars': np.dtype(scalars),
+                       'power': np.dtype(power), 'time': np.dtype('int32' if time == 'delta' else 'float64')}
+        self.delta, self.resolution = time == 'delta', resolution
+        self.buffers = {key: bytearray() for key in ['name', 'origin', 'time', 'position', 'velocity', 'scalars',
+                                                       'power']}
+        self.rows, self.last_tick = 0, 0
+        # Tables : noms (avec noms des propulseurs et planète de référence), et positions des planètes de référence
+        self.codes, self.labels, self.thrusters = {}, [], []
+        self.origins, self.last_origin = [], {}
+        self.fleet_codes = {}
+
+    def code(self, name, thrusters):
+        """
+        Retourne le code d'un satellite (un nouveau code si ses propulseurs ont changé).
+        """
+        code = self.codes.get(name)
+        if code is None or self.thrusters[code] != thrusters:
+            code = self.codes[name] = len(self.labels)
+            self.labels.append(name)
+            self.thrusters.append(thrusters)
+        return code
+
+    def origin(self, planet):
+        """
+        Retourne l'indice de la position actuelle d'une planète de référence (-1 : origine du repère). Une nouvelle
+        position n'est enregistrée que si la planète s'est déplacée.
+        """
+        if planet is None:
+            return -1
+        x = tuple(float(c) for c in planet.x)
+        last = self.last_origin.get(planet.name)
+        if last is None or self.origins[last] != x:
+            last = self.last_origin[planet.name] = len(self.origins)
+            self.origins.append(x)
+        return last
+
+    def encode_time(self, time, n):
+        """
+        Code l'instant de n nouvelles lignes.
+        """
+        if not self.delta:
+            return np.full(n, time, dtype=float).tobytes()
+        tick = int(round(time / self.resolution))
+        deltas = np.zeros(n, dtype=self.dtypes['time'])
+        deltas[0] = tick - self.last_tick
+        self.last_tick = tick
+        return deltas.tobytes()
+
+    def encode_power(self, power):
+        """
+        Code des puissances de propulseurs (quantification si le type est entier).
+        """
+        dtype = self.dtypes['power']
+        if dtype.name in QUANTIZED:
+            q = QUANTIZED[dtype.name]
+            return np.clip(np.rint(np.asarray(power, dtype=float) * q), -q, q).astype(dtype).tobytes()
+        return np.asarray(power, dtype=dtype).tobytes()
+
+    def append(self, codes, origin, time, x, v, scalars, power):
+        """
+        Ajoute des lignes à l'historique.
+
+        :param codes: Codes des satellites.
+        :type codes: 1D-array   (int)
+        :param origin: Indice de la position de la planète de référence (commun aux lignes).
+        :type origin: int
+        :param time: Instant (commun aux lignes).
+        :type time: float
+        :param x: Positions, relatives à la planète de référence.
+        :type x: 2D-array   (N*3 components)
+        :param v: Vitesses.
+        :type v: 2D-array   (N*3 components)
+        :param scalars: Colonnes r, v, dt et orientation.
+        :type scalars: 2D-array   (N*4 components)
+        :param power: Puissances des propulseurs, à la suite.
+        :type power: 1D-array
+        """
+        n = len(codes)
+        if n == 0:
+            return
+        b = self.buffers
+        b['name'] += np.asarray(codes, dtype=np.int32).tobytes()
+        b['origin'] += np.full(n, origin, dtype=np.int32).tobytes()
+        b['time'] += self.encode_time(time, n)
+        b['position'] += np.asarray(x, dtype=self.dtypes['position']).tobytes()
+        b['velocity'] += np.asarray(v, dtype=self.dtypes['velocity']).tobytes()
+        b['scalars'] += np.asarray(scalars, dtype=self.dtypes['scalars']).tobytes()
+        b['power'] += self.encode_power(power)
+        self.rows += n
+
+    def decode(self):
+        """
+        Décode tout l'historique en DataFrame (mêmes colonnes et mêmes types que les sauvegardes ordinaires).
+
+        :rtype: DataFrame   (from pandas)
+        """
+        b = self.buffers
+        codes = np.frombuffer(b['name'], dtype=np.int32)
+        origin = np.frombuffer(b['origin'], dtype=np.int32)
+        time = np.frombuffer(b['time'], dtype=self.dtypes['time'])
+        time = np.cumsum(time, dtype=np.int64) * self.resolution if self.delta else time.astype(float)
+        origins = np.vstack([np.zeros((1, 3)), np.array(self.origins, dtype=float).reshape(-1, 3)])
+        x = np.frombuffer(b['position'], dtype=self.dtypes['position']).reshape(-1, 3) + origins[origin + 1]
+        v = np.frombuffer(b['velocity'], dtype=self.dtypes['velocity']).reshape(-1, 3).astype(float)
+        scalars = np.frombuffer(b['scalars'], dtype=self.dtypes['scalars']).reshape(-1, 4).astype(float)
+        power = np.frombuffer(b['power'], dtype=self.dtypes['power']).astype(float)
+        if self.dtypes['power'].name in QUANTIZED:
+            power /= QUANTIZED[self.dtypes['power'].name]
+        # Puissances : nombre de propulseurs variable selon le satellite, regroupement par configuration
+        counts = np.array([len(t) for t in self.thrusters], dtype=np.int64)[codes]
+        offsets = np.cumsum(counts) - counts
+        kinds = {t: i for i, t in enumerate(dict.fromkeys(self.thrusters))}
+        kind = np.array([kinds[t] for t in self.thrusters], dtype=np.int64)[codes]
+        powers = np.empty(len(codes), dtype=object)
+        for names, i in kinds.items():
+            rows = np.flatnonzero(kind == i)
+            values = power[offsets[rows, None] + np.arange(len(names))]
+            powers[rows] = [dict(zip(names, row)) for row in values.tolist()]
+        return pd.DataFrame({'name': np.array(self.labels, dtype=object)[codes], 'time': time, 'r': scalars[:, 0],
+                             'x1': x[:, 0], 'x2': x[:, 1], 'x3': x[:, 2], 'v': scalars[:, 1], 'v1': v[:, 0],
+                             'v2': v[:, 1], 'v3': v[:, 2], 'dt': scalars[:, 2], 'orientation': scalars[:, 3],
+                             'power': powers}, columns=COLUMNS)
+
+    def nbytes(self):
+        """
+        Retourne la taille des tampons de l'historique (en octets).
+
+        :rtype: int
+        """
+        return sum(len(buffer) for buffer in self.buffers.values())
 
 
 class Saver:
@@ -11,8 +178,16 @@ class Saver:
         Permet de sauvegarde un grand nombre de donnée, sous forme de DataFrame, lors de la simulation, puis de les
         afficher sous forme de graphique à la fin de celle-ci.
         """
-        # Variables à sauvegarder :
-        self.df = pd.DataFrame(columns=['name', 'time', 'r', 'x1', 'x2', 'x3', 'v', 'dt', 'orientation', 'power'])
+        # Variables à sauvegarder : les lignes sont accumulées, puis ajoutées au DataFrame à la première lecture
+        self._df = pd.DataFrame(columns=COLUMNS)
+        self.pending = []
+        # Historique compact (voir set_storage), et son décodage en DataFrame
+        self.compact, self.decoded = None, None
+        # Données des graphiques et points affichés sur tout l'intervalle, puis pour les derniers niveaux de zoom
+        # (voir plot)
+        self.samples, self.zooms = {}, {}
+        # Noms des satellites de chaque flotte, sous forme de tableau (voir save_fleet)
+        self.fleet_names = {}
         # TITRE : Évolution xxxx en fonction yyyy
         self.title = {'time': 'du Temps', 'r': 'du Rayon', 'v': 'de la Vitesse', 'dt': 'du Pas de temps',
                       'orientation': 'de l\'Orientation', 'power': 'des Puissances'}
@@ -24,6 +199,89 @@ class Saver:
         """
         print(self.df)
 
+    @property
+    def df(self):
+        """
+        Base de données complète. Les sauvegardes en attente (lignes de satellites et blocs de flottes) sont
+        converties en une seule fois, et non à chaque itération.
+
+        :return: Base de données de toutes les sauvegardes.
+        :rtype: DataFrame   (from pandas)
+        """
+        if self.pending:
+            chunks, rows = [] if self._df.empty else [self._df], []
+            for item in self.pending + [None]:
+                if type(item) == list:
+                    rows.append(item)
+                    continue
+                if rows:
+                    chunks.append(pd.DataFrame(rows, columns=COLUMNS))
+                    rows = []
+                if type(item) == dict:
+                    # Bloc d'une flotte : les dictionnaires de puissances sont construits ici seulement
+                    power, names = item.pop('power'), item.pop('thrusters')
+                    item['power'] = [dict(zip(names, row)) for row in power.tolist()]
+                    chunks.append(pd.DataFrame(item, columns=COLUMNS))
+            self._df = pd.concat(chunks, ignore_index=True)
+            self.pending = []
+        if self.compact is None or self.compact.rows == 0:
+            return self._df
+        if self.decoded is None or len(self.decoded) != len(self._df) + self.compact.rows:
+            chunks = [self._df, self.compact.decode()] if not self._df.empty else [self.compact.decode()]
+            self.decoded = pd.concat(chunks, ignore_index=True)
+        return self.decoded
+
+    @df.setter
+    def df(self, df):
+        self._df, self.pending = df, []
+        self.decoded, self.samples, self.zooms = None, {}, {}
+        if not self.compact is None:
+            self.compact = CompactHistory(**self.storage)
+
+    def __getstate__(self):
+        """
+        État enregistré (ex: cache des résultats) : le décodage de l'historique compact et les données des
+        graphiques ne sont pas conservés.
+        """
+        return {**self.__dict__, 'decoded': None, 'samples': {}, 'zooms': {}}
+
+    def set_storage(self, position='float32', velocity='float32', scalars='float32', power='int8', time='delta',
+                    resolution=1e-3):
+        """
+        Active le stockage compact des sauvegardes suivantes (voir Class CompactHistory). Les sauvegardes déjà
+        réalisées sont conservées telles quelles ; l'intégration reste en float64, et la base de données lue (df) est
+        décodée avec les mêmes colonnes qu'en stockage ordinaire.
+
+        :param position: Type des positions relatives à la planète de référence (par défaut 'float32').
+        :type position: string
+        :param velocity: Type des vitesses (par défaut 'float32').
+        :type velocity: string
+        :param scalars: Type des colonnes r, v, dt et orientation (par défaut 'float32').
+        :type scalars: string
+        :param power: Type des puissances : 'int8' ou 'int16' (quantifiées), ou un type flottant (par défaut 'int8').
+        :type power: string
+        :param time: Codage des instants : 'delta' (par défaut) ou 'float64'.
+        :type time: string
+        :param resolution: Résolution du codage 'delta' des instants (en sec, par défaut 1 ms).
+        :type resolution: float
+        """
+        self._df = self.df
+        self.storage = {'position': position, 'velocity': velocity, 'scalars': scalars, 'power': power,
+                        'time': time, 'resolution': resolution}
+        self.compact, self.decoded = CompactHistory(**self.storage), None
+
+    def axes(self, sat):
+        """
+        Retourne l'orientation (ux, uy, uz) d'un satellite à enregistrer : en float32 si le stockage est compact.
+
+        :param sat: Satellite complet
+        :type sat: Class Satellite
+        :rtype: list[1D-array] or 2D-array   (3*3 components)
+        """
+        if self.compact is None:
+            return [sat.ux, sat.uy, sat.uz]
+        return np.array([sat.ux, sat.uy, sat.uz], dtype=self.compact.dtypes['position'])
+
     def __getitem__(self, sat):
         """
         Extrait toutes les sauvgardes d'un satellite en particulier. Si le satellite n'exsite pas dans la base de
@@ -44,14 +302,161 @@ class Saver:
         :param sat: Satellite complet
         :type sat: Class Satellite
         """
-        # Ajout les données à la fin du DataFrame
-        self.df.loc[len(self.df.index)] = [sat.name, sat.simulator.time, sat.get_radius(), sat.x[0], sat.x[1], sat.x[2],
-                                           sat.get_speed(), sat.simulator.dt, sat.x_ang[2],
-                                           {thruster.name: sat.get(thruster.name).power for thruster in sat.thrusters}]
+        if not self.compact is None:
+            c, pln = self.compact, sat.planet_ref
+            code = c.code(sat.name, tuple(thruster.name for thruster in sat.thrusters))
+            x = sat.x - (0 if pln is None else pln.x)
+            c.append([code], c.origin(pln), sat.simulator.time, [x], [sat.v],
+                     [[sat.get_radius(), sat.get_speed(), sat.simulator.dt, sat.x_ang[2]]],
+                     [sat.get(thruster.name).power for thruster in sat.thrusters])
+            return
+        # Ajout les données à la fin de la base de données (conversion différée)
+        self.pending.append([sat.name, sat.simulator.time, sat.get_radius(), sat.x[0], sat.x[1], sat.x[2],
+                             sat.get_speed(), sat.v[0], sat.v[1], sat.v[2], sat.simulator.dt, sat.x_ang[2],
+                             {thruster.name: sat.get(thruster.name).power for thruster in sat.thrusters}])
+
+    def save_fleet(self, fleet):
+        """
+        Ajoute une ligne par satellite en vie de la flotte à la base de donnée, à partir de ses tableaux d'états
+        (sans boucle sur les satellites).
+
+        :param fleet: Flotte complète
+        :type fleet: Class Fleet
+        """
+        alive = np.flatnonzero(fleet.alive)
+        if not self.compact is None:
+            c, pln = self.compact, fleet.planet_ref
+            codes = c.fleet_codes.get(fleet.name, np.zeros(0, dtype=np.int32))
+            if len(codes) < len(fleet):
+                # Codes des nouveaux satellites de la flotte
+                new = [c.code(name, THRUSTER_NAMES) for name in fleet.names[len(codes):]]
+                codes = c.fleet_codes[fleet.name] = np.concatenate([codes, np.array(new, dtype=np.int32)])
+            scalars = np.column_stack([fleet.get_radius()[alive], fleet.get_speed()[alive],
+                                       np.full(len(alive), fleet.simulator.dt), fleet.x_ang[alive, 2]])
+            c.append(codes[alive], c.origin(pln), fleet.simulator.time,
+                     fleet.x[alive] - (0 if pln is None else pln.x), fleet.v[alive], scalars, fleet.power[alive])
+            return
+        names = self.fleet_names.get(fleet.name)
+        if names is None or len(names) != len(fleet):
+            names = self.fleet_names[fleet.name] = np.array(fleet.names, dtype=object)
+        self.pending.append({'name': names[alive], 'time': fleet.simulator.time,
+                             'r': fleet.get_radius()[alive], 'x1': fleet.x[alive, 0], 'x2': fleet.x[alive, 1],
+                             'x3': fleet.x[alive, 2], 'v': fleet.get_speed()[alive], 'v1': fleet.v[alive, 0],
+                             'v2': fleet.v[alive, 1], 'v3': fleet.v[alive, 2], 'dt': fleet.simulator.dt,
+                             'orientation': fleet.x_ang[alive, 2], 'power': fleet.power[alive].copy(),
+                             'thrusters': THRUSTER_NAMES})
+
+    def elements(self, sat, mu, center=(0, 0, 0), kind='keplerian'):
+        """
+        Calcule les éléments orbitaux sur toute la trajectoire enregistrée d'un satellite, en un seul appel vectorisé.
+
+        :param sat: Nom du satellite désiré
+        :type sat: string
+        :param mu: Paramètre gravitationnel de l'astre de référence (G * M).
+        :type mu: float
+        :param center: Position de l'astre de référence (par défaut l'origine).
+        :type center: 1D-array   (3 components)
+        :param kind: Type d'éléments : 'keplerian' (a, e, i, raan, argp, nu) ou 'equinoctial' (p, f, g, h, k, L).
+        :type kind: string
+        :return: Sauvegardes du satellite, complétées des colonnes d'éléments orbitaux.
+        :rtype: DataFrame   (from pandas)
+        """
+        df = self.__getitem__(sat)
+        if df is None:
+            return None
+        states = df[['x1', 'x2', 'x3', 'v1', 'v2', 'v3']].to_numpy(dtype=float) - np.r_[center, 0, 0, 0]
+        convert = cartesian_to_keplerian if kind == 'keplerian' else cartesian_to_equinoctial
+        return df.assign(**dict(zip(ELEMENTS[kind], convert(states, mu).T)))
+
+    def get_positions(self, names=None):
+        """
+        Extrait les positions enregistrées de plusieurs satellites sur une grille de temps commune, sous forme de
+        tableau (un satellite par colonne). Les instants où un satellite n'est pas enregistré valent NaN.
+
+        :param names: Noms des satellites (par défaut tous).
+        :type names: list[string]
+        :return: Instants (T), positions (T*N*3) et noms des satellites (N).
+        :rtype: tuple   (1D-array, 3D-array, list[string])
+        """
+        df = self.df if names is None else self.df[self.df['name'].isin(names)]
+        table = df.pivot_table(index='time', columns='name', values=['x1', 'x2', 'x3'], aggfunc='last')
+        names = list(table['x1'].columns) if names is None else list(names)
+        positions = np.stack([table[x].reindex(columns=names).to_numpy(dtype=float) for x in ['x1', 'x2', 'x3']],
+                             axis=-1)
+        return table.index.to_numpy(dtype=float), positions, names
 
-    def plot(self, sat, y, x='time', scaled=True):
+    def series(self, sat, y, x='time'):
         """
-        Affiche le graphique de la donnée x en fonction de y, pour le satellite désiré.
+        Extrait les données d'un satellite à afficher, sous forme de colonnes. Une colonne à plusieurs valeurs par
+        ligne (ex: 'power') est convertie en une seule opération, en une colonne par clé. Le résultat est conservé
+        tant que la base de données ne change pas : toutes les données conservées sont oubliées dès qu'elle change.
+
+        :param sat: Nom du satellite désiré
+        :type sat: string
+        :param y: Nom de la donnée en ordonnée
+        :type y: string
+        :param x: Nom de la donnée en absice (par défaut 'time')
+        :type x: sting
+        :return: Abscisses, et ordonnées de chaque fonction (nom -> valeurs, nom None pour une donnée simple).
+        :rtype: tuple   (1D-array, dict)
+        """
+        df = self.df
+        if self.samples.get('length') != len(df):
+            # Nouvelles lignes : les données des graphiques et les niveaux de zoom conservés ne sont plus valables
+            self.samples, self.zooms = {'length': len(df)}, {}
+        key = ('series', sat, x, y)
+        if not key in self.samples:
+            df = df[df['name'] == sat]
+            dx, dy = df[x].to_numpy(dtype=float), df[y]
+            if len(dy) and type(dy.iloc[0]) == dict:
+                table = pd.DataFrame(dy.tolist())
+                self.samples[key] = dx, {name: table[name].to_numpy(dtype=float) for name in table.columns}
+            else:
+                self.samples[key] = dx, {None: dy.to_numpy(dtype=float)}
+        return self.samples[key]
+
+    def sample(self, sat, y, x='time', name=None, points=2000, method='lttb', lo=None, hi=None):
+        """
+        Retourne les indices des points à afficher d'une fonction (voir downsample), pour l'intervalle d'abscisses
+        demandé. Les indices sont conservés pour tout l'intervalle et pour les ZOOM_LEVELS derniers niveaux de zoom.
+
+        :param sat: Nom du satellite désiré
+        :type sat: string
+        :param y: Nom de la donnée en ordonnée
+        :type y: string
+        :param x: Nom de la donnée en absice (par défaut 'time')
+        :type x: sting
+        :param name: Nom de la fonction, pour une donnée à plusieurs valeurs (ex: 'main' pour 'power').
+        :type name: string
+        :param points: Nombre de points affichés (par défaut 2000).
+        :type points: int
+        :param method: Méthode de sous-échantillonnage : 'lttb' (par défaut), 'minmax' ou None.
+        :type method: string
+        :param lo: Abscisse minimale affichée (par défaut None : début des données).
+        :type lo: float
+        :param hi: Abscisse maximale affichée (par défaut None : fin des données).
+        :type hi: float
+        :rtype: 1D-array   (int)
+        """
+        dx, dy = self.series(sat, y, x)
+        key = ('sample', sat, x, y, name, points, method, lo, hi)
+        if lo is None and hi is None:
+            if not key in self.samples:
+                self.samples[key] = downsample(dx, dy[name], points=points, method=method)
+            return self.samples[key]
+        # Zoom : niveau replacé en dernière position, et le moins récemment utilisé oublié
+        index = self.zooms.pop(key, None)
+        if index is None:
+            index = downsample(dx, dy[name], points=points, method=method, lo=lo, hi=hi)
+        self.zooms[key] = index
+        if len(self.zooms) > ZOOM_LEVELS:
+            del self.zooms[next(iter(self.zooms))]
+        return index
+
+    def plot(self, sat, y, x='time', scaled=True, points=2000, method='lttb'):
+        """
+        Affiche le graphique de la donnée x en fonction de y, pour le satellite désiré. Seuls quelques points par
+        pixel sont tracés (voir downsample) ; ils sont recalculés à chaque zoom sur les abscisses.
 
         :param sat: Nom du satellite désiré
         :type sat: string
@@ -62,26 +467,37 @@ class Saver:
         :param scaled: Dans le cas d'un graphique à plusieurs fonctions, normalise les fonctions pour qu'elles soient
                        toutes affichées correctement (par défaut True).
         :type scaled: boolean
+        :param points: Nombre de points affichés par fonction (par défaut 2000).
+        :type points: int
+        :param method: Méthode de sous-échantillonnage : 'lttb' (par défaut), 'minmax' (minimum et maximum par
+                       pixel) ou None (tous les points).
+        :type method: string
         """
-        # Colonne x (et y) du DataFrame, uniquement pour le satellite concerné
-        dx, dy = self.__getitem__(sat)[x], self.__getitem__(sat)[y]
-        # Si plusieurs données sont stockées dans la ligne
-        if type(dy[0]) == dict:
-            # Nom des fonctions (ou "sous-colonnes")
-            keys = dy[0].keys()
-            for key in keys:
-                save = []
-                for row in dy:
-                    save.append(row[key])
-                m = max(save)   # Pour la normalisation
-                if scaled and m != 0 and m != 1:
-                    save = [value / m for value in save]    # Normalisation de la fonction
-                    plt.plot(dx, save, label=key + f'   (x{round(1/m)})')
-                else:
-                    plt.plot(dx, save, label=key)
+        dx, dy = self.series(sat, y, x)
+        lines = []
+        for name, values in dy.items():
+            index = self.sample(sat, y, x, name, points=points, method=method)
+            m = np.nanmax(values) if len(values) else 0    # Pour la normalisation
+            if name is None:
+                m, label = 1, None
+            elif scaled and m != 0 and m != 1:
+                label = name + f'   (x{round(1/m)})'    # Normalisation de la fonction
+            else:
+                m, label = 1, name
+            line, = plt.plot(dx[index], values[index] / m, label=label)
+            lines.append((name, line, m))
+        if len(dy) > 1 or not None in dy:
             plt.legend()
-        else:
-            plt.plot(dx, dy)
+
+        def zoom(ax):
+            # Nouveaux points affichés pour l'intervalle visible
+            lo, hi = ax.get_xlim()
+            for name, line, m in lines:
+                index = self.sample(sat, y, x, name, points=points, method=method, lo=lo, hi=hi)
+                line.set_data(dx[index], dy[name][index] / m)
+        # Le zoom n'est suivi que si les abscisses sont croissantes (ex: le temps)
+        if not method is None and np.all(np.diff(dx) >= 0):
+            plt.gca().callbacks.connect('xlim_changed', zoom)
         # Titres et axes
         plt.title(f"Évolution {self.title[y]} ({self.units[y]}) en fonction {self.title[x]} ({self.units[x]})")
         plt.xlabel(f"{self.title[x].split(' ')[-1]} ({self.units[x]})")
@@ -1,9 +1,21 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import os
 import pandas as pd
 from classes.planet import Planet
-from classes.satellite import Satellite
+from classes.satellite import Satellite, plot_satellites
+from classes.fleet import Fleet
 from classes.saver import Saver
+from classes.access import access_windows
+from classes.eclipse import Sun, eclipse_intervals
+from classes.soi import SOITracker
+from classes.covariance import STMTracker
+from classes.catalog import read_catalog, walker_states
+from classes.breakup import breakup_fragments
+from classes.events import EventLog
+from classes.planning import PlanningPool
+from classes.monitor import ConservationMonitor
+from classes.telemetry import TelemetryServer
 from classes.tools import euler
 from time import time
 from datetime import timedelta
@@ -25,6 +37,13 @@ class Simulator:
         # Entités :
         self.satellites = [] # Liste des satellites présents dans la simulation
         self.planets = [] # Liste des planètes présentes dans la simulation
+        self.fleets = [] # Liste des flottes (satellites stockés sous forme de tableaux)
+        # Registre des objets par nom, pour chaque type d'entité (voir get)
+        self.registry = {'satellites': {}, 'fleets': {}, 'planets': {}}
+        # Satellites parcourus à chaque itération (les satellites morts en sont retirés, voir compact)
+        self.active = []
+        self.n_alive, self.n_dead = 0, 0 # Satellites en vie, et satellites morts encore dans self.active
+        self.compaction = 0.25 # Fraction de satellites morts dans self.active déclenchant le compactage
         self.saves = Saver()
         self.saves_u = {}
 
@@ -32,27 +51,281 @@ class Simulator:
         self.time = 0 # Temps écoulé depuis le début de la simulation
 
         self.controls = {}
+        # Coniques raccordées : suivi des sphères d'influence (None : attraction de toutes les planètes)
+        self.soi, self.kepler = None, False
+        self.stm = None
+        self.workers = 0
+        self.planning = None
+        self.monitor = None
+        self.telemetry = None
+        # Journal d'événements (affichage hors de la boucle de simulation)
+        self.events = EventLog()
+
+    def set_patched_conics(self, enabled=True, kepler=True, safety=0.5):
+        """
+        Active (ou désactive) les coniques raccordées : chaque satellite n'est attiré que par la planète dont la
+        sphère d'influence le contient, réévaluée uniquement à l'approche des frontières.
+
+        :param enabled: Active les coniques raccordées (par défaut True).
+        :type enabled: boolean
+        :param kepler: Propagation képlérienne exacte des satellites sans poussée (par défaut True).
+        :type kepler: boolean
+        :param safety: Fraction du temps estimé avant un franchissement de frontière, après laquelle la planète
+                       dominante est réévaluée (par défaut 0.5).
+        :type safety: float
+        """
+        self.soi = SOITracker(self.planets, safety=safety, events=self.events) if enabled else None
+        self.kepler = enabled and kepler
+
+    def set_variational(self, enabled=True, record=True):
+        """
+        Active (ou désactive) la propagation des matrices de transition d'état (6*6) de tous les satellites et
+        flottes, à partir de l'instant actuel. Les covariances propagées sont lues par self.stm.get_covariance.
+
+        :param enabled: Active la propagation (par défaut True).
+        :type enabled: boolean
+        :param record: Enregistre les matrices à chaque itération (par défaut True).
+        :type record: boolean
+        """
+        self.stm = STMTracker(record=record) if enabled else None
+
+    def set_workers(self, workers=None):
+        """
+        Répartit le pas de simulation des flottes entre plusieurs processus de calcul, en mémoire partagée : chaque
+        processus traite une tranche de satellites (poussée, intégration, attitude, collisions, grandeurs
+        sauvegardées), au même rythme que la simulation. Le reste de la simulation (contrôles, sauvegardes) est
+        inchangé.
+
+        :param workers: Nombre de processus de calcul par flotte (par défaut le nombre de coeurs, 0 : désactive).
+        :type workers: int
+        """
+        self.workers = os.cpu_count() if workers is None else workers
+        for fleet in self.fleets:
+            fleet.set_workers(self.workers)
+
+    def set_planning(self, enabled=True, workers=1, kind='thread', delay=0.):
+        """
+        Active (ou désactive) la planification en arrière-plan des instructions coûteuses des contrôleurs (transfert
+        d'Hohmann) : les plans sont calculés par un pool de fils ou de processus pendant que la simulation continue,
+        puis appliqués après un délai simulé fixé (les résultats ne dépendent pas de la durée des calculs).
+        Pendant ce délai, le satellite n'est pas guidé par le nouveau plan : il doit être plus court que toute phase
+        où le guidage est indispensable.
+
+        :param enabled: Active la planification en arrière-plan (par défaut True).
+        :type enabled: boolean
+        :param workers: Nombre de fils (ou de processus) de calcul (par défaut 1).
+        :type workers: int
+        :param kind: 'thread' (par défaut) ou 'process'.
+        :type kind: string
+        :param delay: Délai simulé avant l'application d'un plan (en sec, par défaut 0 : à la mise à jour suivante
+                      des contrôleurs).
+        :type delay: float
+        """
+        if not self.planning is None:
+            self.planning.close()
+        self.planning = PlanningPool(workers=workers, kind=kind, delay=delay) if enabled else None
+
+    def set_monitor(self, enabled=True, warn=1e-3, reduce=None, grow=None, **kwargs):
+        """
+        Active (ou désactive) le suivi de la conservation de l'énergie et du moment cinétique des objets en vol
+        balistique (voir Class ConservationMonitor). Les dépassements sont enregistrés dans le journal d'événements
+        (catégorie 'warning'), et le pas de temps peut être adapté à la dérive mesurée.
+
+        :param enabled: Active le suivi (par défaut True).
+        :type enabled: boolean
+        :param warn: Dérive relative au-delà de laquelle un avertissement est enregistré (par défaut 1e-3).
+        :type warn: float
+        :param reduce: Dérive relative entre deux vérifications au-delà de laquelle le pas de temps est réduit (par
+                       défaut None : pas de temps fixe).
+        :type reduce: float
+        :param grow: Dérive relative entre deux vérifications en deçà de laquelle le pas de temps est augmenté (par
+                     défaut None : pas de temps fixe).
+        :type grow: float
+        :param kwargs: Autres paramètres du suivi (factor, dt_min, dt_max, interval).
+        """
+        self.monitor = ConservationMonitor(warn=warn, reduce=reduce, grow=grow, **kwargs) if enabled else None
+
+    def set_telemetry(self, enabled=True, host='127.0.0.1', port=0, path=None, rate=10.):
+        """
+        Active (ou désactive) la diffusion en direct des états de la simulation (positions, vitesses, puissances des
+        propulseurs) vers des visualiseurs externes, par un serveur local (voir Class TelemetryServer). Les clients
+        trop lents perdent des trames, sans ralentir la simulation.
+
+        :param enabled: Active la diffusion (par défaut True).
+        :type enabled: boolean
+        :param host: Adresse d'écoute TCP (par défaut '127.0.0.1').
+        :type host: string
+        :param port: Port TCP (par défaut 0 : port libre, voir self.telemetry.address).
+        :type port: int
+        :param path: Chemin d'une socket Unix (à la place de TCP).
+        :type path: string
+        :param rate: Nombre maximal de trames par seconde (par défaut 10).
+        :type rate: float
+        :return: Serveur de télémétrie (None si désactivé).
+        :rtype: Class TelemetryServer
+        """
+        if not self.telemetry is None:
+            self.telemetry.close()
+        self.telemetry = TelemetryServer(host=host, port=port, path=path, rate=rate) if enabled else None
+        return self.telemetry
 
     def add(self, obj):
         """
         Ajout d'un objet à la simulation.
 
         :param obj: Objet à ajouter à la simulation.
-        :type obj: Class Satellite ou Class Planet.
+        :type obj: Class Satellite, Class Fleet ou Class Planet.
         """
         if type(obj) == Satellite:
             obj.linkto(simulator=self) # Lie l'objet à la simulation en cours
             self.satellites.append(obj) # Ajout du Satellite à la liste des satellites de la simulation
+            self.registry['satellites'].setdefault(obj.name, obj)
+            if obj.alive:
+                self.active.append(obj)
+                self.n_alive += 1
             self.saves.save(obj)
-            self.saves_u[obj.name] = [obj.ux, obj.uy, obj.uz]
+            self.saves_u[obj.name] = list(self.saves.axes(obj))
             if not obj.controler is None:
                 obj.controler.load(sat=obj)
+        elif type(obj) == Fleet:
+            obj.linkto(simulator=self) # Lie la flotte (et son contrôleur) à la simulation en cours
+            self.fleets.append(obj)
+            self.registry['fleets'].setdefault(obj.name, obj)
+            if self.workers:
+                obj.set_workers(self.workers)
+            self.saves.save_fleet(obj)
         elif type(obj) == Planet:
             obj.linkto(simulator=self) # Lie la planète à la simulation en cours
             self.planets.append(obj) # Ajout de la Planète à la liste des planètes de la simulation
+            self.registry['planets'].setdefault(obj.name, obj)
+            if not self.soi is None:
+                self.soi = SOITracker(self.planets, safety=self.soi.safety, events=self.events)
         else:
             print(f" > Impossible d'ajouter ce type d'objet à la simulation")
 
+    def add_catalog(self, x=None, v=None, mass=1000., size=(1, 1, 1), names=None, path=None, name='catalog',
+                    planet_ref=None, thrusters=False, chunksize=100000, **kwargs):
+        """
+        Ajoute en une seule fois un catalogue d'objets à la simulation, sous forme d'une flotte : les états sont
+        copiés directement dans ses tableaux, sans créer d'objet, de propulseur ou de contrôleur par satellite.
+
+        :param x: Positions initiales (ignorées si path est donné).
+        :type x: 2D-array   (N*3 components)
+        :param v: Vitesses initiales (par défaut nulles).
+        :type v: 2D-array   (N*3 components)
+        :param mass: Masses (une commune, ou une par objet).
+        :type mass: float or 1D-array
+        :param size: Tailles (une commune, ou une par objet).
+        :type size: 1D-array or 2D-array   (3 or N*3 components)
+        :param names: Nom de chaque objet (par défaut 'name-i').
+        :type names: list[string]
+        :param path: Fichier CSV du catalogue, lu par blocs (voir catalog.read_catalog).
+        :type path: string
+        :param name: Nom de la flotte créée (par défaut 'catalog').
+        :type name: string
+        :param planet_ref: Planète de référence commune (par défaut None).
+        :type planet_ref: Class Planet
+        :param thrusters: Si True, les objets reçoivent les 4 propulseurs de la flotte (par défaut False : passifs).
+        :type thrusters: boolean
+        :param chunksize: Nombre de lignes lues par bloc dans le fichier CSV (par défaut 100000).
+        :type chunksize: int
+        :param kwargs: Autres paramètres de la Class Fleet (color, scale).
+        :return: Flotte créée.
+        :rtype: Class Fleet
+        """
+        if not path is None:
+            catalog = read_catalog(path, chunksize=chunksize, mass=mass, size=size)
+            x, v, mass, size = catalog['x'], catalog['v'], catalog['mass'], catalog['size']
+            names = catalog['names'] if names is None else names
+        fleet = Fleet(mass=mass, x=x, v=v, size=size, name=name, names=names, planet_ref=planet_ref,
+                      thrusters=thrusters, **kwargs)
+        self.add(fleet)
+        return fleet
+
+    def add_walker(self, planet, total, planes, phasing, altitude, inclination, mass=1000., name='walker',
+                   raan_0=0., spread=360., thrusters=False, **kwargs):
+        """
+        Ajoute une constellation de Walker i: total/planes/phasing autour d'une planète (voir catalog.walker_states),
+        sous forme d'une flotte. Les satellites sont nommés 'name-plan-rang'.
+
+        :param planet: Planète centrale.
+        :type planet: Class Planet
+        :param total: Nombre total de satellites.
+        :type total: int
+        :param planes: Nombre de plans orbitaux.
+        :type planes: int
+        :param phasing: Facteur de phasage.
+        :type phasing: int
+        :param altitude: Altitude des orbites circulaires (en m).
+        :type altitude: float
+        :param inclination: Inclinaison des orbites (en degrés).
+        :type inclination: float
+        :param mass: Masse des satellites (par défaut 1000).
+        :type mass: float
+        :param name: Nom de la flotte créée (par défaut 'walker').
+        :type name: string
+        :param raan_0: Longitude du noeud ascendant du premier plan (en degrés, par défaut 0).
+        :type raan_0: float
+        :param spread: Étendue des noeuds ascendants (en degrés, par défaut 360).
+        :type spread: float
+        :param thrusters: Si True, les satellites reçoivent les 4 propulseurs de la flotte (par défaut False).
+        :type thrusters: boolean
+        :param kwargs: Autres paramètres de la Class Fleet (size, color, scale).
+        :return: Flotte créée.
+        :rtype: Class Fleet
+        """
+        x, v, plane, rank = walker_states(total, planes, phasing, planet.radius + altitude, inclination,
+                                          6.67 * 10 ** -11 * planet.mass, raan_0=raan_0, spread=spread)
+        names = [f"{name}-{p}-{r}" for p, r in zip(plane.tolist(), rank.tolist())]
+        return self.add_catalog(x=planet.x + x, v=planet.v + v, mass=mass, names=names, name=name, planet_ref=planet,
+                                thrusters=thrusters, **kwargs)
+
+    def breakup(self, target, index=None, kind='explosion', name='debris', rng=None, **kwargs):
+        """
+        Fragmente un satellite (ou un satellite d'une flotte) : l'objet est détruit, et ses fragments (voir
+        breakup.breakup_fragments) sont ajoutés en une seule opération à la flotte de débris, créée si besoin. Les
+        fragments sont enregistrés à partir de leur premier pas de temps.
+
+        :param target: Satellite fragmenté, ou flotte contenant le satellite fragmenté.
+        :type target: Class Satellite or Class Fleet
+        :param index: Indice (ou nom) du satellite fragmenté dans la flotte.
+        :type index: int or string
+        :param kind: Type de fragmentation : 'explosion' (par défaut) ou 'collision'.
+        :type kind: string
+        :param name: Nom de la flotte de débris (par défaut 'debris').
+        :type name: string
+        :param rng: Générateur aléatoire (par défaut un nouveau générateur).
+        :type rng: numpy.random.Generator
+        :param kwargs: Autres paramètres de breakup.breakup_fragments (lc_min, lc_max, scale, projectile_mass,
+                       relative_speed, max_count).
+        :return: Flotte de débris.
+        :rtype: Class Fleet
+        """
+        if type(target) == Fleet:
+            i = target.index[index] if type(index) == str else index
+            label, mass, x, v = target.names[i], target.mass[i], target.x[i].copy(), target.v[i].copy()
+            target.alive[i] = False
+            target.n_alive = int(np.sum(target.alive))
+        else:
+            label, mass, x, v = target.name, target.mass, target.x.copy(), target.v.copy()
+            target.alive = False
+        fragments = breakup_fragments(mass, x, v, kind=kind, rng=rng, **kwargs)
+        debris = self.get(name)
+        if type(debris) != Fleet:
+            debris = Fleet(mass=fragments['mass'], x=fragments['x'], v=fragments['v'], size=fragments['size'],
+                           name=name, planet_ref=getattr(target, 'planet_ref', None), color='k', thrusters=False)
+            # Ajout sans sauvegarde immédiate (voir Simulator.add)
+            debris.linkto(simulator=self)
+            self.fleets.append(debris)
+            self.registry['fleets'].setdefault(name, debris)
+            if self.workers:
+                debris.set_workers(self.workers)
+        else:
+            debris.extend(mass=fragments['mass'], x=fragments['x'], v=fragments['v'], size=fragments['size'])
+        self.events.log('breakup', f"{len(fragments['mass'])} fragments added to {name}", time=self.time, source=label,
+                        count=len(fragments['mass']))
+        return debris
+
     def get(self, name):
         """
         Récupère un objet de la simulation par son nom.
@@ -60,19 +333,45 @@ class Simulator:
         :param name: Nom de l'objet à récupérer.
         :type name: string
         :return: Objet correspondant au nom donné, None si rien n'a été trouvé.
-        :rtype: Class Planet or Class Satellite
-        """
-        # Parcours les listes des satellites et des planètes
-        for entities in [self.satellites, self.planets]:
-            # Parcours chaque objet dans la liste
-            for ent in entities:
-                # Si le nom de l'objet correspond au nom recherché
-                if ent.name == name:
-                    # Retourne l'objet
-                    return ent
+        :rtype: Class Planet, Class Satellite or Class Fleet
+        """
+        # Recherche dans les registres des satellites, des flottes puis des planètes (premier objet ajouté sous ce nom)
+        for kind in ['satellites', 'fleets', 'planets']:
+            ent = self.registry[kind].get(name)
+            if not ent is None:
+                return ent
         # Si aucun objet correspondant au nom n'a été trouvé, retourne None
         return None
 
+    def set_alive(self, sat, alive):
+        """
+        Prend en compte le changement d'état d'un satellite (appelé par Satellite.alive). Un satellite mort reste dans
+        self.active jusqu'au compactage suivant, déclenché lorsque la fraction de satellites morts dépasse
+        self.compaction ; un satellite ramené en vie (ex: rechargement d'un cache) y est replacé immédiatement.
+
+        :param sat: Satellite concerné.
+        :type sat: Class Satellite
+        :param alive: Nouvel état du satellite.
+        :type alive: boolean
+        """
+        if self.registry['satellites'].get(sat.name) is None:
+            return
+        if alive:
+            self.n_alive += 1
+            self.compact()
+        else:
+            self.n_alive -= 1
+            self.n_dead += 1
+            if self.n_dead > self.compaction * len(self.active):
+                self.compact()
+
+    def compact(self):
+        """
+        Retire les satellites morts de l'ensemble des satellites actifs (ordre d'ajout conservé).
+        """
+        self.active = [sat for sat in self.satellites if sat.alive]
+        self.n_dead = 0
+
     def integrate(self, f, df, ddf):
         """
         Effectue l'intégration numérique d'une fonction à l'aide de la méthode désirée.
@@ -95,11 +394,8 @@ class Simulator:
         :return: Nombre de satellites en vie.
         :rtype: int
         """
-        # Initailisation du compte à 0
-        count = 0
-        for sat in self.satellites:
-            count += sat.alive
-        return count
+        # Comptes tenus à jour à chaque changement d'état (voir set_alive et Fleet.crash)
+        return self.n_alive + sum(fleet.n_alive for fleet in self.fleets)
 
     def run(self, duration_max=60, time_max=10**6, infos=0):
         """
@@ -119,6 +415,9 @@ class Simulator:
 
         self.running = True
         self.t0 = time()
+        # Éphémérides des planètes en mouvement, construites une seule fois pour toute la simulation
+        for pln in self.planets:
+            pln.build_ephemeris(t_start=self.time, t_end=max(time_max, self.time + self.dt))
         # Calcul de la fréquence d'affichage des informations, dans le cas de infos = fraction.
         if infos < 1:
             infos = round(infos * time_max)
@@ -132,7 +431,8 @@ class Simulator:
                 next_info += infos
                 for sat in self.satellites:
                     if not sat.planet_ref is None:
-                        print(f"\n - [{sat.name} - {self.time} sec] Altitude : {round(sat.get_altitude())} m, Vitesse : {round(np.linalg.norm(sat.v))} m/s")
+                        self.events.log('info', f"Altitude : {round(sat.get_altitude())} m, Vitesse : "
+                                        f"{round(np.linalg.norm(sat.v))} m/s", time=self.time, source=sat.name)
 
             self.iteration += 1
 
@@ -149,11 +449,30 @@ class Simulator:
         :param infos: Si True, affiche les informations de chaque satellite. Si False, n'affiche pas les informations.
         :type infos: boolean
         """
-        # Avance chaque satellite d'un pas de temps
-        for sat in self.satellites:
-            sat.step(planets=self.planets, infos=infos)
+        # Position des planètes en mouvement (une lecture d'éphéméride par planète, commune à tous les satellites)
+        for pln in self.planets:
+            pln.update(self.time)
+        # Avance chaque satellite en vie d'un pas de temps (un satellite mort n'est plus ni avancé ni enregistré)
+        for sat in self.active:
+            if not sat.alive:
+                continue
+            planets = self.planets if self.soi is None else self.soi.get_bodies(sat, self.time, self.dt)
+            if not self.stm is None and (not sat.islanded or sat.istakingoff):
+                self.stm.step(sat.name, sat.x, planets, simulator=self)
+            sat.step(planets=planets, infos=infos, kepler=self.kepler, patched=not self.soi is None)
             self.saves.save(sat)
-            self.saves_u[sat.name].append([sat.ux, sat.uy, sat.uz])
+            self.saves_u[sat.name].append(self.saves.axes(sat))
+        # Avance toutes les flottes d'un pas de temps (opérations vectorielles)
+        for fleet in self.fleets:
+            bodies = None if self.soi is None else self.soi.get_fleet_bodies(fleet, self.time, self.dt)
+            if not self.stm is None:
+                self.stm.step(fleet.name, fleet.x, self.planets, simulator=self, bodies=bodies,
+                              mask=fleet.alive & (~fleet.islanded | fleet.istakingoff))
+            fleet.step(planets=self.planets, infos=infos, bodies=bodies, kepler=self.kepler)
+            self.saves.save_fleet(fleet)
+        # Diffusion des états aux visualiseurs connectés
+        if not self.telemetry is None:
+            self.telemetry.publish(self)
         # Mise à jour le temps de la simulation
         self.time += self.dt
 
@@ -163,13 +482,21 @@ class Simulator:
                 time, value = step[0], step[1]
                 if self.time >= time:
                     if infos:
-                        print(f"   | set {ctrl} to {value}" + ' '*3 + f"({self.time} sec)")
+                        self.events.log('set', f"set {ctrl} to {value}", time=self.time)
                         setattr(self, ctrl, value)
                     self.controls[ctrl].remove(step)
-        # Contrôles automatiques pour l'étape suivante
-        for sat in self.satellites:
-            if not sat.controler is None:
+        # Plans calculés en arrière-plan dont l'instant d'application est atteint
+        if not self.planning is None:
+            self.planning.collect(self.time, tolerance=self.dt / 2)
+        # Contrôles automatiques pour l'étape suivante (uniquement aux bornes des plans de poussée)
+        for sat in self.active:
+            if sat.alive and not sat.controler is None and sat.controler.is_due():
                 sat.controler.update()
+        for fleet in self.fleets:
+            fleet.controler.update()
+        # Suivi de la conservation (et adaptation du pas de temps pour l'itération suivante)
+        if not self.monitor is None:
+            self.monitor.check(self)
 
     def stop(self):
         """
@@ -177,10 +504,62 @@ class Simulator:
         """
         # Arrêt de la simulation
         self.running = False
-        # Affiche les informations de fin
+        if not self.planning is None:
+            self.planning.close()
+        # Affiche les informations de fin (après les derniers événements)
+        self.events.flush()
         print(f"\n" + '-'*70 + "\n")
         print(f"   Fin de simuation après {self.iteration} itérations et {round(time() - self.t0, 2)} sec")
-        print(f"   Durée simulée : {timedelta(seconds=self.iteration * self.dt)}\n\n" + '-'*70 + "\n")
+        print(f"   Durée simulée : {timedelta(seconds=self.time)}\n\n" + '-'*70 + "\n")
+
+    def get_view_scale(self):
+        """
+        Estime la demi-largeur de la zone à afficher, à partir des planètes et des trajectoires sauvegardées.
+        Sert au choix du niveau de détail des maillages.
+
+        :return: Demi-largeur de la vue (en m).
+        :rtype: float
+        """
+        scale = max([np.max(np.abs(pln.x)) + pln.radius for pln in self.planets], default=0)
+        if len(self.saves.df.index) > 0:
+            scale = max(scale, np.max(np.abs(self.saves.df[['x1', 'x2', 'x3']].to_numpy(dtype=float))))
+        return scale
+
+    def get_access(self, planet, names=None, stations=None):
+        """
+        Calcule les fenêtres de visibilité des satellites depuis les stations sol d'une planète, sur les trajectoires
+        enregistrées.
+
+        :param planet: Nom de la planète portant les stations.
+        :type planet: string
+        :param names: Noms des satellites (par défaut tous ceux enregistrés).
+        :type names: list[string]
+        :param stations: Noms des stations (par défaut toutes).
+        :type stations: list[string]
+        :return: Une ligne par fenêtre : station, satellite, rise, set, duration.
+        :rtype: DataFrame   (from pandas)
+        """
+        times, positions, names = self.saves.get_positions(names=names)
+        return access_windows(self.get(planet), times, positions, names=names, stations=stations)
+
+    def get_eclipses(self, planet, sun=None, names=None, model='conical'):
+        """
+        Calcule les intervalles d'ombre des satellites, projetée par une planète, sur les trajectoires enregistrées.
+
+        :param planet: Nom de la planète projetant l'ombre.
+        :type planet: string
+        :param sun: Modèle du Soleil (par défaut Sun(), vu depuis la Terre).
+        :type sun: Class Sun
+        :param names: Noms des satellites (par défaut tous ceux enregistrés).
+        :type names: list[string]
+        :param model: Modèle d'ombre : 'conical' (par défaut) ou 'cylindrical'.
+        :type model: string
+        :return: Une ligne par intervalle : satellite, kind, start, end, duration.
+        :rtype: DataFrame   (from pandas)
+        """
+        times, positions, names = self.saves.get_positions(names=names)
+        return eclipse_intervals(self.get(planet), Sun() if sun is None else sun, times, positions, names=names,
+                                 model=model)
 
     def plot(self, trajectory=True, add={}):
         """
@@ -195,10 +574,14 @@ class Simulator:
         """
         fig = plt.figure()
         ax = fig.add_subplot(111, projection='3d')
+        view_scale = self.get_view_scale()
         for pln in self.planets:
-            fig, ax = pln.plot(fig=fig, ax=ax, display=False)
+            fig, ax = pln.plot(fig=fig, ax=ax, display=False, view_scale=view_scale)
+        # Tous les satellites sont tracés en une seule collection
+        fig, ax = plot_satellites(self.satellites, fig=fig, ax=ax, display=False)
+        for fleet in self.fleets:
+            fig, ax = fleet.plot(fig=fig, ax=ax, display=False)
         for sat in self.satellites:
-            fig, ax = sat.plot(fig=fig, ax=ax, display=False)
             if trajectory:
                 x = self.saves[sat.name][['x1', 'x2', 'x3']]
                 ax.plot(x['x1'], x['x2'], x['x3'], '-' + sat.color)
@@ -229,6 +612,7 @@ class Simulator:
         """
         fig = plt.figure()
         ax = fig.add_subplot(111, projection='3d')
+        view_scale = self.get_view_scale()
 
         for i in range(0, self.iteration, step):
             # Efface le contenu de la figure pour le graphique suivant
@@ -240,21 +624,24 @@ class Simulator:
 
             # Trace les planètes
             for pln in self.planets:
-                fig, ax = pln.plot(fig=fig, ax=ax, display=False)
-            # Trace les satellites
+                fig, ax = pln.plot(fig=fig, ax=ax, display=False, view_scale=view_scale)
+            # Trace les satellites (en une seule collection)
+            paths = {}
             for sat in self.satellites:
-                x = self.saves[sat.name][['x1', 'x2', 'x3']][0:i+1]
+                x = paths[sat.name] = self.saves[sat.name][['x1', 'x2', 'x3']][0:i+1]
                 sat.x = np.array([x['x1'].iloc[-1], x['x2'].iloc[-1], x['x3'].iloc[-1]])
                 sat.ux, sat.uy, sat.uz = self.saves_u[sat.name][i]
-                fig, ax = sat.plot(fig=fig, ax=ax, display=False)
-                if trajectory:
+            fig, ax = plot_satellites(self.satellites, fig=fig, ax=ax, display=False)
+            if trajectory:
+                for sat in self.satellites:
                     # Trace la trajectoire du satellite jusqu'à l'itération actuelle
+                    x = paths[sat.name]
                     ax.plot(x['x1'], x['x2'], x['x3'], '-' + sat.color)
             # Pause pour permettre l'affichage du graphique
             plt.pause(0.01)
         plt.show()
 
-    def graph(self, y, x='time', scaled=True, sat=None):
+    def graph(self, y, x='time', scaled=True, sat=None, points=2000, method='lttb'):
         """
         Affiche le graphique de la donnée x en fonction de y, pour le satellite désiré.
 
@@ -267,7 +654,11 @@ class Simulator:
         :type scaled: boolean
         :param sat: Nom du satellite désiré (Si None, prend le 1er dans la liste)
         :type sat: string
+        :param points: Nombre de points affichés par fonction (par défaut 2000, voir Saver.plot).
+        :type points: int
+        :param method: Méthode de sous-échantillonnage : 'lttb' (par défaut), 'minmax' ou None (tous les points).
+        :type method: string
         """
         if sat is None:
             sat = self.satellites[0].name
-        self.saves.plot(x=x, y=y, sat=sat, scaled=scaled)
+        self.saves.plot(x=x, y=y, sat=sat, scaled=scaled, points=points, method=method)
@@ -0,0 +1,211 @@
+import numpy as np
+from classes.lambert import stumpff
+"""
+Coniques raccordées : sphères d'influence (SOI) des planètes, choix du corps dominant de chaque satellite (réévalué
+uniquement aux franchissements de frontières), et propagation képlérienne exacte à l'intérieur d'une SOI.
+"""
+
+# Constante de gravitation utilisée par le calcul des accélérations (voir Object.get_ag)
+G = 6.67 * 10 ** -11
+
+
+def soi_radius(distance, mass, parent_mass):
+    """
+    Calcule le rayon de la sphère d'influence d'un corps autour de son corps parent (formule de Laplace).
+
+    :param distance: Distance entre le corps et son parent (en m).
+    :type distance: float or 1D-array
+    :param mass: Masse du corps.
+    :type mass: float or 1D-array
+    :param parent_mass: Masse du corps parent.
+    :type parent_mass: float or 1D-array
+    :return: Rayon de la sphère d'influence (en m).
+    :rtype: float or 1D-array
+    """
+    return distance * (mass / parent_mass) ** (2 / 5)
+
+
+def kepler_propagate(r0, v0, dt, mu, iterations=50):
+    """
+    Propage des états sur une orbite képlérienne (tous types de coniques), par la méthode des variables
+    universelles et des coefficients de Lagrange. Le calcul est vectorisé sur N états.
+
+    :param r0: Positions initiales, relatives au corps central (en m).
+    :type r0: 2D-array   (N*3 components)
+    :param v0: Vitesses initiales, relatives au corps central (en m/s).
+    :type v0: 2D-array   (N*3 components)
+    :param dt: Durée de propagation (en sec).
+    :type dt: float or 1D-array
+    :param mu: Paramètre gravitationnel du corps central (G * M).
+    :type mu: float or 1D-array
+    :param iterations: Nombre maximal d'itérations de Newton (par défaut 50).
+    :type iterations: int
+    :return: Positions et vitesses finales.
+    :rtype: tuple   (2 * 2D-array, N*3 components)
+    """
+    r0, v0 = np.atleast_2d(np.asarray(r0, dtype=float)), np.atleast_2d(np.asarray(v0, dtype=float))
+    dt = np.broadcast_to(np.asarray(dt, dtype=float), (len(r0),))
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), (len(r0),))
+    sqmu = np.sqrt(mu)
+    nr0, nv0 = np.linalg.norm(r0, axis=1), np.linalg.norm(v0, axis=1)
+    alpha = 2 / nr0 - nv0 ** 2 / mu
+    sigma0 = np.sum(r0 * v0, axis=1) / sqmu
+    # Estimation initiale de la variable universelle
+    chi = np.where(alpha > 1e-12, sqmu * dt * alpha, sqmu * dt / nr0)
+    for _ in range(iterations):
+        psi = chi ** 2 * alpha
+        c2, c3 = stumpff(psi)
+        r = chi ** 2 * c2 + sigma0 * chi * (1 - psi * c3) + nr0 * (1 - psi * c2)
+        F = sigma0 * chi ** 2 * c2 + (1 - nr0 * alpha) * chi ** 3 * c3 + nr0 * chi - sqmu * dt
+        delta = F / r
+        chi = chi - delta
+        if np.max(np.abs(delta) / np.maximum(np.abs(chi), 1e-12), initial=0) < 1e-13:
+            break
+    psi = chi ** 2 * alpha
+    c2, c3 = stumpff(psi)
+    r = chi ** 2 * c2 + sigma0 * chi * (1 - psi * c3) + nr0 * (1 - psi * c2)
+    f, g = 1 - chi ** 2 * c2 / nr0, dt - chi ** 3 * c3 / sqmu
+    fdot, gdot = sqmu / (r * nr0) * chi * (psi * c3 - 1), 1 - chi ** 2 * c2 / r
+    return f[:, None] * r0 + g[:, None] * v0, fdot[:, None] * r0 + gdot[:, None] * v0
+
+
+class SOITracker:
+
+    def __init__(self, planets, safety=0.5, events=None):
+        """
+        Initialise le suivi des sphères d'influence d'un ensemble de planètes. La hiérarchie est construite par masse
+        décroissante : le corps le plus massif est la racine (SOI infinie), et chaque autre corps a pour parent le
+        corps plus massif le plus profond dont la SOI le contient.
+
+        :param planets: Planètes de la simulation.
+        :type planets: list[Class Planet]
+        :param safety: Fraction du temps minimal estimé avant un franchissement de frontière, après laquelle le corps
+                       dominant est réévalué (par défaut 0.5).
+        :type safety: float
+        :param events: Journal d'événements de la simulation (par défaut None : messages affichés directement).
+        :type events: Class EventLog
+        """
+        self.planets, self.safety, self.events = list(planets), safety, events
+        self.mass = np.array([pln.mass for pln in self.planets], dtype=float)
+        self.parent = np.full(len(self.planets), -1)
+        self.radius = np.full(len(self.planets), np.inf)
+        for i in np.argsort(-self.mass, kind='stable')[1:]:
+            heavier = [j for j in range(len(self.planets)) if self.mass[j] > self.mass[i] or
+                       (self.mass[j] == self.mass[i] and j < i)]
+            inside = [j for j in heavier if np.linalg.norm(self.planets[i].x - self.planets[j].x) < self.radius[j]]
+            self.parent[i] = min(inside, key=lambda j: self.radius[j])
+            self.radius[i] = self.get_radius(i)
+        # État de chaque satellite (ou flotte) suivi : nom -> (corps dominant, instant de la prochaine vérification)
+        self.states = {}
+
+    def log(self, message, time, source):
+        """
+        Enregistre un changement de sphère d'influence dans le journal d'événements (ou l'affiche, sans journal).
+        """
+        if self.events is None:
+            print(f"   | soi: {message}   [{source}]   ({time} sec)")
+        else:
+            self.events.log('soi', message, time=time, source=source)
+
+    def get_radius(self, i):
+        """
+        Calcule le rayon actuel de la sphère d'influence d'une planète (infini pour la racine).
+
+        :param i: Indice de la planète.
+        :type i: int
+        :rtype: float
+        """
+        if self.parent[i] < 0:
+            return np.inf
+        parent = self.planets[self.parent[i]]
+        return soi_radius(np.linalg.norm(self.planets[i].x - parent.x), self.mass[i], parent.mass)
+
+    def dominant(self, x):
+        """
+        Détermine le corps dominant de chaque position : le plus profond (plus petite SOI) qui la contient.
+
+        :param x: Positions.
+        :type x: 2D-array   (N*3 components)
+        :return: Indices des planètes dominantes.
+        :rtype: 1D-array   (int)
+        """
+        self.radius = np.array([self.get_radius(i) for i in range(len(self.planets))])
+        bodies = np.array([pln.x for pln in self.planets], dtype=float)
+        distance = np.linalg.norm(np.atleast_2d(x)[:, None, :] - bodies[None], axis=2)
+        return np.argmin(np.where(distance < self.radius, self.radius, np.inf), axis=1)
+
+    def next_check(self, x, v, time, dt):
+        """
+        Estime l'instant de la prochaine vérification du corps dominant : une fraction (safety) du temps minimal
+        nécessaire pour atteindre une frontière de SOI, à la vitesse relative actuelle.
+
+        :param x: Positions.
+        :type x: 2D-array   (N*3 components)
+        :param v: Vitesses.
+        :type v: 2D-array   (N*3 components)
+        :param time: Instant actuel (en sec).
+        :type time: float
+        :param dt: Pas de temps de la simulation (en sec), délai minimal entre deux vérifications.
+        :type dt: float
+        :return: Instants des prochaines vérifications.
+        :rtype: 1D-array
+        """
+        finite = np.isfinite(self.radius)
+        if not np.any(finite):
+            return np.full(len(np.atleast_2d(x)), np.inf)
+        bodies = np.array([pln.x for pln in self.planets], dtype=float)[finite]
+        speeds = np.array([pln.v for pln in self.planets], dtype=float)[finite]
+        margin = np.abs(np.linalg.norm(np.atleast_2d(x)[:, None, :] - bodies[None], axis=2) - self.radius[finite])
+        closing = np.linalg.norm(np.atleast_2d(v)[:, None, :] - speeds[None], axis=2)
+        with np.errstate(divide='ignore'):
+            delay = np.min(margin / closing, axis=1)
+        return time + np.maximum(self.safety * delay, dt)
+
+    def get_bodies(self, sat, time, dt):
+        """
+        Retourne la liste des planètes à prendre en compte pour un satellite (son seul corps dominant). Le corps
+        dominant n'est réévalué qu'à l'instant de vérification prévu.
+
+        :param sat: Satellite concerné.
+        :type sat: Class Satellite
+        :param time: Instant actuel (en sec).
+        :type time: float
+        :param dt: Pas de temps de la simulation (en sec).
+        :type dt: float
+        :return: Planète dominante.
+        :rtype: list[Class Planet]
+        """
+        body, check = self.states.get(sat.name, (None, -np.inf))
+        if time >= check:
+            new = int(self.dominant(sat.x)[0])
+            if not body is None and new != body:
+                self.log(f"enters the SOI of {self.planets[new].name}", time, sat.name)
+            body, check = new, self.next_check(sat.x, sat.v, time, dt)[0]
+            self.states[sat.name] = (body, check)
+        return [self.planets[body]]
+
+    def get_fleet_bodies(self, fleet, time, dt):
+        """
+        Retourne le corps dominant de chaque satellite d'une flotte, réévalué uniquement pour les satellites dont
+        l'instant de vérification est atteint.
+
+        :param fleet: Flotte concernée.
+        :type fleet: Class Fleet
+        :param time: Instant actuel (en sec).
+        :type time: float
+        :param dt: Pas de temps de la simulation (en sec).
+        :type dt: float
+        :return: Indices des planètes dominantes.
+        :rtype: 1D-array   (int)
+        """
+        if fleet.name not in self.states or len(self.states[fleet.name][0]) != len(fleet):
+            self.states[fleet.name] = (np.full(len(fleet), -1), np.full(len(fleet), -np.inf))
+        body, check = self.states[fleet.name]
+        due = time >= check
+        if np.any(due):
+            new = self.dominant(fleet.x[due])
+            changed = (body[due] >= 0) & (new != body[due])
+            if np.any(changed):
+                self.log(f"{np.sum(changed)} satellites changed of SOI", time, fleet.name)
+            body[due], check[due] = new, self.next_check(fleet.x[due], fleet.v[due], time, dt)
+        return body
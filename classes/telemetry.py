@@ -0,0 +1,242 @@
+import asyncio
+import json
+import socket
+import struct
+import threading
+from time import monotonic
+import numpy as np
+from classes.fleet import THRUSTER_NAMES
+"""
+Diffusion en direct de l'état de la simulation vers des visualiseurs externes (autres processus), par un serveur
+asyncio local (TCP ou socket Unix) exécuté dans un fil dédié. Les états sont envoyés sous forme de trames binaires, à
+la demande du client : un client lent reçoit toujours la dernière trame disponible (les trames intermédiaires sont
+abandonnées, aucune ne s'accumule dans les tampons), et ne ralentit jamais la simulation.
+
+Protocole : le client envoie une ligne de noms séparés par des virgules (satellites ou flottes, ligne vide : tous les
+objets), puis un octet quelconque pour chaque trame demandée. Le serveur répond à chaque demande par la dernière trame
+(précédée de l'en-tête s'il a changé), ou par la suivante si elle a déjà été envoyée. Chaque message du serveur
+commence par un type (1 octet) et la longueur du contenu (uint32) :
+    - 'H' : en-tête JSON {'names': [...], 'thrusters': [...]}, envoyé à l'abonnement et à chaque changement des objets,
+    - 'F' : trame, instant (float64), nombre d'objets n (uint32), puis positions et vitesses (n*6 float64) et
+            puissances des propulseurs (n*k float32, k = nombre de noms de l'en-tête 'thrusters').
+"""
+
+# Type et longueur d'un message
+MESSAGE = struct.Struct('<cI')
+# Instant et nombre d'objets d'une trame
+FRAME = struct.Struct('<dI')
+
+
+class TelemetryServer:
+
+    def __init__(self, host='127.0.0.1', port=0, path=None, rate=10.):
+        """
+        Démarre le serveur de télémétrie dans un fil dédié.
+
+        :param host: Adresse d'écoute TCP (par défaut '127.0.0.1', locale).
+        :type host: string
+        :param port: Port TCP (par défaut 0 : port libre choisi par le système, voir self.address).
+        :type port: int
+        :param path: Chemin d'une socket Unix (si précisé, utilisé à la place de TCP).
+        :type path: string
+        :param rate: Nombre maximal de trames par seconde (temps réel, par défaut 10).
+        :type rate: float
+        """
+        self.rate, self.next_frame = rate, 0.
+        self.clients = {}       # Client -> abonnement, indices des objets suivis, messages en attente
+        self.names, self.thrusters, self.layout = [], [], None
+        self.frames, self.dropped = 0, 0
+        self.address = None
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self.work, args=(host, port, path, ready), daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def work(self, host, port, path, ready):
+        """
+        Boucle du fil du serveur.
+        """
+        asyncio.set_event_loop(self.loop)
+        if path is None:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self.serve, host, port))
+            self.address = self.server.sockets[0].getsockname()[:2]
+        else:
+            self.server = self.loop.run_until_complete(asyncio.start_unix_server(self.serve, path))
+            self.address = path
+        ready.set()
+        self.loop.run_forever()
+
+    def __len__(self):
+        """
+        Retourne le nombre de clients connectés.
+
+        :rtype: int
+        """
+        return len(self.clients)
+
+    async def serve(self, reader, writer):
+        """
+        Gère un client : lecture de son abonnement, puis envoi d'une trame à chaque demande du client (une seule
+        trame en attente par client, remplacée par la plus récente). Une trame n'est jamais envoyée avant que le
+        client l'ait demandée : les trames ne s'accumulent ni dans les tampons du serveur, ni dans ceux du système.
+        """
+        # Aucun tampon d'écriture : drain attend que la trame ait quitté le serveur
+        writer.transport.set_write_buffer_limits(high=0)
+        line = (await reader.readline()).decode().strip()
+        client = {'names': set(name for name in line.split(',') if name), 'index': None, 'layout': None,
+                  'header': None, 'frame': None, 'event': asyncio.Event(), 'task': asyncio.current_task()}
+        self.clients[writer] = client
+        try:
+            while await reader.read(1):
+                await client['event'].wait()
+                client['event'].clear()
+                header, client['header'] = client['header'], None
+                frame, client['frame'] = client['frame'], None
+                for message in (header, frame):
+                    if not message is None:
+                        writer.write(message)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+    def publish(self, simulator):
+        """
+        Transmet l'état actuel de la simulation aux clients, si le débit maximal le permet (appelé à chaque itération
+        par la simulation ; aucune copie n'est réalisée sans client).
+
+        :param simulator: Simulation concernée.
+        :type simulator: Class Simulator
+        """
+        now = monotonic()
+        if not self.clients or now < self.next_frame:
+            return
+        self.next_frame = now + 1 / self.rate
+        # Objets : satellites, puis satellites des flottes (en vie ou non, pour garder des indices stables)
+        layout = tuple((sat.name, len(sat.thrusters)) for sat in simulator.satellites) + \
+            tuple((fleet.name, len(fleet)) for fleet in simulator.fleets)
+        if layout != self.layout:
+            self.layout = layout
+            self.names = [sat.name for sat in simulator.satellites]
+            self.owners = [sat.name for sat in simulator.satellites]
+            for fleet in simulator.fleets:
+                self.names += list(fleet.names)
+                self.owners += [fleet.name] * len(fleet)
+            self.thrusters = list(THRUSTER_NAMES)
+            for sat in simulator.satellites:
+                self.thrusters += [thr.name for thr in sat.thrusters if not thr.name in self.thrusters]
+        k = len(self.thrusters)
+        x = np.concatenate([np.array([sat.x for sat in simulator.satellites], dtype=float).reshape(-1, 3)] +
+                           [fleet.x for fleet in simulator.fleets])
+        v = np.concatenate([np.array([sat.v for sat in simulator.satellites], dtype=float).reshape(-1, 3)] +
+                           [fleet.v for fleet in simulator.fleets])
+        power = np.zeros((len(x), k), dtype=np.float32)
+        for i, sat in enumerate(simulator.satellites):
+            for thr in sat.thrusters:
+                power[i, self.thrusters.index(thr.name)] = thr.power
+        start = len(simulator.satellites)
+        for fleet in simulator.fleets:
+            power[start:start + len(fleet), :fleet.power.shape[1]] = fleet.power
+            start += len(fleet)
+        self.loop.call_soon_threadsafe(self.dispatch, simulator.time, np.column_stack([x, v]), power,
+                                       (self.names, self.owners, self.thrusters))
+
+    def dispatch(self, time, states, power, header):
+        """
+        Prépare la trame de chaque client (dans le fil du serveur). La trame précédente d'un client qui ne l'a pas
+        encore reçue est remplacée.
+        """
+        names, owners, thrusters = header
+        for client in self.clients.values():
+            if client['index'] is None or client['layout'] is not names:
+                # Objets abonnés (par nom de satellite ou de flotte)
+                selected = client['names']
+                client['index'] = np.array([i for i, (name, owner) in enumerate(zip(names, owners))
+                                            if not selected or name in selected or owner in selected], dtype=np.int64)
+                client['layout'] = names
+                body = json.dumps({'names': [names[i] for i in client['index']], 'thrusters': thrusters}).encode()
+                client['header'] = MESSAGE.pack(b'H', len(body)) + body
+            index = client['index']
+            body = FRAME.pack(time, len(index)) + states[index].tobytes() + power[index].tobytes()
+            if not client['frame'] is None:
+                self.dropped += 1
+            client['frame'] = MESSAGE.pack(b'F', len(body)) + body
+            client['event'].set()
+        self.frames += 1
+
+    def close(self):
+        """
+        Arrête le serveur et déconnecte les clients.
+        """
+        async def shutdown():
+            self.server.close()
+            tasks = [client['task'] for client in self.clients.values()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.server.wait_closed()
+        if self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+
+
+class TelemetryClient:
+
+    def __init__(self, address, names=()):
+        """
+        Se connecte à un serveur de télémétrie (ex: depuis le processus d'un visualiseur) et s'abonne aux objets
+        demandés.
+
+        :param address: Adresse (hôte, port) du serveur, ou chemin de sa socket Unix.
+        :type address: tuple or string
+        :param names: Noms des satellites ou des flottes suivis (par défaut tous les objets).
+        :type names: list[string]
+        """
+        family = socket.AF_UNIX if type(address) == str else socket.AF_INET
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.connect(address)
+        self.socket.sendall((','.join(names) + '\n').encode())
+        self.names, self.thrusters = [], []
+
+    def receive(self, size):
+        """
+        Lit exactement size octets.
+        """
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.socket.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("telemetry server closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def read(self):
+        """
+        Demande la dernière trame au serveur, et l'attend (les en-têtes reçus mettent à jour self.names et
+        self.thrusters).
+
+        :return: Instant, positions et vitesses (N*6), puissances des propulseurs (N*k).
+        :rtype: tuple   (float, 2D-array, 2D-array)
+        """
+        self.socket.sendall(b'?')
+        while True:
+            kind, size = MESSAGE.unpack(self.receive(MESSAGE.size))
+            body = self.receive(size)
+            if kind == b'H':
+                header = json.loads(body.decode())
+                self.names, self.thrusters = header['names'], header['thrusters']
+                continue
+            time, n = FRAME.unpack_from(body)
+            states = np.frombuffer(body, dtype=float, count=n * 6, offset=FRAME.size).reshape(n, 6)
+            power = np.frombuffer(body, dtype=np.float32, offset=FRAME.size + n * 48).reshape(n, -1)
+            return time, states, power
+
+    def close(self):
+        """
+        Ferme la connexion.
+        """
+        self.socket.close()
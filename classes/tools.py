@@ -94,3 +94,48 @@ def sign(inp):
     :rtype: signed int   (-1 or 1)
     """
     return int(inp / np.abs(inp))
+
+
+def intervals(chunks):
+    """
+    Extrait les intervalles où des fonctions échantillonnées sont strictement positives. Les échantillons sont lus
+    par blocs successifs d'instants ; les bornes sont encadrées par les changements de signe, puis interpolées
+    linéairement. Un intervalle ouvert au premier (ou dernier) instant commence (ou finit) à cet instant.
+    Les valeurs -inf (échantillons absents) sont considérées négatives, et la borne est placée sur l'échantillon
+    connu.
+
+    :param chunks: Blocs successifs (instants, valeurs), avec une colonne de valeurs par fonction.
+    :type chunks: iterable[tuple(1D-array (T), 2D-array (T*P))]
+    :return: Indice de la fonction, début et fin de chaque intervalle (triés par fonction, puis par début).
+    :rtype: tuple   (3 * 1D-array)
+    """
+    starts, ends = [], []
+    previous = None     # Dernier échantillon du bloc précédent : (instant, valeurs)
+    for t, values in chunks:
+        t, values = np.asarray(t, dtype=float), np.asarray(values, dtype=float)
+        if previous is None:
+            column = np.flatnonzero(values[0] > 0)
+            starts.append((column, np.full(len(column), t[0])))
+        else:
+            t, values = np.r_[previous[0], t], np.concatenate([previous[1][None], values])
+        # Changements de signe entre deux instants successifs
+        above = values > 0
+        k, column = np.nonzero(above[1:] != above[:-1])
+        v0, v1 = values[k, column], values[k + 1, column]
+        with np.errstate(invalid='ignore'):
+            frac = np.where(np.isfinite(v0) & np.isfinite(v1), v0 / (v0 - v1), np.where(np.isfinite(v0), 1., 0.))
+        crossing = t[k] + frac * (t[k + 1] - t[k])
+        rising = above[k + 1, column]
+        starts.append((column[rising], crossing[rising]))
+        ends.append((column[~rising], crossing[~rising]))
+        previous = (t[-1], values[-1])
+    if previous is None:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    column = np.flatnonzero(previous[1] > 0)
+    ends.append((column, np.full(len(column), previous[0])))
+
+    # Appariement des débuts et fins de chaque fonction (ils alternent, dans l'ordre chronologique)
+    start_column, start = (np.concatenate(part) for part in zip(*starts))
+    end_column, end = (np.concatenate(part) for part in zip(*ends))
+    order_start, order_end = np.lexsort((start, start_column)), np.lexsort((end, end_column))
+    return start_column[order_start], start[order_start], end[order_end]
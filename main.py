@@ -4,6 +4,7 @@ from classes.satellite import Satellite
 from classes.thruster import Thruster
 from classes.controler import Controler
 from classes.LecteurYAML import LecteurYAML
+from classes.cache import ResultCache
 
 # On prévient l'utilisateur de remplir le fichier yaml
 name = "donnees"
@@ -62,7 +63,15 @@ if parsed_data["iss"] :
     simu.get('ISS').set_scale(scale=5000)
 
 # Lancement de la simulation, pour une durée max de 15 sec de calcul OU 20.000 sec dans la simulation
-simu.run(duration_max=30, time_max=parsed_data['temps_simu'], infos=1/10)       # On affiche les infos tous les 10%
+# Cache des résultats : une simulation déjà réalisée avec les mêmes données, le même script (planètes, satellites,
+# contrôles) et le même code est rechargée
+cache = ResultCache()
+key = cache.key(parsed_data, settings={'dt': simu.dt, 'integrator': 'euler', 'duration_max': 30}, script=__file__)
+if not cache.restore(key, simu):
+    simu.run(duration_max=30, time_max=parsed_data['temps_simu'], infos=1/10)   # On affiche les infos tous les 10%
+    # Seules les simulations complètes (non interrompues par la durée de calcul maximale) sont enregistrées
+    if simu.time >= parsed_data['temps_simu'] or simu.count_alive() == 0:
+        cache.store(key, simu)
 # simu.animation(step=parsed_data['pas'])                                         # Mise en animation des résultats, avec accélération xpas
 simu.plot(add={'circle': [parsed_data['rayon_init'], parsed_data['rayon_fin']]})# Affichage de la trajectoire finale, depuis le temps initial
 